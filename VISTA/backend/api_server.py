@@ -3,7 +3,7 @@
 VISTA React Native 앱을 위한 API 서버
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
 import json
 import os
@@ -11,8 +11,18 @@ import sys
 from datetime import datetime
 import traceback
 
-# VISTA 프로젝트 경로 추가
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# VISTA 프로젝트 경로 추가 (+ 챗봇과 함께 쓰는 응답 직렬화 모듈이 있는 저장소 최상위)
+VISTA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(VISTA_ROOT)
+sys.path.append(os.path.dirname(VISTA_ROOT))
+
+import metrics
+from responses import dumps, json_response
+from route_batch import NDJSON_CONTENT_TYPE, BatchRejected, RouteBatchRunner, create_routing_session
+from poi_index import PoiIndex, load_pois
+from poi_text import PoiTextIndex
+from route_cache import RouteCache
+from route_jobs import SSE_CONTENT_TYPE, JobQueueFull, RouteJobQueue
 
 try:
     from demo.jeju_advanced_navigation import JejuNavigationSystem
@@ -25,27 +35,117 @@ except ImportError:
 app = Flask(__name__)
 CORS(app)  # React Native 앱에서 접근 허용
 
+# OSRM 호출은 커넥션 풀을 함께 쓰는 세션 하나로 (배치 워커 스레드 포함)
+routing_session = create_routing_session()
+
 # VISTA 시스템 초기화
 navigation_system = None
 interactive_navigator = None
 
 try:
     if JejuNavigationSystem:
-        navigation_system = JejuNavigationSystem()
+        navigation_system = JejuNavigationSystem(session=routing_session)
     if InteractiveNavigator:
-        interactive_navigator = InteractiveNavigator()
+        interactive_navigator = InteractiveNavigator(session=routing_session)
 except Exception as e:
     print(f"VISTA 시스템 초기화 실패: {e}")
 
+# POI 공간 색인과 이름 색인 (jeju_database.json + 내비게이션 관광 데이터베이스)
+all_pois = load_pois(extra=navigation_system.db.poi_data if navigation_system else None)
+poi_index = PoiIndex(all_pois)
+poi_text_index = PoiTextIndex(all_pois)
+
+# 인기 출발/도착 쌍의 경로 결과 캐시 (메모리 LRU + SQLite)
+route_cache = RouteCache()
+
+# /metrics (Prometheus 텍스트 형식)
+VISTA_METRICS = metrics.Registry()
+metrics.StatsCollector('vista_route_cache', route_cache.stats, '경로 캐시 조회/저장 수', registry=VISTA_METRICS)
+metrics.Gauge('vista_route_cache_hit_ratio', 'OSRM 호출 없이 응답한 경로 요청 비율', route_cache.hit_ratio,
+              registry=VISTA_METRICS)
+metrics.Gauge('vista_route_cache_entries', '메모리 경로 캐시 항목 수', lambda: route_cache.usage()[0],
+              registry=VISTA_METRICS)
+metrics.Gauge('vista_route_cache_bytes', '메모리 경로 캐시 크기(바이트)', lambda: route_cache.usage()[1],
+              registry=VISTA_METRICS)
+
+
+def route_response_body(route_body):
+    """이미 직렬화한 경로 JSON 을 경로 계산 응답 본문에 붙인다"""
+    return (b'{"success":true,"route":' + route_body
+            + b',"calculation_time":' + dumps(datetime.now().isoformat()) + b'}')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """서버 상태 확인"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'vista_system_available': navigation_system is not None
     })
 
+def compute_route(start_point, end_point, preferences):
+    """(경로 JSON bytes, 캐시 적중 여부 또는 None)"""
+    cache_source = None
+    if navigation_system:
+        # 실제 VISTA 시스템 사용 (같은 격자 칸의 출발/도착 + 선호는 캐시된 결과)
+        route_body, cache_source = route_cache.get_or_compute(
+            start_point, end_point, preferences,
+            lambda: navigation_system.calculate_scenic_route(
+                start=start_point,
+                end=end_point,
+                preferences=preferences
+            )
+        )
+    else:
+        # 모의 응답
+        route = {
+            'distance': 25.4,
+            'duration': 1800,  # 30분
+            'geometry': {
+                'coordinates': [
+                    [126.4933, 33.5066],  # 제주공항
+                    [126.4500, 33.4800],
+                    [126.4000, 33.4500],
+                    [126.9423, 33.4586]   # 성산일출봉
+                ]
+            },
+            'jeju_features': {
+                'total_scenery_score': 8.5,
+                'route_pois': [
+                    {
+                        'name': '제주공항',
+                        'category': '교통',
+                        'distance_from_route': 0.0
+                    },
+                    {
+                        'name': '성산일출봉',
+                        'category': '관광명소',
+                        'distance_from_route': 0.2
+                    }
+                ],
+                'voice_navigation': [
+                    '제주공항에서 출발합니다.',
+                    '해안도로를 따라 동쪽으로 이동합니다.',
+                    '성산일출봉에 도착했습니다.'
+                ],
+                'best_photo_spots': [
+                    {
+                        'coordinates': [126.7, 33.4],
+                        'description': '해안 전망 포인트',
+                        'scenery_score': 9.0
+                    }
+                ]
+            }
+        }
+        route_body = dumps(route)
+    return route_body, cache_source
+
+# /api/route/batch: 스레드 풀에서 compute_route 를 나눠 돌린다
+route_batches = RouteBatchRunner(compute_route)
+metrics.StatsCollector('vista_route_batch', route_batches.stats, '경로 일괄 계산 요청/항목 수', registry=VISTA_METRICS)
+metrics.Gauge('vista_route_batch_pending', '일괄 계산 대기/진행 중인 경로 수', route_batches.pending,
+              registry=VISTA_METRICS)
+
 @app.route('/api/route/calculate', methods=['POST'])
 def calculate_route():
     """경로 계산"""
@@ -57,69 +157,101 @@ def calculate_route():
         
         print(f"경로 계산 요청: {start_point} -> {end_point}")
         
-        if navigation_system:
-            # 실제 VISTA 시스템 사용
-            route = navigation_system.calculate_scenic_route(
-                start=start_point,
-                end=end_point,
-                preferences=preferences
-            )
-        else:
-            # 모의 응답
-            route = {
-                'distance': 25.4,
-                'duration': 1800,  # 30분
-                'geometry': {
-                    'coordinates': [
-                        [126.4933, 33.5066],  # 제주공항
-                        [126.4500, 33.4800],
-                        [126.4000, 33.4500],
-                        [126.9423, 33.4586]   # 성산일출봉
-                    ]
-                },
-                'jeju_features': {
-                    'total_scenery_score': 8.5,
-                    'route_pois': [
-                        {
-                            'name': '제주공항',
-                            'category': '교통',
-                            'distance_from_route': 0.0
-                        },
-                        {
-                            'name': '성산일출봉',
-                            'category': '관광명소',
-                            'distance_from_route': 0.2
-                        }
-                    ],
-                    'voice_navigation': [
-                        '제주공항에서 출발합니다.',
-                        '해안도로를 따라 동쪽으로 이동합니다.',
-                        '성산일출봉에 도착했습니다.'
-                    ],
-                    'best_photo_spots': [
-                        {
-                            'coordinates': [126.7, 33.4],
-                            'description': '해안 전망 포인트',
-                            'scenery_score': 9.0
-                        }
-                    ]
-                }
-            }
+        route_body, cache_source = compute_route(start_point, end_point, preferences)
         
-        return jsonify({
-            'success': True,
-            'route': route,
-            'calculation_time': datetime.now().isoformat()
-        })
+        response = json_response(route_response_body(route_body))
+        if cache_source:
+            response.headers['X-Route-Cache'] = cache_source
+        return response
         
     except Exception as e:
         print(f"경로 계산 오류: {e}")
         traceback.print_exc()
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/route/batch', methods=['POST'])
+def calculate_route_batch():
+    """여러 경로 일괄 계산. 끝난 순서대로 한 줄씩(NDJSON) 흘려 보낸다"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('routes')
+    error = route_batches.validate(items)
+    if error:
+        return json_response({'success': False, 'error': error}, 400)
+    try:
+        lines = route_batches.submit(items)
+    except BatchRejected as e:
+        return json_response({'success': False, 'error': str(e)}, 503)
+    print(f"경로 일괄 계산 요청: {len(items)}개")
+    return Response(lines, content_type=NDJSON_CONTENT_TYPE)
+
+def run_route_job(payload, progress):
+    """경로 작업: 명령 → 음성 인식 → 여행 계획 → 경로 계산 (route_plan 을 주면 계산만)"""
+    route_plan = payload.get('route_plan')
+    if interactive_navigator:
+        if route_plan is None:
+            progress('stt', 0.1)
+            stt_result = interactive_navigator.stt.recognize_voice(payload['command'])
+            progress('planning', 0.2)
+            route_plan = interactive_navigator.llm.analyze_and_plan(stt_result)
+        route = interactive_navigator.execute_route(route_plan, progress=progress)
+        if 'error' in route:
+            raise ValueError(route['error'])
+        return route
+    # 모의 응답
+    progress('routing', 0.3)
+    route_body, _ = compute_route(payload.get('start'), payload.get('end'), payload.get('preferences', {}))
+    return route_body
+
+# /api/route/jobs: 오래 걸리는 다중 경유지 경로를 워커 스레드에서 계산
+route_jobs = RouteJobQueue(run_route_job)
+metrics.StatsCollector('vista_route_jobs', route_jobs.stats, '경로 작업 제출/처리 수', registry=VISTA_METRICS)
+metrics.Gauge('vista_route_jobs_queued', '대기 중인 경로 작업 수', route_jobs.pending, registry=VISTA_METRICS)
+metrics.Gauge('vista_route_jobs_running', '계산 중인 경로 작업 수', route_jobs.running, registry=VISTA_METRICS)
+metrics.Gauge('vista_route_jobs_retained', '보관 중인 경로 작업 수', route_jobs.retained, registry=VISTA_METRICS)
+
+@app.route('/api/route/jobs', methods=['POST'])
+def create_route_job():
+    """경로 작업 생성. 작업 id 를 바로 돌려주고 계산은 워커가 한다"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('command'), str) and not isinstance(data.get('route_plan'), dict):
+        return json_response({'success': False, 'error': 'command 또는 route_plan 이 필요합니다'}, 400)
+    try:
+        job = route_jobs.submit(data)
+    except JobQueueFull as e:
+        response = json_response({'success': False, 'error': str(e)}, 503)
+        response.headers['Retry-After'] = '5'
+        return response
+    print(f"경로 작업 생성: {job.id}")
+    response = json_response({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/route/jobs/{job.id}',
+        'events_url': f'/api/route/jobs/{job.id}/events'
+    }, 202)
+    response.headers['Location'] = f'/api/route/jobs/{job.id}'
+    return response
+
+@app.route('/api/route/jobs/<job_id>', methods=['GET'])
+def get_route_job(job_id):
+    """경로 작업 상태 조회 (끝났으면 결과 포함)"""
+    job = route_jobs.get(job_id)
+    if job is None:
+        return json_response({'success': False, 'error': '작업이 없거나 보관 기간이 지났습니다'}, 404)
+    return json_response(job.to_json())
+
+@app.route('/api/route/jobs/<job_id>/events', methods=['GET'])
+def stream_route_job(job_id):
+    """경로 작업 진행 상황 SSE. 끝나면 done/failed 이벤트에 결과를 싣고 닫는다"""
+    job = route_jobs.get(job_id)
+    if job is None:
+        return json_response({'success': False, 'error': '작업이 없거나 보관 기간이 지났습니다'}, 404)
+    return Response(route_jobs.events(job), content_type=SSE_CONTENT_TYPE,
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/stt/recognize', methods=['POST'])
 def recognize_speech():
     """음성 인식"""
@@ -152,7 +284,7 @@ def recognize_speech():
         import random
         response = random.choice(mock_responses)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'result': response,
             'processing_time': datetime.now().isoformat()
@@ -160,7 +292,7 @@ def recognize_speech():
         
     except Exception as e:
         print(f"음성 인식 오류: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
@@ -207,7 +339,7 @@ def generate_travel_plan():
                 'description': 'AI가 분석한 맞춤형 제주도 여행 코스입니다.'
             }
         
-        return jsonify({
+        return json_response({
             'success': True,
             'plan': plan,
             'generated_at': datetime.now().isoformat()
@@ -215,77 +347,110 @@ def generate_travel_plan():
         
     except Exception as e:
         print(f"여행 계획 생성 오류: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
 
+# 앱이 쓰던 영문 카테고리 → 데이터베이스 카테고리
+POI_CATEGORY_ALIASES = {
+    'tourist_attraction': '관광명소',
+    'restaurant': '맛집',
+    'cafe': '핫플레이스',
+    'transportation': '교통'
+}
+POI_SEARCH_RADIUS_KM = float(os.getenv('POI_SEARCH_RADIUS_KM', 5))
+POI_SEARCH_MAX_LIMIT = 100
+
 @app.route('/api/poi/search', methods=['GET'])
 def search_poi():
-    """POI 검색"""
+    """POI 검색
+
+    lat/lng 가 있으면 가까운 순: radius_km 안의 POI, 또는 k 개의 최근접 POI.
+    radius_km 이 없으면 q 가 없을 때만 POI_SEARCH_RADIUS_KM 을 쓰고, q 가 있으면 멀어도 일치하는 POI 를 모두 거리순으로 준다.
+    없으면 q 일치도 순(q 도 없으면 평점 순). q 는 이름/키워드의 접두어, 초성, 부분/오타 일치로 찾는다.
+    limit/offset 으로 나눠 받는다.
+    """
     try:
         query = request.args.get('q', '')
         category = request.args.get('category')
-        lat = request.args.get('lat')
-        lng = request.args.get('lng')
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        radius_km = request.args.get('radius_km', type=float)
+        k = request.args.get('k', type=int)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), POI_SEARCH_MAX_LIMIT)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        if (lat is None) != (lng is None):
+            return json_response({'success': False, 'error': 'lat 과 lng 는 함께 숫자로 보내야 합니다'}, 400)
         
-        print(f"POI 검색: {query}, 카테고리: {category}")
+        print(f"POI 검색: {query}, 카테고리: {category}, 위치: {lat},{lng}")
         
-        # 모의 POI 데이터
-        pois = [
-            {
-                'id': 1,
-                'name': '오션뷰 에메 카페',
-                'category': 'cafe',
-                'rating': 4.8,
-                'distance': 2.3,
-                'coordinates': [126.3324, 33.4615],
-                'description': '인생샷 남기는 감성 카페, 바다 전망 최고',
-                'image_url': 'https://images.unsplash.com/photo-1554118811-1e0d58224f24?w=400'
-            },
-            {
-                'id': 2,
-                'name': '제주 흑돼지 맛집',
-                'category': 'restaurant',
-                'rating': 4.6,
-                'distance': 1.8,
-                'coordinates': [126.5312, 33.3617],
-                'description': '현지인 추천 제주 특산품 요리',
-                'image_url': 'https://images.unsplash.com/photo-1504674900247-0877df9cc836?w=400'
-            },
-            {
-                'id': 3,
-                'name': '성산일출봉',
-                'category': 'tourist_attraction',
-                'rating': 4.9,
-                'distance': 15.2,
-                'coordinates': [126.9423, 33.4586],
-                'description': '유네스코 세계자연유산, 일출 명소',
-                'image_url': 'https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=400'
-            }
-        ]
-        
-        # 카테고리별 필터링
-        if category:
-            pois = [poi for poi in pois if poi['category'] == category]
-        
-        # 검색어 필터링
-        if query:
-            pois = [poi for poi in pois if query.lower() in poi['name'].lower()]
+        category = POI_CATEGORY_ALIASES.get(category, category)
+        matches = poi_text_index.search(query) if query.strip() else None
+        if lat is None and matches is not None:
+            # 위치 없이 검색어만 있으면 일치도 순
+            found = [poi for poi, _, _ in matches
+                     if not category or category in (poi.get('category'), poi.get('type'))]
+            total = len(found)
+            pois = found[offset:offset + limit]
+        else:
+            ids = [poi['id'] for poi, _, _ in matches] if matches is not None else None
+            where = poi_index.matcher(category, ids)
+            distances = None
+            if lat is None:
+                positions = poi_index.ranked(where)
+                total = len(positions)
+                positions = positions[offset:offset + limit]
+            elif k is not None:
+                max_radius_m = radius_km * 1000 if radius_km is not None else None
+                positions, distances = poi_index.nearest(lng, lat, max(k, 0), where, max_radius_m)
+                total = len(positions)
+                positions, distances = positions[offset:offset + limit], distances[offset:offset + limit]
+            elif ids is not None and radius_km is None:
+                # "성산일출봉" 처럼 이름으로 찾을 때는 지금 위치에서 멀어도 찾아야 하므로 반경을 두지 않고,
+                # 전체 POI 대신 이름 일치 목록(최대 POI_TEXT_MAX_RESULTS 개)만 거리를 계산해 가까운 순으로
+                positions, distances, total = poi_index.by_distance(lng, lat, ids, poi_index.matcher(category),
+                                                                    limit=offset + limit)
+                positions, distances = positions[offset:], distances[offset:]
+            else:
+                radius_m = (radius_km if radius_km is not None else POI_SEARCH_RADIUS_KM) * 1000
+                positions, distances, total = poi_index.within(lng, lat, radius_m, where, limit=offset + limit)
+                positions, distances = positions[offset:], distances[offset:]
+            
+            pois = [poi_index.pois[pos] for pos in positions.tolist()]
+            if distances is not None:
+                # 거리(km)는 요청 위치에서 실제 하버사인 거리
+                pois = [{**poi, 'distance': round(d / 1000, 3)} for poi, d in zip(pois, distances.tolist())]
         
-        return jsonify({
+        return json_response({
             'success': True,
             'pois': pois,
-            'total_count': len(pois)
+            'total_count': total,
+            'offset': offset,
+            'next_offset': offset + len(pois) if offset + len(pois) < total else None
         })
         
     except Exception as e:
         print(f"POI 검색 오류: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/poi/autocomplete', methods=['GET'])
+def autocomplete_poi():
+    """입력 중인 검색어(자모 접두어 또는 초성)로 POI 이름 자동완성"""
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), POI_SEARCH_MAX_LIMIT)
+    suggestions = [{
+        'id': poi['id'],
+        'name': poi['name'],
+        'category': poi.get('category'),
+        'coordinates': poi['coordinates'],
+        'matched': term
+    } for poi, _, term in poi_text_index.suggest(query, limit)]
+    return json_response({'success': True, 'suggestions': suggestions})
+
 @app.route('/api/recommendations/routes', methods=['GET'])
 def get_recommended_routes():
     """추천 경로 가져오기"""
@@ -372,18 +537,22 @@ def get_recommended_routes():
             }
         ]
         
-        return jsonify({
+        return json_response({
             'success': True,
             'routes': routes
         })
         
     except Exception as e:
         print(f"추천 경로 조회 오류: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return VISTA_METRICS.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
 if __name__ == '__main__':
     print("🏝️ VISTA API 서버 시작 중...")
     print("React Native 앱과 연동 준비 완료")
@@ -0,0 +1,189 @@
+import json
+import math
+import os
+
+import numpy as np
+
+# /api/poi/search 공간 색인
+# 관광지 좌표를 POI_INDEX_CELL_M(m) 크기 격자 칸으로 나누고 칸 번호순으로 정렬해 둔다.
+# 격자 한 줄에 있는 칸들은 정렬 배열에서 연속 구간이라, 반경 검색은 경계 상자에 걸친 줄마다 searchsorted 두 번으로
+# 후보 구간을 꺼내고 후보에 대해서만 하버사인 거리를 계산한다.
+# k-최근접은 반경을 두 배씩 넓히며 k 개가 모일 때까지 반경 검색을 반복한다 (반경 안의 k 개가 곧 전체의 k-최근접).
+
+VISTA_POI_DB = os.getenv('VISTA_POI_DB', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                      'demo', 'jeju_database.json'))
+POI_INDEX_CELL_M = float(os.getenv('POI_INDEX_CELL_M', 500))
+
+EARTH_RADIUS_M = 6371000.0
+M_PER_DEG = math.pi * EARTH_RADIUS_M / 180
+
+
+def load_pois(db_path=VISTA_POI_DB, extra=None):
+    """jeju_database.json 의 poi 와 extra({카테고리: {이름: 정보}}, JejuTourismDatabase.poi_data)를 합친 목록
+
+    이름이 같으면 jeju_database.json 쪽을 쓴다. 좌표가 잘못된 항목은 건너뛴다.
+    """
+    merged = {}
+    try:
+        with open(db_path, 'r', encoding='utf-8') as f:
+            for name, info in json.load(f).get('poi', {}).items():
+                merged[name] = dict(info)
+    except (OSError, ValueError) as e:
+        print(f"POI 데이터베이스를 불러오지 못했습니다: {db_path} ({e})")
+    for category, pois in (extra or {}).items():
+        for name, info in pois.items():
+            merged.setdefault(name, {'category': category, **info})
+
+    pois = []
+    for name, info in merged.items():
+        try:
+            lng, lat = (float(v) for v in info['coordinates'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if math.isfinite(lng) and math.isfinite(lat) and -90 <= lat <= 90:
+            pois.append({'id': len(pois), 'name': name, **info, 'coordinates': [lng, lat]})
+    return pois
+
+
+def _haversine(lng, lat, lng_rad, lat_rad, cos_lat):
+    """(lng, lat) 에서 각 점까지 거리(m) 배열"""
+    lat1 = math.radians(lat)
+    a = (np.sin((lat_rad - lat1) / 2) ** 2
+         + math.cos(lat1) * cos_lat * np.sin((lng_rad - math.radians(lng)) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class PoiIndex:
+    def __init__(self, pois, cell_m=POI_INDEX_CELL_M):
+        self.cell_m = cell_m
+        count = len(pois)
+        coords = np.array([poi['coordinates'] for poi in pois], dtype=np.float64).reshape(count, 2)
+        lng, lat = coords[:, 0], coords[:, 1]
+        self._lng0 = float(lng.min()) if count else 0.0
+        self._lat0 = float(lat.min()) if count else 0.0
+        mid_lat = (self._lat0 + float(lat.max())) / 2 if count else 0.0
+        self._cell_lat = cell_m / M_PER_DEG
+        self._cell_lng = cell_m / (M_PER_DEG * max(math.cos(math.radians(mid_lat)), 0.01))
+        cols = ((lng - self._lng0) / self._cell_lng).astype(np.int64)
+        rows = ((lat - self._lat0) / self._cell_lat).astype(np.int64)
+        self._ncols = int(cols.max()) + 1 if count else 1
+        self._nrows = int(rows.max()) + 1 if count else 1
+
+        # 칸 번호순으로 정렬한 배열들. 위치(pos)는 이 정렬 순서 기준
+        cells = rows * self._ncols + cols
+        order = np.argsort(cells, kind='stable')
+        self._cells = cells[order]
+        self.pois = [pois[i] for i in order]
+        self._lng_rad = np.radians(lng[order])
+        self._lat_rad = np.radians(lat[order])
+        self._cos_lat = np.cos(self._lat_rad)
+        self._categories = np.array([str(poi.get('category', '')) for poi in self.pois])
+        self._types = np.array([str(poi.get('type', '')) for poi in self.pois])
+        self._ids = np.array([poi['id'] for poi in self.pois], dtype=np.int64)
+        # POI id → pos (load_pois 의 id 는 목록 위치라 0..count-1)
+        self._pos_of = np.empty(count, dtype=np.int64)
+        self._pos_of[self._ids] = np.arange(count)
+        ratings = np.array([float(poi.get('rating') or 0) for poi in self.pois])
+        # 위치 없이 검색하면 평점 높은 순
+        self._by_rating = np.lexsort((np.arange(count), -ratings)) if count else np.empty(0, dtype=np.int64)
+        # 데이터 밀도로 k-최근접 첫 반경을 어림한다
+        area = max(self._ncols * self._nrows, 1) * cell_m * cell_m
+        self._density = count / area
+
+    def __len__(self):
+        return len(self.pois)
+
+    def matcher(self, category=None, ids=None):
+        """where(pos 배열) → bool 배열. category 는 카테고리/유형, ids 는 허용할 POI id 목록. 조건이 없으면 None"""
+        if not category and ids is None:
+            return None
+        if ids is not None:
+            ids = np.fromiter(ids, dtype=np.int64)
+
+        def where(pos):
+            mask = np.ones(len(pos), dtype=bool)
+            if category:
+                mask &= (self._categories[pos] == category) | (self._types[pos] == category)
+            if ids is not None:
+                mask &= np.isin(self._ids[pos], ids)
+            return mask
+        return where
+
+    def _candidates(self, lng, lat, radius_m):
+        """(반경 경계 상자에 걸친 칸들의 pos 배열, 모든 칸을 덮었는지)"""
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        # 위도 lat 에서 반경 r 인 원의 최대 경도 차: asin(sin(r/R) / cos(lat))
+        ratio = math.sin(min(radius_m / EARTH_RADIUS_M, math.pi / 2)) / max(math.cos(math.radians(lat)), 1e-12)
+        dlng = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio)) * 1.000001 + 1e-9
+        col_lo = max(math.floor((lng - dlng - self._lng0) / self._cell_lng), 0)
+        col_hi = min(math.floor((lng + dlng - self._lng0) / self._cell_lng), self._ncols - 1)
+        row_lo = max(math.floor((lat - dlat - self._lat0) / self._cell_lat), 0)
+        row_hi = min(math.floor((lat + dlat - self._lat0) / self._cell_lat), self._nrows - 1)
+        covers_all = col_lo == 0 and row_lo == 0 and col_hi == self._ncols - 1 and row_hi == self._nrows - 1
+        if col_lo > col_hi or row_lo > row_hi or not self.pois:
+            return np.empty(0, dtype=np.int64), covers_all
+        if covers_all:
+            return np.arange(len(self.pois)), True
+        row_keys = np.arange(row_lo, row_hi + 1, dtype=np.int64) * self._ncols
+        starts = np.searchsorted(self._cells, row_keys + col_lo, 'left')
+        ends = np.searchsorted(self._cells, row_keys + col_hi, 'right')
+        ranges = [np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
+        if not ranges:
+            return np.empty(0, dtype=np.int64), False
+        return np.concatenate(ranges), False
+
+    def _within(self, lng, lat, radius_m, where):
+        pos, covers_all = self._candidates(lng, lat, radius_m)
+        if where is not None and len(pos):
+            pos = pos[where(pos)]
+        dist = _haversine(lng, lat, self._lng_rad[pos], self._lat_rad[pos], self._cos_lat[pos])
+        inside = dist <= radius_m
+        return pos[inside], dist[inside], covers_all
+
+    def within(self, lng, lat, radius_m, where=None, limit=None):
+        """반경 radius_m 안의 (pos 배열, 거리(m) 배열, 전체 개수). 가까운 순으로 앞에서 limit 개"""
+        pos, dist, _ = self._within(lng, lat, radius_m, where)
+        return self._closest(pos, dist, limit)
+
+    def by_distance(self, lng, lat, ids, where=None, limit=None):
+        """ids(POI id 목록)만 거리를 계산한 (pos 배열, 거리(m) 배열, 전체 개수). 가까운 순으로 앞에서 limit 개"""
+        pos = self._pos_of[np.fromiter(ids, dtype=np.int64)]
+        if where is not None and len(pos):
+            pos = pos[where(pos)]
+        dist = _haversine(lng, lat, self._lng_rad[pos], self._lat_rad[pos], self._cos_lat[pos])
+        return self._closest(pos, dist, limit)
+
+    @staticmethod
+    def _closest(pos, dist, limit):
+        total = len(pos)
+        if limit is not None and limit < total:
+            # 전체를 정렬하지 않고 가까운 limit 개만 골라 정렬
+            top = np.argpartition(dist, limit)[:limit]
+            pos, dist = pos[top], dist[top]
+        order = np.lexsort((pos, dist))
+        return pos[order], dist[order], total
+
+    def nearest(self, lng, lat, k, where=None, max_radius_m=None):
+        """가까운 순 k 개의 (pos 배열, 거리(m) 배열). max_radius_m 이 있으면 그 안에서만"""
+        if k <= 0 or not self.pois:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        radius = max(self.cell_m / 2, math.sqrt(k / (math.pi * self._density)) if self._density else self.cell_m)
+        while True:
+            if max_radius_m is not None:
+                radius = min(radius, max_radius_m)
+            pos, dist, covers_all = self._within(lng, lat, radius, where)
+            if len(pos) >= k or covers_all or radius == max_radius_m:
+                break
+            radius *= 2
+        if len(pos) > k:
+            top = np.argpartition(dist, k)[:k]
+            pos, dist = pos[top], dist[top]
+        order = np.lexsort((pos, dist))
+        return pos[order], dist[order]
+
+    def ranked(self, where=None):
+        """위치 없는 검색: 평점 높은 순 pos 배열"""
+        pos = self._by_rating
+        if where is not None and len(pos):
+            pos = pos[where(pos)]
+        return pos
@@ -0,0 +1,178 @@
+import os
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+# /api/poi/search 의 q, /api/poi/autocomplete 이름 색인
+# POI 이름과 keywords(voice_keywords) 하나하나를 검색어 항목으로 두고 세 가지로 찾는다.
+# - 자모 접두어: 한글을 초성/중성/종성 자모로 풀어(겹모음/겹받침도 나눔) 정렬해 두고 bisect 로 접두어 구간을 찾는다.
+#   입력 중인 "성사"/"성ㅅ" 도 "성산일출봉" 의 자모 앞부분이라 자동완성이 된다.
+# - 초성: "ㅅㅅㅇㅊㅂ" 처럼 자음만 입력하면 초성 문자열 접두어로 찾는다.
+# - 자모 3-gram 역색인: 중간 일치("일출봉")와 오타("썽산", "성산일출붕")를 공유 3-gram 비율로 점수를 매겨 찾는다.
+# 공백/문장부호는 무시한다 ("성산 일출봉" == "성산일출봉").
+
+POI_TEXT_MIN_SCORE = float(os.getenv('POI_TEXT_MIN_SCORE', 0.6))
+POI_TEXT_MAX_RESULTS = int(os.getenv('POI_TEXT_MAX_RESULTS', 500))
+NGRAM = 3
+
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ',
+             'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 두 번 눌러 입력하는 겹모음/겹받침은 나눠 두어야 입력 중인 글자도 접두어로 맞는다
+_SPLIT = {'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+          'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ',
+          'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'}
+
+_JAMO_TABLE = {ord(k): v for k, v in _SPLIT.items()}
+_CHOSEONG_TABLE = {}
+for _code in range(0xAC00, 0xD7A4):
+    _index = _code - 0xAC00
+    _cho, _jung, _jong = _index // 588, _index % 588 // 28, _index % 28
+    _JAMO_TABLE[_code] = (CHOSEONG[_cho] + _SPLIT.get(JUNGSEONG[_jung], JUNGSEONG[_jung])
+                          + _SPLIT.get(JONGSEONG[_jong], JONGSEONG[_jong]))
+    _CHOSEONG_TABLE[_code] = CHOSEONG[_cho]
+_CHOSEONG_SET = set(CHOSEONG)
+
+
+def normalize(text):
+    """NFC 로 합치고(맥/iOS 의 풀어 쓴 한글 포함) 소문자로, 공백/문장부호는 뺀다"""
+    return ''.join(ch for ch in unicodedata.normalize('NFC', text or '').lower() if ch.isalnum())
+
+
+def jamo(text):
+    """정규화한 문자열 → 자모 문자열 ("성산" → "ㅅㅓㅇㅅㅏㄴ")"""
+    return text.translate(_JAMO_TABLE)
+
+
+def choseong(text):
+    """정규화한 문자열 → 초성 문자열 ("성산일출봉" → "ㅅㅅㅇㅊㅂ")"""
+    return text.translate(_CHOSEONG_TABLE)
+
+
+def is_choseong(text):
+    return bool(text) and all(ch in _CHOSEONG_SET for ch in text)
+
+
+def ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class PoiTextIndex:
+    def __init__(self, pois, min_score=POI_TEXT_MIN_SCORE):
+        """pois: load_pois() 목록 (poi['id'] == 목록 위치)"""
+        self.pois = pois
+        self.min_score = min_score
+        terms, term_poi = [], []
+        for poi in pois:
+            seen = set()
+            for term in [poi['name'], *poi.get('keywords', []), *poi.get('voice_keywords', [])]:
+                key = normalize(term)
+                if key and key not in seen:
+                    seen.add(key)
+                    terms.append(term)
+                    term_poi.append(poi['id'])
+        self.terms = terms
+        self._term_poi = np.array(term_poi, dtype=np.int64)
+        ratings = np.array([float(poi.get('rating') or 0) for poi in pois])
+        self._term_rating = ratings[self._term_poi] if len(pois) else np.empty(0)
+
+        keys = [jamo(normalize(term)) for term in terms]
+        self._prefix_keys, self._prefix_terms, self._prefix_len = self._sorted(keys)
+        self._choseong_keys, self._choseong_terms, self._choseong_len = self._sorted(
+            [choseong(normalize(term)) for term in terms])
+
+        postings = {}
+        gram_counts = []
+        for term_id, key in enumerate(keys):
+            grams = ngrams(key)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(term_id)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._gram_counts = np.array(gram_counts, dtype=np.float64)
+
+    @staticmethod
+    def _sorted(keys):
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return ([keys[i] for i in order], np.array(order, dtype=np.int64),
+                np.array([len(keys[i]) for i in order], dtype=np.float64))
+
+    def _prefix(self, key, keys, term_ids, lengths, limit):
+        """접두어가 key 인 (항목 id 배열, 점수 배열). 점수 1~2: 입력이 항목 전체에 가까울수록(완전 일치 2) 높다"""
+        lo = bisect_left(keys, key)
+        hi = bisect_left(keys, key + '\uffff', lo)
+        ids = term_ids[lo:hi]
+        scores = 1 + len(key) / lengths[lo:hi]
+        if len(ids) > limit:
+            # 짧은 접두어는 구간이 넓다: 점수(+평점) 높은 limit 개만
+            top = np.argpartition(-(scores + self._term_rating[ids] * 1e-3), limit)[:limit]
+            ids, scores = ids[top], scores[top]
+        return ids, scores
+
+    def _min_shared(self, count):
+        """질의 gram count 개 중 최소 몇 개를 공유해야 min_score 에 닿을 수 있는지 (항목 gram 수 ≥ 공유 수로 잡은 상한)"""
+        for shared in range(1, count + 1):
+            if (shared / count + 2 * shared / (count + shared)) / 2 >= self.min_score:
+                return shared
+        return count + 1
+
+    def _fuzzy(self, key):
+        """자모 3-gram 을 공유하는 (항목 id 배열, 점수 배열). 점수 0~1: (질의 gram 일치 비율 + Dice 계수) / 2"""
+        grams = ngrams(key)
+        lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        need = self._min_shared(len(grams))
+        if len(lists) < need:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # 항목별 공유 gram 수: 정렬(np.unique) 대신 항목 수 길이 배열에 바로 센다 (목록 길이 합 + 항목 수에 비례)
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.terms))
+        ids = np.flatnonzero(counts >= need)
+        shared = counts[ids]
+        coverage = shared / len(grams)
+        dice = 2 * shared / (len(grams) + self._gram_counts[ids])
+        scores = (coverage + dice) / 2
+        keep = scores >= self.min_score
+        return ids[keep], scores[keep]
+
+    def _rank(self, matches, limit):
+        """[(항목 id 배열, 점수 배열), ...] → POI 별 최고 점수로 [(poi, 점수, 일치한 항목)] 점수/평점 순"""
+        matches = [(ids, scores) for ids, scores in matches if len(ids)]
+        if not matches:
+            return []
+        ids = np.concatenate([m[0] for m in matches])
+        scores = np.concatenate([m[1] for m in matches])
+        order = np.lexsort((-self._term_rating[ids], -scores))
+        ids, scores = ids[order], scores[order]
+        # 정렬된 순서에서 POI 마다 처음 나온 항목이 최고 점수
+        _, first = np.unique(self._term_poi[ids], return_index=True)
+        first.sort()
+        first = first[:limit]
+        return [(self.pois[self._term_poi[i]], float(s), self.terms[i])
+                for i, s in zip(ids[first].tolist(), scores[first].tolist())]
+
+    def search(self, text, limit=POI_TEXT_MAX_RESULTS):
+        """이름/키워드 검색. [(poi, 점수, 일치한 항목)] 일치도 순 (접두어 일치 1 이상, 부분/오타 일치 1 미만)"""
+        query = normalize(text)
+        if not query:
+            return []
+        if is_choseong(query):
+            return self._rank([self._prefix(query, self._choseong_keys, self._choseong_terms, self._choseong_len,
+                                            limit)], limit)
+        key = jamo(query)
+        prefix = self._prefix(key, self._prefix_keys, self._prefix_terms, self._prefix_len, limit)
+        if len(np.unique(self._term_poi[prefix[0]])) >= limit:
+            # 접두어 일치(점수 1 이상)만으로 limit 개가 차면 부분/오타 일치(1 미만)는 순위에 들지 못한다
+            return self._rank([prefix], limit)
+        return self._rank([prefix, self._fuzzy(key)], limit)
+
+    def suggest(self, text, limit=10):
+        """자동완성: 입력 중인 접두어(자모 또는 초성)로 [(poi, 점수, 일치한 항목)]"""
+        query = normalize(text)
+        if not query:
+            return []
+        if is_choseong(query):
+            found = self._prefix(query, self._choseong_keys, self._choseong_terms, self._choseong_len, limit * 4)
+        else:
+            found = self._prefix(jamo(query), self._prefix_keys, self._prefix_terms, self._prefix_len, limit * 4)
+        return self._rank([found], limit)
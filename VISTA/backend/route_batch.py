@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from responses import dumps
+
+# /api/route/batch: 여러 출발/도착 쌍을 워커 스레드에서 나눠 계산하고 끝난 순서대로 NDJSON 한 줄씩 흘려 보낸다
+# 모든 배치 요청이 같은 스레드 풀과 OSRM 커넥션 풀(keep-alive)을 나눠 쓴다.
+# 계산 대기/진행 중인 항목 수가 ROUTE_BATCH_MAX_PENDING 을 넘으면 새 배치는 바로 거절한다.
+
+ROUTE_BATCH_WORKERS = int(os.getenv('ROUTE_BATCH_WORKERS', 8))
+ROUTE_BATCH_MAX_ITEMS = int(os.getenv('ROUTE_BATCH_MAX_ITEMS', 50))
+ROUTE_BATCH_MAX_PENDING = int(os.getenv('ROUTE_BATCH_MAX_PENDING', 200))
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+
+class BatchRejected(Exception):
+    """대기 중인 항목이 너무 많아 배치를 받지 않음"""
+
+
+def create_routing_session(pool_size=ROUTE_BATCH_WORKERS):
+    """OSRM 호출용 세션. 워커 수만큼 keep-alive 커넥션을 재사용한다"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class RouteBatchRunner:
+    def __init__(self, compute, workers=ROUTE_BATCH_WORKERS, max_items=ROUTE_BATCH_MAX_ITEMS,
+                 max_pending=ROUTE_BATCH_MAX_PENDING):
+        """compute(start, end, preferences) → (경로 JSON bytes, 캐시 적중 여부)"""
+        self.compute = compute
+        self.max_items = max_items
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='route-batch')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats = {'batches': 0, 'items': 0, 'failed_items': 0, 'rejected': 0, 'cancelled': 0}
+
+    def validate(self, items):
+        """잘못된 요청이면 오류 메시지, 아니면 None"""
+        if not isinstance(items, list) or not items:
+            return 'routes 목록이 필요합니다'
+        if len(items) > self.max_items:
+            return f'한 번에 최대 {self.max_items}개까지 계산할 수 있습니다'
+        return None
+
+    def submit(self, items):
+        """항목을 스레드 풀에 넣고 NDJSON 줄(bytes)을 끝난 순서대로 내는 제너레이터를 돌려준다"""
+        with self._lock:
+            if self._pending + len(items) > self.max_pending:
+                self.stats['rejected'] += 1
+                raise BatchRejected('요청이 많아 잠시 후 다시 시도해 주세요')
+            self._pending += len(items)
+            self.stats['batches'] += 1
+            self.stats['items'] += len(items)
+        futures = {}
+        for index, item in enumerate(items):
+            future = self._pool.submit(self._compute_item, item)
+            future.add_done_callback(self._release)
+            futures[future] = index
+        return self._stream(items, futures, time.perf_counter())
+
+    def _compute_item(self, item):
+        if not isinstance(item, dict):
+            raise ValueError("각 항목은 start/end/preferences 객체여야 합니다")
+        return self.compute(item.get('start'), item.get('end'), item.get('preferences', {}))
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _stream(self, items, futures, started):
+        failed = 0
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                line, ok = self._line(index, items[index], future)
+                failed += not ok
+                yield line
+            yield dumps({'done': True, 'total': len(items), 'failed': failed,
+                         'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)}) + b'\n'
+        finally:
+            # 클라이언트가 끊으면 아직 시작하지 않은 항목은 계산하지 않는다
+            cancelled = sum(1 for future in futures if future.cancel())
+            if cancelled:
+                with self._lock:
+                    self.stats['cancelled'] += cancelled
+
+    def _line(self, index, item, future):
+        """(NDJSON 한 줄, 성공 여부). 실패한 항목은 success=false 와 error 로 알린다"""
+        head = {'index': index}
+        if isinstance(item, dict) and 'id' in item:
+            head['id'] = item['id']
+        try:
+            route_body, cache_source = future.result()
+        except Exception as e:
+            with self._lock:
+                self.stats['failed_items'] += 1
+            return dumps({**head, 'success': False, 'error': str(e)}) + b'\n', False
+        head['success'] = True
+        head['cache'] = cache_source
+        # 경로는 이미 직렬화된 bytes 라 닫는 중괄호 앞에 붙인다
+        return dumps(head)[:-1] + b',"route":' + route_body + b'}\n', True
+
+    def pending(self):
+        return self._pending
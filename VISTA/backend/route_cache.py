@@ -0,0 +1,223 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from responses import dumps
+from singleflight import SingleFlight
+
+# /api/route/calculate 경로 결과 캐시
+# 요청 대부분이 공항, 성산일출봉, 애월, 협재 같은 인기 출발/도착 쌍이라 OSRM 호출 + 제주 라벨링 결과를 재사용한다.
+# 키는 출발/도착 좌표를 ROUTE_CACHE_GRID(도) 격자에 맞춘 칸 번호 + 정렬한 preferences JSON.
+# 같은 칸 안의 요청은 처음 계산한 경로를 함께 쓴다 (기본 0.001도 ≈ 100m).
+# 값은 직렬화한 경로 JSON bytes 로 두어 적중 시 다시 인코딩하지 않고 바로 응답 본문에 붙인다.
+# 1차: 프로세스 내 TTL + LRU (항목 수/바이트 상한), 2차: 워커들이 함께 쓰는 SQLite 파일.
+# 동시에 같은 키를 놓친 요청들은 OSRM 호출 한 번으로 합친다.
+
+ROUTE_CACHE_GRID = float(os.getenv('ROUTE_CACHE_GRID', 0.001))
+ROUTE_CACHE_TTL = float(os.getenv('ROUTE_CACHE_TTL', 6 * 3600))
+ROUTE_CACHE_MAX_ENTRIES = int(os.getenv('ROUTE_CACHE_MAX_ENTRIES', 512))
+ROUTE_CACHE_MAX_BYTES = int(os.getenv('ROUTE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# 빈 값이면 프로세스 내 캐시만 쓴다
+ROUTE_CACHE_DB = os.getenv('ROUTE_CACHE_DB', 'route_cache.db')
+ROUTE_CACHE_DB_MAX_ENTRIES = int(os.getenv('ROUTE_CACHE_DB_MAX_ENTRIES', 20000))
+
+HIT, DISK_HIT, MISS = 'hit', 'disk_hit', 'miss'
+
+
+def _coordinate(point):
+    """[경도, 위도] 검증"""
+    try:
+        lng, lat = float(point[0]), float(point[1])
+    except (TypeError, ValueError, IndexError, KeyError):
+        raise ValueError(f"좌표는 [경도, 위도] 형식이어야 합니다: {point!r}")
+    if not (math.isfinite(lng) and math.isfinite(lat)):
+        raise ValueError(f"좌표 값이 올바르지 않습니다: {point!r}")
+    return lng, lat
+
+
+def route_key(start, end, preferences=None, grid=ROUTE_CACHE_GRID):
+    """격자 칸 번호 + 정렬한 preferences 로 만든 캐시 키"""
+    cells = []
+    for point in (start, end):
+        lng, lat = _coordinate(point)
+        cells.append(f"{round(lng / grid)},{round(lat / grid)}")
+    # None 과 {} 는 같은 기본 선호로 계산된다
+    prefs = json.dumps(preferences or {}, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return f"{';'.join(cells)}|{prefs}"
+
+
+class SQLiteRouteStore:
+    """여러 프로세스가 공유하는 SQLite 경로 저장소"""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS routes ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, now):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM routes WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return bytes(row[0]), row[1]
+
+    def set(self, key, value, expires_at):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO routes (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune(time.time())
+
+    def prune(self, now):
+        conn = self._conn()
+        conn.execute("DELETE FROM routes WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM routes WHERE key IN ("
+            "SELECT key FROM routes ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+
+
+class RouteCache:
+    def __init__(self, max_entries=ROUTE_CACHE_MAX_ENTRIES, max_bytes=ROUTE_CACHE_MAX_BYTES, ttl=ROUTE_CACHE_TTL,
+                 db_path=ROUTE_CACHE_DB, db_max_entries=ROUTE_CACHE_DB_MAX_ENTRIES, grid=ROUTE_CACHE_GRID):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.grid = grid
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._shared = SQLiteRouteStore(db_path, db_max_entries) if db_path else None
+        self._flights = SingleFlight()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'shared': 0, 'stores': 0, 'evictions': 0,
+                      'errors': 0}
+
+    def key(self, start, end, preferences=None):
+        return route_key(start, end, preferences, self.grid)
+
+    def get(self, key):
+        """(경로 JSON bytes, HIT/DISK_HIT) 또는 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1], HIT
+                self._remove(key)
+        if self._shared is not None:
+            try:
+                found = self._shared.get(key, now)
+            except sqlite3.Error as e:
+                print("경로 캐시 조회 오류:", str(e))
+                found = None
+            if found is not None:
+                value, expires_at = found
+                with self._lock:
+                    self._store(key, value, expires_at)
+                    self.stats['disk_hits'] += 1
+                return value, DISK_HIT
+        return None
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+            self.stats['stores'] += 1
+        if self._shared is not None:
+            try:
+                self._shared.set(key, value, expires_at)
+            except sqlite3.Error as e:
+                print("경로 캐시 저장 오류:", str(e))
+
+    def get_or_compute(self, start, end, preferences, compute):
+        """(경로 JSON bytes, HIT/DISK_HIT/MISS). compute() 는 경로 dict 를 돌려주고, None(경로 없음)은 저장하지 않는다"""
+        key = self.key(start, end, preferences)
+        found = self.get(key)
+        if found is not None:
+            return found
+
+        loaded = []
+
+        def load():
+            loaded.append(True)
+            # 기다리는 동안 다른 요청이 채웠을 수 있다
+            found = self.get(key)
+            if found is not None:
+                return found
+            with self._lock:
+                self.stats['misses'] += 1
+            try:
+                route = compute()
+            except Exception:
+                with self._lock:
+                    self.stats['errors'] += 1
+                raise
+            value = dumps(route)
+            if route is not None:
+                self.set(key, value)
+            return value, MISS
+
+        result = self._flights.do(key, load)
+        if not loaded:
+            # 같은 키를 계산 중인 요청의 결과를 받아 씀
+            with self._lock:
+                self.stats['shared'] += 1
+        return result
+
+    def _store(self, key, value, expires_at):
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, value)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats['evictions'] += 1
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def hit_ratio(self):
+        """OSRM 을 부르지 않고 응답한 비율 (계산 중인 결과를 함께 받은 요청 포함)"""
+        stats = self.stats
+        served = stats['hits'] + stats['disk_hits'] + stats['shared']
+        lookups = served + stats['misses']
+        return served / lookups if lookups else 0.0
+
+    def usage(self):
+        """(메모리 항목 수, 메모리 바이트)"""
+        with self._lock:
+            return len(self._entries), self._bytes
+
+    def __len__(self):
+        return len(self._entries)
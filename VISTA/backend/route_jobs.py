@@ -0,0 +1,190 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from responses import dumps
+
+# /api/route/jobs: 경유지가 많은 해안도로 경로처럼 수 초 걸리는 계산을 요청 스레드 밖에서 돌린다
+# POST 는 작업 id 만 바로 돌려주고, 크기가 제한된 큐의 워커 스레드가 계산한다.
+# 클라이언트는 GET 으로 상태를 조회(폴링)하거나 SSE(/events)로 진행 단계와 결과를 받는다.
+# 끝난 작업 결과는 ROUTE_JOB_TTL 초 동안(최대 ROUTE_JOB_MAX_RETAINED 개) 보관한다.
+
+ROUTE_JOB_WORKERS = int(os.getenv('ROUTE_JOB_WORKERS', 4))
+ROUTE_JOB_QUEUE_SIZE = int(os.getenv('ROUTE_JOB_QUEUE_SIZE', 32))
+ROUTE_JOB_TTL = float(os.getenv('ROUTE_JOB_TTL', 600))
+ROUTE_JOB_MAX_RETAINED = int(os.getenv('ROUTE_JOB_MAX_RETAINED', 1000))
+# 프록시가 유휴 연결을 끊지 않도록 SSE 주석 줄을 보내는 간격(초)
+ROUTE_JOB_SSE_HEARTBEAT = float(os.getenv('ROUTE_JOB_SSE_HEARTBEAT', 15))
+
+SSE_CONTENT_TYPE = 'text/event-stream; charset=utf-8'
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업이 너무 많아 받지 않음"""
+
+
+class RouteJob:
+    def __init__(self, payload):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.progress = 0.0
+        self.result = None  # 직렬화한 결과 JSON bytes
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.finished_at = None  # time.monotonic(), 보관 기간 계산용
+        self.version = 0
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def to_json(self):
+        """상태 JSON bytes. 끝난 작업은 결과(또는 오류)를 함께 싣는다"""
+        head = {'job_id': self.id, 'status': self.status, 'stage': self.stage, 'progress': self.progress,
+                'created_at': self.created_at, 'updated_at': self.updated_at}
+        if self.error is not None:
+            head['error'] = self.error
+        if self.result is None:
+            return dumps(head)
+        # 결과는 이미 직렬화된 bytes 라 폴링할 때마다 다시 인코딩하지 않고 붙인다
+        return dumps(head)[:-1] + b',"result":' + self.result + b'}'
+
+
+class RouteJobQueue:
+    """크기가 제한된 작업 큐와 워커 스레드로 경로 작업을 처리하고 결과를 잠시 보관"""
+
+    def __init__(self, run, workers=ROUTE_JOB_WORKERS, queue_size=ROUTE_JOB_QUEUE_SIZE, ttl=ROUTE_JOB_TTL,
+                 max_retained=ROUTE_JOB_MAX_RETAINED):
+        """run(payload, progress) → 결과 dict 또는 JSON bytes. progress(단계, 0~1) 로 진행 상황을 알린다"""
+        self.run = run
+        self.workers = workers
+        self.ttl = ttl
+        self.max_retained = max_retained
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._threads = []
+        self._lock = threading.Lock()
+        # 작업 상태가 바뀌면 SSE 구독자를 깨운다
+        self._changed = threading.Condition(self._lock)
+        self._running = 0
+        self.stats = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0, 'expired': 0}
+
+    def _ensure_started(self):
+        # gunicorn 이 워커를 fork 한 뒤에 스레드를 띄우도록 첫 제출 시점에 시작
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f'route-job-{i}', daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, payload):
+        """작업을 큐에 넣고 RouteJob 을 돌려준다. 큐가 가득 차면 JobQueueFull"""
+        self._ensure_started()
+        job = RouteJob(payload)
+        with self._lock:
+            self._purge(time.monotonic())
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.stats['rejected'] += 1
+                raise JobQueueFull('경로 계산 요청이 많아 잠시 후 다시 시도해 주세요')
+            self._jobs[job.id] = job
+            self.stats['submitted'] += 1
+        return job
+
+    def get(self, job_id):
+        """작업 또는 None (없거나 보관 기간이 지남)"""
+        with self._lock:
+            self._purge(time.monotonic())
+            return self._jobs.get(job_id)
+
+    def events(self, job, heartbeat=ROUTE_JOB_SSE_HEARTBEAT):
+        """SSE 이벤트(bytes) 제너레이터. 상태가 바뀔 때마다 progress, 끝나면 done/failed 를 보내고 닫는다"""
+        version = -1
+        while True:
+            with self._lock:
+                if job.version == version:
+                    self._changed.wait_for(lambda: job.version != version, timeout=heartbeat)
+                changed = job.version != version
+                version = job.version
+                body = job.to_json() if changed else None
+                finished = job.finished
+            if not changed:
+                yield b': keep-alive\n\n'
+                continue
+            event = job.status if finished else 'progress'
+            yield b'event: ' + event.encode() + b'\nid: ' + str(version).encode() + b'\ndata: ' + body + b'\n\n'
+            if finished:
+                return
+
+    def _update(self, job, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+            job.version += 1
+            self._changed.notify_all()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._process(job)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job):
+        with self._lock:
+            self._running += 1
+        self._update(job, status=RUNNING, stage=RUNNING)
+
+        def progress(stage, fraction):
+            self._update(job, stage=stage, progress=round(fraction, 2))
+
+        try:
+            result = self.run(job.payload, progress)
+            result = result if isinstance(result, bytes) else dumps(result)
+        except Exception as e:
+            print(f"경로 작업 {job.id} 실패: {e}")
+            self._finish(job, FAILED, error=str(e))
+        else:
+            self._finish(job, DONE, result=result)
+
+    def _finish(self, job, status, **fields):
+        with self._lock:
+            self._running -= 1
+            self.stats['completed' if status == DONE else 'failed'] += 1
+        self._update(job, status=status, stage=status, progress=1.0 if status == DONE else job.progress,
+                     finished_at=time.monotonic(), **fields)
+
+    def _purge(self, now):
+        # 보관 기간이 지났거나 보관 개수를 넘은 끝난 작업을 오래된 것부터 지운다 (대기/진행 중인 작업은 남긴다)
+        overflow = len(self._jobs) - self.max_retained
+        for job_id, job in list(self._jobs.items()):
+            if not job.finished:
+                continue
+            if overflow > 0 or job.finished_at + self.ttl <= now:
+                del self._jobs[job_id]
+                overflow -= 1
+                self.stats['expired'] += 1
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def running(self):
+        return self._running
+
+    def retained(self):
+        return len(self._jobs)
@@ -135,8 +135,10 @@ class JejuTourismDatabase:
 class JejuNavigationSystem:
     """제주도 특화 내비게이션 시스템"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.db = JejuTourismDatabase()
+        # API 서버는 워커 스레드들이 커넥션 풀을 함께 쓰도록 세션을 넘겨준다
+        self.session = session or requests.Session()
         self.current_weather = "맑음"
         self.current_time = datetime.now()
         
@@ -164,7 +166,7 @@ class JejuNavigationSystem:
         }
         
         try:
-            response = requests.get(osrm_url, params=params)
+            response = self.session.get(osrm_url, params=params, timeout=15)
             data = response.json()
             
             if data['code'] == 'Ok':
@@ -5,7 +5,7 @@ import math
 import os
 import webbrowser
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 class JejuDatabase:
     """jeju_database.json 파일을 관리하는 클래스"""
@@ -235,12 +235,15 @@ class InteractiveLLM:
         return min(average_score, 10.0)
 
 class InteractiveNavigator:
-    def __init__(self, db_path='jeju_database.json'):
+    def __init__(self, db_path='jeju_database.json', session: Optional[requests.Session] = None):
         self.db = JejuDatabase(db_path)
         self.stt = InteractiveSTT(self.db)
         self.llm = InteractiveLLM(self.db)
+        self.session = session or requests.Session()
         
-    def execute_route(self, route_plan: Dict) -> Dict:
+    def execute_route(self, route_plan: Dict, progress: Optional[Callable[[str, float], None]] = None) -> Dict:
+        """progress(단계, 0~1 진행률)가 주어지면 경로 계산 단계마다 알린다"""
+        progress = progress or (lambda stage, fraction: None)
         print("🗺️  경로 계산을 시작합니다...")
         start_poi = self.db.get_poi(route_plan["start_location"])
         end_poi = self.db.get_poi(route_plan["end_location"])
@@ -256,18 +259,22 @@ class InteractiveNavigator:
 
         if is_scenic_route:
             print("   🌊 해안도로 우선 경로로 계획합니다!")
-            osrm_route = self._get_scenic_coastal_route(start_coords, end_coords, route_plan)
+            progress("routing", 0.3)
+            osrm_route = self._get_scenic_coastal_route(start_coords, end_coords, route_plan, progress)
         else:
             print("   🚗 최적 경로로 계획합니다!")
+            progress("routing", 0.3)
             osrm_route = self._get_osrm_route(start_coords, end_coords)
         
         if osrm_route:
+            progress("guidance", 0.9)
             final_route = {**osrm_route, "llm_plan": route_plan, "voice_guidance": self._generate_voice_guidance(route_plan)}
             return final_route
         else:
             return {"error": "경로 계산에 실패했습니다"}
     
-    def _get_scenic_coastal_route(self, start: List[float], end: List[float], route_plan: Dict) -> Optional[Dict]:
+    def _get_scenic_coastal_route(self, start: List[float], end: List[float], route_plan: Dict,
+                                  progress: Optional[Callable[[str, float], None]] = None) -> Optional[Dict]:
         print("   🌊 해안도로 경유지를 추가하여 경로를 계산 중...")
         all_pois = self.db.get_all_pois()
         coastal_waypoints_info = [poi for poi in all_pois.values() if poi.get('road_type') == '해안도로' or '해안' in poi.get('type', '')]
@@ -301,26 +308,31 @@ class InteractiveNavigator:
         final_waypoint_coords = [start] + [wp['coords'] for wp in route_plan.get('waypoints', [])] + [end]
         
         print("   📍 해안도로 경유지 포함 {}개 지점으로 경로 탐색".format(len(final_waypoint_coords)))
-        return self._get_osrm_route_with_waypoints(final_waypoint_coords)
+        return self._get_osrm_route_with_waypoints(final_waypoint_coords, progress)
     
-    def _get_osrm_route_with_waypoints(self, waypoints: List[List[float]]) -> Optional[Dict]:
+    def _get_osrm_route_with_waypoints(self, waypoints: List[List[float]],
+                                       progress: Optional[Callable[[str, float], None]] = None) -> Optional[Dict]:
         if len(waypoints) < 2: return None
         coordinates_str = ";".join([f"{wp[0]},{wp[1]}" for wp in waypoints])
         osrm_url = f"http://router.project-osrm.org/route/v1/driving/{coordinates_str}"
         params = {'overview': 'full', 'geometries': 'geojson', 'steps': 'true'}
         
         try:
-            response = requests.get(osrm_url, params=params, timeout=15)
+            response = self.session.get(osrm_url, params=params, timeout=15)
             data = response.json()
             if data['code'] == 'Ok':
                 print("   ✅ 경로 계산 완료!")
                 return data['routes'][0]
-            else:
-                print("   ⚠️ 경로 계산 실패, 기본 경로로 재시도")
-                return self._get_osrm_route(waypoints[0], waypoints[-1])
+            print("   ⚠️ 경로 계산 실패: {}".format(data['code']))
         except Exception as e:
-            print("   ⚠️ OSRM 에러: {}, 기본 경로로 재시도".format(e))
-            return self._get_osrm_route(waypoints[0], waypoints[-1])
+            print("   ⚠️ OSRM 에러: {}".format(e))
+        # 경유지 경로가 실패하면 출발/도착 직선 경로로 한 번만 재시도 (두 지점 경로는 재시도하지 않는다)
+        if len(waypoints) == 2:
+            return None
+        print("   ↩️ 기본 경로로 재시도")
+        if progress:
+            progress("fallback", 0.6)
+        return self._get_osrm_route(waypoints[0], waypoints[-1])
 
     def _get_osrm_route(self, start: List[float], end: List[float]) -> Optional[Dict]:
         return self._get_osrm_route_with_waypoints([start, end])
@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+# OpenAI 등 느린 업스트림 호출의 동시 실행 수를 제한하는 admission controller
+# 자리가 없으면 우선순위 큐에서 기다리고, 큐 마감시간을 넘기면 바로 거절(load shedding)한다.
+
+LLM_MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', 6))
+LLM_QUEUE_DEADLINE = float(os.getenv('LLM_QUEUE_DEADLINE', 2.0))
+
+# 숫자가 작을수록 먼저 처리된다
+PRIORITY_SCHEDULE = 0
+PRIORITY_QUESTION = 1
+
+SHED_TEXT = "지금은 요청이 많아 답변이 어렵습니다. 잠시 후 다시 시도해 주세요."
+
+
+class Overloaded(Exception):
+    """큐 대기 시간이 마감을 넘겨 요청을 거절함"""
+
+
+class _Waiter:
+    __slots__ = ('granted', 'cancelled')
+
+    def __init__(self):
+        self.granted = False
+        self.cancelled = False
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight=LLM_MAX_IN_FLIGHT, queue_deadline=LLM_QUEUE_DEADLINE):
+        self.max_in_flight = max_in_flight
+        self.queue_deadline = queue_deadline
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._queued = 0
+        self.stats = {'admitted': 0, 'queued': 0, 'shed': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+    def in_flight(self):
+        return self._in_flight
+
+    def queue_depth(self):
+        return self._queued
+
+    def acquire(self, priority, timeout=None):
+        timeout = self.queue_deadline if timeout is None else timeout
+        start = time.monotonic()
+        with self._cond:
+            if self._in_flight < self.max_in_flight and not self._queued:
+                self._in_flight += 1
+                self.stats['admitted'] += 1
+                return 0.0
+            waiter = _Waiter()
+            heapq.heappush(self._heap, (priority, next(self._seq), waiter))
+            self._queued += 1
+            self.stats['queued'] += 1
+            deadline = start + timeout
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    waiter.cancelled = True
+                    self._queued -= 1
+                    self.stats['shed'] += 1
+                    raise Overloaded(f"대기 {timeout:.1f}초 초과")
+                self._cond.wait(remaining)
+            waited = time.monotonic() - start
+            self.stats['admitted'] += 1
+            self.stats['wait_seconds'] += waited
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+            return waited
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            while self._heap and self._in_flight < self.max_in_flight:
+                _, _, waiter = heapq.heappop(self._heap)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                self._queued -= 1
+                self._in_flight += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, priority, timeout=None):
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AsyncAdmissionController:
+    """asyncio 버전. 이벤트 루프 하나 안에서만 사용한다."""
+
+    def __init__(self, max_in_flight=LLM_MAX_IN_FLIGHT, queue_deadline=LLM_QUEUE_DEADLINE):
+        self.max_in_flight = max_in_flight
+        self.queue_deadline = queue_deadline
+        self._heap = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._queued = 0
+        self.stats = {'admitted': 0, 'queued': 0, 'shed': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+    def in_flight(self):
+        return self._in_flight
+
+    def queue_depth(self):
+        return self._queued
+
+    async def acquire(self, priority, timeout=None):
+        timeout = self.queue_deadline if timeout is None else timeout
+        if self._in_flight < self.max_in_flight and not self._queued:
+            self._in_flight += 1
+            self.stats['admitted'] += 1
+            return 0.0
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), future))
+        self._queued += 1
+        self.stats['queued'] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+                self._queued -= 1
+            raise
+        except asyncio.TimeoutError:
+            # 타임아웃과 같은 순간에 자리를 받았으면 그대로 진행한다
+            if not (future.done() and not future.cancelled()):
+                future.cancel()
+                self._queued -= 1
+                self.stats['shed'] += 1
+                raise Overloaded(f"대기 {timeout:.1f}초 초과")
+        waited = time.monotonic() - start
+        self.stats['admitted'] += 1
+        self.stats['wait_seconds'] += waited
+        self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+        return waited
+
+    def release(self):
+        self._in_flight -= 1
+        while self._heap and self._in_flight < self.max_in_flight:
+            _, _, future = heapq.heappop(self._heap)
+            if future.cancelled():
+                continue
+            future.set_result(True)
+            self._queued -= 1
+            self._in_flight += 1
+
+    @asynccontextmanager
+    async def admit(self, priority, timeout=None):
+        await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# /question 답변 캐시
+# 정규화한 질문을 키로 TTL + LRU 방식의 프로세스 내 캐시를 두고,
+# ANSWER_CACHE_DB가 설정되면 SQLite 파일을 gunicorn 워커들이 함께 쓰는 2차 캐시로 사용한다.
+
+ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', 3600))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', 1024))
+ANSWER_CACHE_DB = os.getenv('ANSWER_CACHE_DB')
+
+_STRIP_CATEGORIES = ('P', 'Z', 'C')
+
+
+def normalize_utterance(text):
+    """유니코드 정규화 후 공백/문장부호를 제거하고 소문자로 바꾼다"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ''.join(ch for ch in text if unicodedata.category(ch)[0] not in _STRIP_CATEGORIES)
+
+
+class SQLiteAnswerStore:
+    """여러 프로세스가 공유하는 SQLite 답변 저장소"""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, now):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM answers WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return row[0], row[1]
+
+    def set(self, key, value, expires_at):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO answers (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune(time.time())
+
+    def prune(self, now):
+        conn = self._conn()
+        conn.execute("DELETE FROM answers WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM answers WHERE key IN ("
+            "SELECT key FROM answers ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+
+class AnswerCache:
+    def __init__(self, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL, db_path=ANSWER_CACHE_DB):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = SQLiteAnswerStore(db_path, max_entries) if db_path else None
+        self.stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, question):
+        key = normalize_utterance(question)
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+        if self._shared is not None:
+            try:
+                found = self._shared.get(key, now)
+            except sqlite3.Error as e:
+                print("답변 캐시 조회 오류:", str(e))
+                found = None
+            if found is not None:
+                value, expires_at = found
+                with self._lock:
+                    self._store(key, value, expires_at)
+                    self.stats['shared_hits'] += 1
+                return value
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, question, answer):
+        key = normalize_utterance(question)
+        if not key:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, answer, expires_at)
+        if self._shared is not None:
+            try:
+                self._shared.set(key, answer, expires_at)
+            except sqlite3.Error as e:
+                print("답변 캐시 저장 오류:", str(e))
+
+    def _store(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,158 +1,253 @@
 import os
+import threading
 import time
-import json
 
-# 서비스 계정 JSON을 환경변수에서 읽어 파일로 저장
-GOOGLE_CREDENTIALS_ENV = os.getenv('GOOGLE_CREDENTIALS')
-if GOOGLE_CREDENTIALS_ENV:
-    with open('credentials.json', 'w') as f:
-        f.write(GOOGLE_CREDENTIALS_ENV)
-
-from flask import Flask, jsonify, request
-import openai
+from flask import Flask, request
 from datetime import datetime
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 
-application = Flask(__name__)
+import kakao_callback
+import calendar_queue
+import calendar_index
+from calendar_client import CalendarClientPool
+from singleflight import SingleFlight
+import admission
+import deadline
+from circuit_breaker import CircuitBreaker
+import idempotency
+import router
+import metrics
+import responses
+import skills
+from responses import simple_text
 
-SCOPES = ['https://www.googleapis.com/auth/calendar']
-CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
+application = Flask(__name__)
 
-# Google Calendar API 서비스 계정 인증
+# Google Calendar API 서비스 계정 인증 (워커당 한 번 로드 후 재사용)
+# 인증정보는 GOOGLE_CREDENTIALS 환경 변수에서 메모리로 바로 읽는다 (credentials.json 을 쓰지 않음)
+calendar_clients = CalendarClientPool()
 
 def get_google_calendar_service():
-    credentials = service_account.Credentials.from_service_account_file(
-        CREDENTIALS_FILE, 
-        scopes=SCOPES
-    )
-    return build('calendar', 'v3', credentials=credentials)
-
-def build_gpt_prompt_for_schedule(user_input, today_str):
-    return f"""
-아래 문장에서 날짜와 시작/종료 시간을 ISO 8601 포맷(YYYY-MM-DDTHH:MM:SS)으로 추출해서 JSON으로 반환해줘.
-오늘 날짜는 {today_str}야.
-만약 일정 제목(요약)이 있으면 summary 필드도 포함해줘.
-
-예시 입력: "내일 오후 3시부터 4시 회의"
-예시 출력: {{"start_datetime": "2025-05-11T15:00:00", "end_datetime": "2025-05-11T16:00:00", "summary": "회의"}}
+    return calendar_clients.service()
+
+# 다가오는 일정을 증분 동기화한 로컬 인덱스 (겹침 확인, 내 일정 보기)
+calendar_sync = None
+if calendar_index.CALENDAR_SYNC and os.getenv('GOOGLE_CALENDAR_ID'):
+    calendar_sync = calendar_index.CalendarSync(get_google_calendar_service, os.getenv('GOOGLE_CALENDAR_ID'))
+
+# 동시에 들어온 같은 프롬프트는 OpenAI 호출 한 번으로 합쳐서 결과를 나눠 준다
+gpt_flights = SingleFlight()
+# 동시 OpenAI 호출 수 제한. /schedule 이 /question 보다 먼저 자리를 받는다
+llm_admission = admission.AdmissionController()
+# 업스트림별 서킷 브레이커: 연속 실패하면 한동안 호출하지 않고 바로 안내 응답
+openai_breaker = CircuitBreaker('openai')
+calendar_breaker = CircuitBreaker('calendar')
+
+calendar_writer = None
+if calendar_queue.CALENDAR_WRITE_BEHIND:
+    calendar_writer = calendar_queue.CalendarWriteBehindQueue(get_google_calendar_service, breaker=calendar_breaker)
+
+# 빠른 기동: openai / googleapiclient 는 모듈 로드 때 가져오지 않는다.
+# 워커가 포트를 연 뒤(gunicorn post_worker_init) 또는 첫 요청 때 백그라운드 스레드에서 미리 준비한다.
+_warm_up_lock = threading.Lock()
+_warm_up_started = False
+warm_up_stats = {'seconds': 0.0, 'errors': 0}
+
+def warm_up():
+    """무거운 클라이언트를 미리 불러오고 캘린더 백그라운드 스레드를 시작한다 (워커당 한 번)"""
+    global _warm_up_started
+    if _warm_up_started:
+        return
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=_warm_up_clients, name='warm-up', daemon=True).start()
+
+def _warm_up_clients():
+    # 첫 /question 이 기다리지 않도록 openai 부터 가져오고, 동기화 스레드는 import 가 끝난 뒤 시작해
+    # 여러 스레드가 동시에 import 하며 GIL 을 다투지 않게 한다
+    started = time.monotonic()
+    try:
+        import openai  # noqa: F401
+        questions.warm_up()
+        if os.getenv('GOOGLE_CALENDAR_ID'):
+            calendar_clients.warm_up()
+    except Exception as e:
+        warm_up_stats['errors'] += 1
+        print("워밍업 실패:", str(e))
+    warm_up_stats['seconds'] = time.monotonic() - started
+    if calendar_writer is not None:
+        calendar_writer.start()
+    if calendar_sync is not None:
+        calendar_sync.start()
+
+@application.before_request
+def ensure_warm_up():
+    # post_worker_init 훅 없이 띄운 경우(flask run 등)를 위한 대비
+    warm_up()
+
+@application.before_request
+def start_deadline():
+    # 카카오 스킬 타임아웃 안에서 모든 업스트림 호출이 남은 시간만 쓰도록 요청마다 마감시간을 잡는다
+    deadline.start()
+
+def create_chat_completion(content, timeout=25, key=None, priority=admission.PRIORITY_QUESTION, messages=None,
+                           model=router.ROUTER_FULL_MODEL, max_tokens=None):
+    def call():
+        import openai
+        # 브레이커가 열려 있으면 대기열에 들어가지도 않는다
+        openai_breaker.check()
+        with llm_admission.admit(priority, timeout=deadline.timeout(llm_admission.queue_deadline)):
+            deadline.require(deadline.MIN_UPSTREAM_SECONDS, 'OpenAI 호출')
+            openai.api_key = os.getenv('OPENAI_API_KEY')
+            options = {'max_tokens': max_tokens} if max_tokens else {}
+            request_timeout = deadline.timeout(timeout)
+            try:
+                with openai_breaker.guard(request_timeout, timeout), metrics.upstream('openai'):
+                    # openai 0.27 의 timeout 은 HTTP 요청을 끊지 않으므로 request_timeout 으로 남은 시간을 넘긴다
+                    completion = openai.ChatCompletion.create(
+                        model=model,
+                        messages=messages or [{"role": "user", "content": content}],
+                        request_timeout=request_timeout,
+                        **options
+                    )
+            except openai.error.Timeout as e:
+                raise TimeoutError(str(e)) from e
+            return completion.choices[0].message.content
+    return gpt_flights.do(key or content, call, timeout=deadline.timeout(timeout + llm_admission.queue_deadline))
+
+def answer_question(pending, timeout=25):
+    started = time.perf_counter()
+    try:
+        with metrics.span('question', 'gpt'), metrics.span('question', f"route_{pending.decision.route}"):
+            gpt_response = create_chat_completion(pending.user_input, timeout=timeout,
+                                                  **questions.completion(pending))
+        questions.answered(pending, gpt_response)
+        response = simple_text(gpt_response)
+    except Exception as e:
+        response = simple_text(skills.upstream_error_text(e, "AI 답변 중 오류가 발생했습니다"))
+    questions.log(pending, time.perf_counter() - started)
+    return response
 
-입력: "{user_input}"
-"""
+# FAQ, 질문 라우터, 답변 캐시, 대화 기억 (asgi_app.py 와 같은 처리)
+questions = skills.Questions()
+callback_dispatcher = kakao_callback.CallbackDispatcher()
 
 @application.route("/question", methods=["POST"])
+@metrics.timed('question')
 def question():
     request_data = request.get_json()
-    user_input = request_data['action']['params'].get('question')
+    user_input = skills.utterance(request_data)
     if not user_input:
-        return jsonify({"version": "2.0", "template": {"outputs": [{"simpleText": {"text": "AI에게 할 말을 입력해 주세요."}}]}})
-    openai.api_key = os.getenv('OPENAI_API_KEY')
+        return responses.text_response(skills.EMPTY_QUESTION_TEXT)
+
+    user_id = kakao_callback.get_user_id(request_data)
+    answer, pending = questions.answer_locally(user_input, user_id)
+    if answer is not None:
+        return responses.text_response(answer)
+
+    # 콜백이 설정된 블록이면 즉시 응답하고 답변은 callbackUrl로 전송
+    callback_url = kakao_callback.get_callback_url(request_data)
+    if callback_url and kakao_callback.CALLBACK_ENABLED:
+        submitted = callback_dispatcher.submit(callback_url, lambda remaining: _answer_in_callback(remaining, pending))
+        if not submitted:
+            return responses.text_response(kakao_callback.BUSY_TEXT)
+        return responses.json_response(kakao_callback.ack_response())
+
+    return responses.json_response(answer_question(pending))
+
+def _answer_in_callback(remaining, pending):
+    # 콜백 작업은 카카오 스킬 타임아웃 대신 콜백 마감시간 안에서 처리한다
+    with deadline.scope(remaining):
+        return answer_question(pending, timeout=min(25, remaining))
+
+def register_schedule(user_input, key=None, user_id=None):
+    """일정을 해석해 등록하고 (응답, 보관 여부)를 돌려준다. 등록에 성공한 응답만 보관하고 나머지는 재전송 때 다시 처리한다."""
+    # 단순한 문장은 로컬 규칙 파서로 바로 처리하고, 확신할 수 없을 때만 GPT 호출
+    now = datetime.now()
+    schedule = skills.local_schedule(user_input, now)
+    if schedule is None:
+        prompt = skills.schedule_prompt(user_input, now)
+        try:
+            with metrics.span('schedule', 'gpt'):
+                gpt_response = create_chat_completion(
+                    prompt, key=('schedule', prompt), priority=admission.PRIORITY_SCHEDULE
+                )
+        except Exception as e:
+            return simple_text(skills.upstream_error_text(e, "GPT 호출 오류")), False
+
+    # Google Calendar API에 등록
     try:
-        completion = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": user_input}],
-            timeout=25
-        )
-        gpt_response = completion.choices[0].message.content
-        response = {
-            "version": "2.0",
-            "template": {
-                "outputs": [{
-                    "simpleText": {
-                        "text": gpt_response
-                    }
-                }]
-            }
-        }
+        if schedule is None:
+            schedule = skills.parse_gpt_schedule(gpt_response)
+        calendar_id, event = skills.build_event(schedule, key, user_id, calendar_sync)
+        if calendar_writer is not None:
+            # 검증된 일정은 큐에 넣고 바로 응답, 실제 등록은 백그라운드 배치로 처리
+            with metrics.span('schedule', 'calendar_enqueue'):
+                calendar_writer.enqueue(calendar_id, event)
+        else:
+            # 스킬 타임아웃 안에 끝낼 수 없는 등록은 시작하지 않는다 (카카오가 끊은 뒤 등록되는 일 방지)
+            calendar_breaker.check()
+            deadline.require(calendar_breaker.expected_seconds(1.0), '캘린더 등록')
+            with metrics.span('schedule', 'calendar_insert'), calendar_breaker.guard(), metrics.upstream('calendar'):
+                from googleapiclient.errors import HttpError
+                service = get_google_calendar_service()
+                try:
+                    service.events().insert(
+                        calendarId=calendar_id,
+                        body=event,
+                        sendUpdates='all'
+                    ).execute()
+                except HttpError as e:
+                    # 같은 id의 일정이 이미 있으면 앞선 요청이 등록한 것
+                    if e.resp.status != 409:
+                        raise
+        if calendar_sync is not None:
+            calendar_sync.record_local(event)
+        return skills.registered_response(schedule), True
     except Exception as e:
-        response = {
-            "version": "2.0",
-            "template": {
-                "outputs": [{
-                    "simpleText": {
-                        "text": f"AI 답변 중 오류가 발생했습니다: {str(e)}"
-                    }
-                }]
-            }
-        }
-    return jsonify(response)
+        return skills.schedule_error(e)
+
+# 카카오 재전송으로 같은 일정 요청이 다시 오면 처음 결과를 그대로 돌려준다
+schedule_requests = idempotency.IdempotentRequests()
 
 @application.route("/schedule", methods=["POST"])
+@metrics.timed('schedule')
 def schedule_meeting():
     request_data = request.get_json()
-    user_input = request_data['action']['params'].get('question')
+    user_input = skills.utterance(request_data)
     if not user_input:
-        return jsonify({"version": "2.0", "template": {"outputs": [{"simpleText": {"text": "일정 내용을 입력해 주세요."}}]}})
-
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    prompt = build_gpt_prompt_for_schedule(user_input, today_str)
+        return responses.text_response(skills.EMPTY_SCHEDULE_TEXT)
 
-    # GPT 호출
-    openai.api_key = os.getenv('OPENAI_API_KEY')
+    user_id = kakao_callback.get_user_id(request_data)
+    key = idempotency.request_key(user_id, user_input)
+    if key is None:
+        response, _ = register_schedule(user_input)
+        return responses.json_response(response)
     try:
-        completion = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            timeout=25
-        )
-        gpt_response = completion.choices[0].message.content
-    except Exception as e:
-        return jsonify({"version": "2.0", "template": {"outputs": [{"simpleText": {"text": f"GPT 호출 오류: {str(e)}"}}]}})
+        return responses.json_response(schedule_requests.do(key, lambda: register_schedule(user_input, key, user_id)))
+    except idempotency.InProgress:
+        return responses.text_response(idempotency.IN_PROGRESS_TEXT)
+
+@application.route("/my_schedule", methods=["POST"])
+@metrics.timed('my_schedule')
+def my_schedule():
+    # "내 일정 보기": Calendar API 호출 없이 로컬 인덱스에서 이 사용자가 등록한 일정만 보여준다
+    request_data = request.get_json()
+    text = skills.my_schedule_text(calendar_sync, kakao_callback.get_user_id(request_data), calendar_writer)
+    return responses.text_response(text)
 
-    # GPT 응답에서 JSON 파싱
-    try:
-        parsed = json.loads(gpt_response)
-        start_datetime = parsed["start_datetime"]
-        end_datetime = parsed["end_datetime"]
-        summary = parsed.get("summary", "상담 일정")
-    except Exception as e:
-        return jsonify({"version": "2.0", "template": {"outputs": [{"simpleText": {"text": f"GPT 응답 파싱 오류: {str(e)}\n{gpt_response}"}}]}})
+questions.register_metrics()
+skills.register_upstream_metrics(gpt_flights, llm_admission, openai_breaker, calendar_breaker,
+                                 schedule_requests, calendar_sync, calendar_writer, warm_up_stats)
+metrics.StatsCollector('kakao_chatbot_kakao_callback', callback_dispatcher.stats, '콜백 작업 처리 수')
+metrics.Gauge('kakao_chatbot_callback_queue_depth', '콜백 작업 대기 수', callback_dispatcher.pending)
 
-    # Google Calendar API에 등록
-    try:
-        service = get_google_calendar_service()
-        calendar_id = os.getenv('GOOGLE_CALENDAR_ID')
-        event = {
-            'summary': summary,
-            'description': f'카카오톡 챗봇을 통한 상담 예약',
-            'start': {
-                'dateTime': start_datetime,
-                'timeZone': 'Asia/Seoul',
-            },
-            'end': {
-                'dateTime': end_datetime,
-                'timeZone': 'Asia/Seoul',
-            },
-        }
-        print("event 데이터:", json.dumps(event, ensure_ascii=False))
-        service.events().insert(
-            calendarId=calendar_id,
-            body=event,
-            sendUpdates='all'
-        ).execute()
-        response = {
-            "version": "2.0",
-            "template": {
-                "outputs": [{
-                    "simpleText": {
-                        "text": f"상담 일정이 성공적으로 등록되었습니다!\n{summary}\n{start_datetime} ~ {end_datetime}"
-                    }
-                }]
-            }
-        }
-    except Exception as e:
-        response = {
-            "version": "2.0",
-            "template": {
-                "outputs": [{
-                    "simpleText": {
-                        "text": f"일정 등록 중 오류가 발생했습니다: {str(e)}"
-                    }
-                }]
-            }
-        }
-    return jsonify(response)
+@application.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return metrics.REGISTRY.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
+    warm_up()
     application.run(host='0.0.0.0', port=port, debug=False) 
\ No newline at end of file
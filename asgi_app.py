@@ -0,0 +1,382 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+import httpx
+
+import admission
+import calendar_index
+import calendar_queue
+import deadline
+import idempotency
+import kakao_callback
+import metrics
+import responses
+import router
+import skills
+from calendar_client import CALENDAR_API_ENDPOINT, CalendarClientPool
+from circuit_breaker import CircuitBreaker
+from responses import simple_text
+from singleflight import AsyncSingleFlight
+
+# ASGI 서빙 모드
+# app.py(Flask)와 같은 /question, /schedule 스킬을 asyncio로 처리한다.
+# OpenAI와 Calendar 호출은 워커당 하나의 커넥션 풀(httpx.AsyncClient)을 공유하므로
+# 느린 업스트림 호출 수백 개를 스레드 없이 동시에 붙잡고 있을 수 있다.
+# 발화 해석/검증/응답 문구는 app.py 와 같은 skills.py 를 쓰고, SQLite/파일을 건드리는 단계
+# (대화 기억, 답변 캐시, 재전송 판별, 캘린더 큐, 인증정보 읽기)는 이벤트 루프를 막지 않도록 스레드 풀에서 돌린다.
+#
+#   SERVER_MODE=asgi gunicorn asgi_app:app --config gunicorn_config.py
+
+OPENAI_API_BASE = os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')
+OPENAI_MODEL = router.ROUTER_FULL_MODEL
+CALENDAR_API_BASE = (CALENDAR_API_ENDPOINT or 'https://www.googleapis.com/').rstrip('/') + '/calendar/v3'
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 200))
+HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', 50))
+UPSTREAM_TIMEOUT = 25
+
+
+class ChatbotState:
+    """워커 프로세스(이벤트 루프) 하나에 묶인 공유 자원"""
+
+    def __init__(self):
+        self.client = None
+        self.questions = skills.Questions()
+        self.calendar_clients = CalendarClientPool()
+        self.gpt_flights = AsyncSingleFlight()
+        self.llm_admission = admission.AsyncAdmissionController()
+        self.openai_breaker = CircuitBreaker('openai')
+        self.calendar_breaker = CircuitBreaker('calendar')
+        self.calendar_writer = None
+        if calendar_queue.CALENDAR_WRITE_BEHIND:
+            self.calendar_writer = calendar_queue.CalendarWriteBehindQueue(self.calendar_clients.service,
+                                                                           breaker=self.calendar_breaker)
+        self.callback_tasks = set()
+        # kakao_callback.CallbackDispatcher.stats 와 같은 키 (app.py 와 같은 지표 이름으로 보낸다)
+        self.callback_stats = {'submitted': 0, 'rejected': 0, 'delivered': 0, 'expired': 0, 'failed': 0}
+        self.schedule_requests = idempotency.AsyncIdempotentRequests()
+        self.calendar_sync = None
+        if calendar_index.CALENDAR_SYNC and os.getenv('GOOGLE_CALENDAR_ID'):
+            self.calendar_sync = calendar_index.CalendarSync(self.calendar_clients.service,
+                                                             os.getenv('GOOGLE_CALENDAR_ID'))
+        self._warm_up_lock = threading.Lock()
+        self._warm_up_started = False
+        self.warm_up_stats = {'seconds': 0.0, 'errors': 0}
+
+    def warm_up(self):
+        """Calendar 인증정보와 discovery 문서를 백그라운드 스레드에서 미리 준비한다 (워커당 한 번)"""
+        with self._warm_up_lock:
+            if self._warm_up_started:
+                return
+            self._warm_up_started = True
+        threading.Thread(target=self._warm_up_clients, name='warm-up', daemon=True).start()
+
+    def _warm_up_clients(self):
+        started = time.monotonic()
+        try:
+            self.questions.warm_up()
+            if os.getenv('GOOGLE_CALENDAR_ID'):
+                self.calendar_clients.warm_up()
+        except Exception as e:
+            self.warm_up_stats['errors'] += 1
+            print("워밍업 실패:", str(e))
+        self.warm_up_stats['seconds'] = time.monotonic() - started
+
+    async def startup(self):
+        self.warm_up()
+        self.client = httpx.AsyncClient(
+            timeout=UPSTREAM_TIMEOUT,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+        )
+        if self.calendar_writer is not None:
+            self.calendar_writer.start()
+        if self.calendar_sync is not None:
+            self.calendar_sync.start()
+
+    async def shutdown(self):
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def http(self):
+        if self.client is None:
+            await self.startup()
+        return self.client
+
+
+state = ChatbotState()
+# gunicorn_config.post_worker_init 가 찾는 진입점
+warm_up = state.warm_up
+
+
+async def create_chat_completion(content, timeout=UPSTREAM_TIMEOUT, key=None,
+                                 priority=admission.PRIORITY_QUESTION, messages=None, model=OPENAI_MODEL,
+                                 max_tokens=None):
+    async def call():
+        # 브레이커가 열려 있으면 대기열에 들어가지도 않는다
+        state.openai_breaker.check()
+        async with state.llm_admission.admit(priority, timeout=deadline.timeout(state.llm_admission.queue_deadline)):
+            deadline.require(deadline.MIN_UPSTREAM_SECONDS, 'OpenAI 호출')
+            client = await state.http()
+            request_timeout = deadline.timeout(timeout)
+            try:
+                with state.openai_breaker.guard(request_timeout, timeout), metrics.upstream('openai'):
+                    resp = await client.post(
+                        f"{OPENAI_API_BASE}/chat/completions",
+                        headers={"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}"},
+                        json=dict({"model": model, "messages": messages or [{"role": "user", "content": content}]},
+                                  **({"max_tokens": max_tokens} if max_tokens else {})),
+                        timeout=request_timeout,
+                    )
+                    resp.raise_for_status()
+            except httpx.TimeoutException as e:
+                raise TimeoutError(str(e)) from e
+            return resp.json()["choices"][0]["message"]["content"]
+    return await state.gpt_flights.do(key or content, call)
+
+
+async def insert_calendar_event(calendar_id, event):
+    # 처음 한 번은 인증정보 파일/환경 변수를 읽고 파싱한다
+    credentials = await asyncio.to_thread(state.calendar_clients.credentials)
+    if not credentials.valid:
+        # 백그라운드 갱신이 아직 안 끝났으면 스레드에서 직접 갱신
+        await asyncio.to_thread(state.calendar_clients.refresh)
+    client = await state.http()
+    request_timeout = deadline.timeout(UPSTREAM_TIMEOUT)
+    with state.calendar_breaker.guard(request_timeout, UPSTREAM_TIMEOUT), metrics.upstream('calendar'):
+        headers = {"Authorization": f"Bearer {credentials.token}"} if credentials.token else {}
+        resp = await client.post(
+            f"{CALENDAR_API_BASE}/calendars/{quote(calendar_id, safe='')}/events",
+            params={"sendUpdates": "all"},
+            headers=headers,
+            json=event,
+            timeout=request_timeout,
+        )
+        if resp.status_code == 409:
+            # 같은 id의 일정이 이미 있으면 앞선 요청이 등록한 것
+            return event
+        resp.raise_for_status()
+    return resp.json()
+
+
+async def answer_question(pending, timeout=UPSTREAM_TIMEOUT):
+    questions = state.questions
+    started = time.perf_counter()
+    try:
+        with metrics.span('question', 'gpt'), metrics.span('question', f"route_{pending.decision.route}"):
+            gpt_response = await create_chat_completion(pending.user_input, timeout=timeout,
+                                                        **questions.completion(pending))
+        await asyncio.to_thread(questions.answered, pending, gpt_response)
+        return simple_text(gpt_response)
+    except Exception as e:
+        return simple_text(skills.upstream_error_text(e, "AI 답변 중 오류가 발생했습니다"))
+    finally:
+        questions.log(pending, time.perf_counter() - started)
+
+
+async def deliver_callback(callback_url, pending):
+    # 태스크가 요청의 컨텍스트(스킬 타임아웃 마감시간)를 복사해 오므로 콜백 마감시간으로 바꿔 잡는다
+    deadline.start(kakao_callback.CALLBACK_DEADLINE)
+    try:
+        body = await asyncio.wait_for(
+            answer_question(pending, timeout=min(UPSTREAM_TIMEOUT, kakao_callback.CALLBACK_DEADLINE)),
+            kakao_callback.CALLBACK_DEADLINE
+        )
+    except asyncio.TimeoutError:
+        state.callback_stats['expired'] += 1
+        body = simple_text(kakao_callback.TIMEOUT_TEXT)
+    try:
+        client = await state.http()
+        resp = await client.post(callback_url, content=responses.dumps(body), timeout=kakao_callback.CALLBACK_POST_TIMEOUT,
+                                 headers={'Content-Type': responses.JSON_CONTENT_TYPE})
+        resp.raise_for_status()
+        state.callback_stats['delivered'] += 1
+    except Exception as e:
+        state.callback_stats['failed'] += 1
+        print("콜백 전송 실패:", callback_url, str(e))
+
+
+async def question(request_data):
+    user_input = skills.utterance(request_data)
+    if not user_input:
+        return simple_text(skills.EMPTY_QUESTION_TEXT)
+
+    user_id = kakao_callback.get_user_id(request_data)
+    answer, pending = await asyncio.to_thread(state.questions.answer_locally, user_input, user_id)
+    if answer is not None:
+        return simple_text(answer)
+
+    callback_url = kakao_callback.get_callback_url(request_data)
+    if callback_url and kakao_callback.CALLBACK_ENABLED:
+        if len(state.callback_tasks) >= kakao_callback.CALLBACK_QUEUE_SIZE:
+            state.callback_stats['rejected'] += 1
+            return simple_text(kakao_callback.BUSY_TEXT)
+        state.callback_stats['submitted'] += 1
+        task = asyncio.create_task(deliver_callback(callback_url, pending))
+        state.callback_tasks.add(task)
+        task.add_done_callback(state.callback_tasks.discard)
+        return kakao_callback.ack_response()
+
+    return await answer_question(pending)
+
+
+async def register_schedule(user_input, key=None, user_id=None):
+    now = datetime.now()
+    schedule = skills.local_schedule(user_input, now)
+    if schedule is None:
+        prompt = skills.schedule_prompt(user_input, now)
+        try:
+            with metrics.span('schedule', 'gpt'):
+                gpt_response = await create_chat_completion(
+                    prompt, key=('schedule', prompt), priority=admission.PRIORITY_SCHEDULE
+                )
+        except Exception as e:
+            return simple_text(skills.upstream_error_text(e, "GPT 호출 오류")), False
+
+    try:
+        if schedule is None:
+            schedule = skills.parse_gpt_schedule(gpt_response)
+        calendar_sync = state.calendar_sync
+        calendar_id, event = skills.build_event(schedule, key, user_id, calendar_sync)
+        if state.calendar_writer is not None:
+            with metrics.span('schedule', 'calendar_enqueue'):
+                await asyncio.to_thread(state.calendar_writer.enqueue, calendar_id, event)
+        else:
+            # 스킬 타임아웃 안에 끝낼 수 없는 등록은 시작하지 않는다 (카카오가 끊은 뒤 등록되는 일 방지)
+            state.calendar_breaker.check()
+            deadline.require(state.calendar_breaker.expected_seconds(1.0), '캘린더 등록')
+            with metrics.span('schedule', 'calendar_insert'):
+                await insert_calendar_event(calendar_id, event)
+        if calendar_sync is not None:
+            calendar_sync.record_local(event)
+        return skills.registered_response(schedule), True
+    except Exception as e:
+        return skills.schedule_error(e)
+
+
+async def schedule_meeting(request_data):
+    user_input = skills.utterance(request_data)
+    if not user_input:
+        return simple_text(skills.EMPTY_SCHEDULE_TEXT)
+
+    user_id = kakao_callback.get_user_id(request_data)
+    key = idempotency.request_key(user_id, user_input)
+    if key is None:
+        response, _ = await register_schedule(user_input)
+        return response
+    try:
+        return await state.schedule_requests.do(key, lambda: register_schedule(user_input, key, user_id))
+    except idempotency.InProgress:
+        return simple_text(idempotency.IN_PROGRESS_TEXT)
+
+
+async def my_schedule(request_data):
+    # 실패한 일정 수는 큐 SQLite 에서 읽으므로 스레드 풀에서 만든다
+    text = await asyncio.to_thread(skills.my_schedule_text, state.calendar_sync,
+                                   kakao_callback.get_user_id(request_data), state.calendar_writer)
+    return simple_text(text)
+
+
+ROUTES = {
+    ("POST", "/question"): question,
+    ("POST", "/schedule"): schedule_meeting,
+    ("POST", "/my_schedule"): my_schedule,
+}
+ENDPOINTS = {question: 'question', schedule_meeting: 'schedule', my_schedule: 'my_schedule'}
+
+state.questions.register_metrics()
+skills.register_upstream_metrics(state.gpt_flights, state.llm_admission, state.openai_breaker, state.calendar_breaker,
+                                 state.schedule_requests, state.calendar_sync, state.calendar_writer,
+                                 state.warm_up_stats)
+metrics.StatsCollector('kakao_chatbot_kakao_callback', state.callback_stats, '콜백 작업 처리 수')
+metrics.Gauge('kakao_chatbot_callback_queue_depth', '콜백 작업 대기 수', lambda: len(state.callback_tasks))
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def _send(send, status, body, content_type):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode()),
+                    (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_json(send, status, payload, accept_encoding=None):
+    body = responses.dumps(payload)
+    if not responses.should_gzip(body, accept_encoding):
+        await _send(send, status, body, responses.JSON_CONTENT_TYPE)
+        return
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', responses.JSON_CONTENT_TYPE.encode()),
+                    (b'content-encoding', b'gzip'), (b'vary', b'Accept-Encoding')],
+    })
+    for chunk in responses.gzip_chunks(body):
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def _header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await state.startup()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await state.shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+    if scope['method'] == 'GET' and scope['path'] == '/metrics':
+        await _send(send, 200, metrics.REGISTRY.render().encode('utf-8'), metrics.CONTENT_TYPE)
+        return
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        await _send_json(send, 404, {"error": "not found"})
+        return
+    try:
+        request_data = json.loads(await _read_body(receive) or b'{}')
+    except ValueError:
+        await _send_json(send, 400, {"error": "invalid json"})
+        return
+    endpoint = ENDPOINTS[handler]
+    start = time.perf_counter()
+    # 카카오 스킬 타임아웃 안에서 모든 업스트림 호출이 남은 시간만 쓰도록 요청마다 마감시간을 잡는다
+    deadline.start()
+    try:
+        payload = await handler(request_data)
+    except Exception as e:
+        metrics.ERRORS.inc(endpoint, 'total', type(e).__name__)
+        raise
+    finally:
+        metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint)
+    await _send_json(send, 200, payload, _header(scope, b'accept-encoding'))
@@ -0,0 +1,43 @@
+"""답변 캐시 벤치마크
+
+자주 묻는 질문 변형들을 반복 조회해 적중률과 조회 지연을 측정한다.
+
+    python -m bench.bench_answer_cache --lookups 100000 --db /tmp/answer_cache.db
+"""
+import argparse
+import random
+import time
+
+from answer_cache import AnswerCache
+
+QUESTIONS = [
+    "영업시간", "영업 시간이 어떻게 되나요?", "상담 예약 어떻게 해요", "상담예약 어떻게해요??",
+    "주차 가능한가요", "위치가 어디에요", "가격이 얼마예요", "환불 규정 알려주세요",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lookups', type=int, default=100000)
+    parser.add_argument('--db', default=None, help='공유 SQLite 캐시 파일 경로')
+    args = parser.parse_args()
+
+    cache = AnswerCache(max_entries=1024, ttl=3600, db_path=args.db)
+    for q in QUESTIONS[::2]:
+        cache.set(q, f"{q}에 대한 답변")
+
+    rng = random.Random(0)
+    timings = []
+    for _ in range(args.lookups):
+        q = rng.choice(QUESTIONS)
+        t0 = time.perf_counter()
+        cache.get(q)
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    print(f"stats={cache.stats}")
+    print(f"lookup p50={timings[len(timings) // 2] * 1e6:.1f}us "
+          f"p99={timings[int(len(timings) * 0.99)] * 1e6:.1f}us")
+
+
+if __name__ == '__main__':
+    main()
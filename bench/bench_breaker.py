@@ -0,0 +1,80 @@
+"""서킷 브레이커/마감시간 벤치마크
+
+가짜 OpenAI 서버 상태를 바꿔 가며 app.py 의 /question 을 순서대로 호출하고 단계별 응답 시간을 본다.
+1. healthy  : 정상 응답
+2. outage   : 모든 요청이 --outage-latency 초 뒤 503 → 브레이커가 열린 뒤에는 업스트림을 부르지 않고 바로 응답
+3. recovery : 업스트림 복구 → BREAKER_RESET_TIMEOUT 뒤 반 열림 시험 호출이 성공하면 다시 닫힘
+4. slow     : 업스트림이 --slow-latency 초 걸림 → 스킬 마감시간(KAKAO_SKILL_TIMEOUT - DEADLINE_MARGIN) 안에 끊고 안내,
+              평소보다 넉넉한 시간에도 끊기는 호출이 이어지면 브레이커가 열려 기다리지 않고 바로 안내
+
+    python -m bench.bench_breaker
+    python -m bench.bench_breaker --requests 30 --reset-timeout 2
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench.bench_load import percentile
+from bench.fakes import FakeOpenAIServer
+
+
+def run_phase(client, app, name, fake, count, offset):
+    latencies = []
+    calls_before = fake.stats['requests']
+    texts = set()
+    for i in range(count):
+        payload = {"action": {"params": {"question": f"회사 근처에서 상담 받을 때 준비할 서류를 자세히 알려 주세요 {offset + i}"}}}
+        t0 = time.perf_counter()
+        resp = client.post('/question', json=payload)
+        latencies.append(time.perf_counter() - t0)
+        texts.add(resp.get_json()['template']['outputs'][0]['simpleText']['text'][:20])
+    latencies.sort()
+    state = app.openai_breaker.metrics()['state']
+    print(f"{name:>9} n={count} upstream={fake.stats['requests'] - calls_before:>3} "
+          f"p50={percentile(latencies, 0.50) * 1000:7.1f}ms p99={percentile(latencies, 0.99) * 1000:7.1f}ms "
+          f"max={latencies[-1] * 1000:7.1f}ms state={state} 응답={sorted(texts)[:3]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20, help='단계별 요청 수')
+    parser.add_argument('--latency', type=float, default=0.05, help='정상 응답 지연(초)')
+    parser.add_argument('--outage-latency', type=float, default=1.0, help='장애 시 503 까지 걸리는 시간(초)')
+    parser.add_argument('--slow-latency', type=float, default=8.0, help='느린 업스트림 지연(초)')
+    parser.add_argument('--reset-timeout', type=float, default=2.0)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench-breaker-')
+    with FakeOpenAIServer(latency=args.latency) as fake:
+        os.environ.update({
+            'OPENAI_API_KEY': 'sk-bench',
+            'OPENAI_API_BASE': fake.api_base,
+            'BREAKER_RESET_TIMEOUT': str(args.reset_timeout),
+            'FAQ_FILE': '',
+            'ROUTER_FILE': '',
+            'ANSWER_CACHE_DB': os.path.join(tmp, 'answer_cache.db'),
+            'CONVERSATION_DB': os.path.join(tmp, 'conversations.db'),
+            'ROUTER_LOG': '0',
+        })
+        os.environ.pop('GOOGLE_CALENDAR_ID', None)
+        import app
+        client = app.application.test_client()
+
+        run_phase(client, app, 'healthy', fake, args.requests, 0)
+
+        fake.latency, fake.error_rate, fake.error_status = args.outage_latency, 1.0, 503
+        run_phase(client, app, 'outage', fake, args.requests, 1000)
+
+        fake.latency, fake.error_rate = args.latency, 0.0
+        time.sleep(args.reset_timeout)
+        run_phase(client, app, 'recovery', fake, args.requests, 2000)
+
+        fake.latency = args.slow_latency
+        # 브레이커가 열린 뒤의 응답까지 보이도록 연속 실패 기준보다 몇 개 더 보낸다
+        run_phase(client, app, 'slow', fake, app.openai_breaker.failure_threshold + 3, 3000)
+        print("breaker", app.openai_breaker.metrics())
+
+
+if __name__ == '__main__':
+    main()
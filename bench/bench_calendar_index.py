@@ -0,0 +1,81 @@
+"""로컬 일정 인덱스 벤치마크
+
+가짜 Calendar 서버에 일정을 채운 뒤 전체/증분 동기화 시간을 재고,
+겹침 확인과 빈 시간 추천 조회 지연을 Calendar 목록 API 왕복과 비교한다.
+
+    python -m bench.bench_calendar_index --events 2000 --latency 0.1
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bench.fakes import FakeCalendarServer
+from calendar_index import CalendarSync
+
+CALENDAR_ID = 'bench@example.com'
+
+
+def make_event(i, start):
+    return {
+        'id': f'bench{i:06d}',
+        'summary': f'벤치 상담 {i}',
+        'start': {'dateTime': start.isoformat() + '+09:00'},
+        'end': {'dateTime': (start + timedelta(minutes=30)).isoformat() + '+09:00'},
+    }
+
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.1, help='가짜 Calendar HTTP 요청당 지연(초)')
+    parser.add_argument('--changes', type=int, default=20, help='증분 동기화 전에 추가할 일정 수')
+    parser.add_argument('--queries', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    with FakeCalendarServer() as fake:
+        service = fake.build_service()
+        for i in range(args.events):
+            start = base + timedelta(minutes=30 * rng.randrange(24 * 2 * 60))
+            service.events().insert(calendarId=CALENDAR_ID, body=make_event(i, start)).execute()
+        fake.latency = args.latency
+
+        sync = CalendarSync(lambda: service, CALENDAR_ID)
+        t0 = time.perf_counter()
+        sync.sync()
+        full = time.perf_counter() - t0
+        for i in range(args.changes):
+            start = base + timedelta(minutes=30 * rng.randrange(24 * 2 * 60))
+            service.events().insert(calendarId=CALENDAR_ID, body=make_event(args.events + i, start)).execute()
+        t0 = time.perf_counter()
+        sync.sync()
+        incremental = time.perf_counter() - t0
+        print(f"sync      events={len(sync.index)} full={full * 1000:.0f}ms "
+              f"incremental({args.changes} changes)={incremental * 1000:.0f}ms http_requests={fake.stats['lists']}")
+
+        index = sync.index
+        starts = [base + timedelta(minutes=30 * rng.randrange(24 * 2 * 60)) for _ in range(args.queries)]
+        hour = timedelta(hours=1)
+        it = iter(starts)
+        overlap = timed(lambda: index.overlapping(next(it), next(it) + hour), args.queries // 2)
+        it = iter(starts)
+        free = timed(lambda: index.free_slot(next(it), hour), args.queries)
+        live = timed(lambda: service.events().list(
+            calendarId=CALENDAR_ID, singleEvents=True, timeMin=base.isoformat() + '+09:00', maxResults=10
+        ).execute(), 5)
+    print(f"local     overlapping={overlap * 1e6:.1f}us free_slot={free * 1e6:.1f}us")
+    print(f"live API  events.list={live * 1000:.0f}ms (요청당 지연 {args.latency * 1000:.0f}ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""캘린더 write-behind 큐 처리량 벤치마크
+
+가짜 Calendar 서버에 요청당 지연과 429 오류를 주고,
+요청마다 동기 insert 하는 방식과 큐 + 배치 등록 방식을 비교한다.
+
+    python -m bench.bench_calendar_queue --events 500 --latency 0.2 --error-rate 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import calendar_queue
+from bench.fakes import FakeCalendarServer
+
+CALENDAR_ID = 'bench@example.com'
+
+
+def make_event(i):
+    return {
+        'summary': f'벤치 상담 {i}',
+        'start': {'dateTime': '2025-05-13T15:00:00', 'timeZone': 'Asia/Seoul'},
+        'end': {'dateTime': '2025-05-13T16:00:00', 'timeZone': 'Asia/Seoul'},
+    }
+
+
+def bench_sync(args):
+    with FakeCalendarServer(latency=args.latency) as fake:
+        service = fake.build_service()
+        n = min(args.events, args.sync_events)
+        t0 = time.perf_counter()
+        for i in range(n):
+            service.events().insert(calendarId=CALENDAR_ID, body=make_event(i), sendUpdates='all').execute()
+        elapsed = time.perf_counter() - t0
+    print(f"sync        events={n} per_request={elapsed / n * 1000:.1f}ms throughput={n / elapsed:.1f}/s")
+
+
+def bench_write_behind(args):
+    calendar_queue.BACKOFF_BASE = args.backoff_base
+    with FakeCalendarServer(latency=args.latency, error_rate=args.error_rate) as fake, \
+            tempfile.TemporaryDirectory() as tmp:
+        queue = calendar_queue.CalendarWriteBehindQueue(
+            fake.build_service, db_path=os.path.join(tmp, 'queue.db'), poll_interval=0.2
+        )
+        t0 = time.perf_counter()
+        enqueue_times = []
+        for i in range(args.events):
+            e0 = time.perf_counter()
+            queue.enqueue(CALENDAR_ID, make_event(i))
+            enqueue_times.append(time.perf_counter() - e0)
+        while fake.event_count() < args.events and time.perf_counter() - t0 < args.timeout:
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - t0
+        enqueue_times.sort()
+    print(f"write-behind events={args.events} stored={fake.event_count()} drained_in={elapsed:.2f}s "
+          f"throughput={fake.event_count() / elapsed:.1f}/s")
+    print(f"  enqueue p50={enqueue_times[len(enqueue_times) // 2] * 1000:.2f}ms "
+          f"p99={enqueue_times[int(len(enqueue_times) * 0.99)] * 1000:.2f}ms")
+    print(f"  queue={queue.stats} server={fake.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--sync-events', type=int, default=50, help='동기 방식은 느리므로 일부만 측정')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--backoff-base', type=float, default=0.1)
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+    bench_sync(args)
+    bench_write_behind(args)
+
+
+if __name__ == '__main__':
+    main()
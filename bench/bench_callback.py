@@ -0,0 +1,61 @@
+"""콜백 모드 벤치마크
+
+느린 GPT 응답을 흉내 내는 핸들러로 CallbackDispatcher를 돌리고,
+가짜 callbackUrl 수신 서버로 전달 지연과 큐 포화 시 거절 건수를 측정한다.
+
+    python -m bench.bench_callback --jobs 100 --latency 3
+"""
+import argparse
+import time
+
+from kakao_callback import CallbackDispatcher
+from bench.fakes import FakeCallbackReceiver
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[idx]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=3.0, help='가짜 GPT 응답 지연(초)')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--deadline', type=float, default=55.0)
+    args = parser.parse_args()
+
+    def slow_answer(job_id):
+        def handler(remaining):
+            time.sleep(min(args.latency, remaining))
+            return {"version": "2.0", "template": {"outputs": [{"simpleText": {"text": f"answer {job_id}"}}]}}
+        return handler
+
+    with FakeCallbackReceiver() as receiver:
+        dispatcher = CallbackDispatcher(workers=args.workers, queue_size=args.queue_size,
+                                        deadline=args.deadline)
+        ack_latencies = []
+        submitted_at = {}
+        for i in range(args.jobs):
+            t0 = time.perf_counter()
+            ok = dispatcher.submit(receiver.callback_url(i), slow_answer(i))
+            ack_latencies.append(time.perf_counter() - t0)
+            if ok:
+                submitted_at[f"/callback/{i}"] = time.monotonic()
+
+        received = receiver.wait_for(len(submitted_at), timeout=args.deadline + 10)
+        delivery = [r['received_at'] - submitted_at[r['path']] for r in received]
+
+    print(f"jobs={args.jobs} accepted={len(submitted_at)} stats={dispatcher.stats}")
+    print(f"ack    p50={percentile(ack_latencies, 50) * 1000:.3f}ms "
+          f"p99={percentile(ack_latencies, 99) * 1000:.3f}ms")
+    print(f"answer p50={percentile(delivery, 50):.2f}s p95={percentile(delivery, 95):.2f}s "
+          f"p99={percentile(delivery, 99):.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""사용자별 대화 기억 벤치마크
+
+1. 한 사용자가 계속 질문할 때 턴마다 프롬프트 토큰 수 (전체 대화를 그대로 붙이는 경우와 비교)
+2. 활성 사용자 N명의 세션을 메모리 저장소에 넣었을 때 사용자 1만 명당 메모리 (tracemalloc 로 검증)
+3. 전체 크기 상한을 작게 잡았을 때 오래 쉰 세션부터 지워져 상한이 지켜지는지
+4. SQLite 저장소(워커 간 공유)의 조회/저장 지연과 파일 크기
+
+    python -m bench.bench_conversation
+    python -m bench.bench_conversation --users 20000 --turns 12
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from bench.bench_load import percentile
+from conversation import (
+    CONVERSATION_TOKEN_BUDGET, Conversation, ConversationMemory, MemoryConversationStore, SQLiteConversationStore,
+    estimate_tokens,
+)
+
+
+def korean_text(rng, min_chars, max_chars):
+    """한글 음절로 된 임의의 문장들 (토큰/바이트 수만 실제 대화와 비슷하면 된다)"""
+    target = rng.randint(min_chars, max_chars)
+    words = []
+    length = 0
+    while length < target:
+        word = ''.join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(1, 5)))
+        if rng.random() < 0.15:
+            word += '다.'
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+def exchange(rng):
+    # 카카오 질문은 짧고, GPT 답변은 수백 자
+    return korean_text(rng, 10, 60), korean_text(rng, 150, 700)
+
+
+_POOL = [exchange(random.Random(i)) for i in range(300)]
+
+
+def sample_exchange(rng):
+    # 문장 생성이 느리므로 많은 세션을 채울 때는 미리 만든 대화에서 고른다
+    return rng.choice(_POOL)
+
+
+def report_prompt_size(turns):
+    rng = random.Random(0)
+    conversation = Conversation()
+    history = []
+    rows = []
+    for _ in range(turns):
+        question, answer = exchange(rng)
+        bounded = conversation.prompt_tokens(question)
+        naive = sum(estimate_tokens(text) for text in history) + estimate_tokens(question)
+        rows.append((bounded, naive))
+        conversation.add(question, answer)
+        conversation.compact()
+        history += [question, answer]
+    print(f"prompt    turns={turns} budget={CONVERSATION_TOKEN_BUDGET} tokens (+ 요약/이번 질문)")
+    for i in (0, 1, 2, 4, 9, 19, turns - 1):
+        if i < turns:
+            print(f"{'':9} turn {i + 1:>3}: 기억 사용 {rows[i][0]:>5} tokens / 전체 대화 {rows[i][1]:>6} tokens")
+    print(f"{'':9} max={max(r[0] for r in rows)} tokens, blob={len(conversation.encode())}B")
+
+
+def fill(store, users, turns, seed=1):
+    rng = random.Random(seed)
+    memory = ConversationMemory(store=store)
+    now = time.time()
+    for u in range(users):
+        conversation = Conversation()
+        for _ in range(rng.randint(1, turns)):
+            conversation.add(*sample_exchange(rng))
+            conversation.compact()
+        store.put(f"user-{u}", conversation.encode(), now)
+    return memory
+
+
+def report_memory(users, turns):
+    store = MemoryConversationStore(max_bytes=1 << 40)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fill(store, users, turns)
+    measured = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    sessions, accounted = store.usage()
+    per_10k = 10000 / sessions
+    print(f"memory    users={sessions} turns<={turns}: 집계 {accounted / 1e6:.1f}MB, tracemalloc {measured / 1e6:.1f}MB")
+    print(f"{'':9} 활성 사용자 1만 명당 집계 {accounted * per_10k / 1e6:.1f}MB, "
+          f"실측 {measured * per_10k / 1e6:.1f}MB ({measured / sessions:.0f}B/세션)")
+
+
+def report_cap(users, turns, cap):
+    store = MemoryConversationStore(max_bytes=cap)
+    fill(store, users, turns)
+    sessions, size = store.usage()
+    print(f"cap       max_bytes={cap / 1e6:.1f}MB users={users}: 남은 세션 {sessions}, {size / 1e6:.2f}MB, "
+          f"지운 세션 {store.evictions}")
+
+
+def report_sqlite(users, turns, repeat):
+    rng = random.Random(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'conversations.db')
+        store = SQLiteConversationStore(path)
+        memory = fill(store, users, turns)
+        loads, records = [], []
+        for _ in range(repeat):
+            user_id = f"user-{rng.randrange(users)}"
+            t0 = time.perf_counter()
+            conversation = memory.load(user_id)
+            loads.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            memory.record(user_id, conversation, *sample_exchange(rng))
+            records.append(time.perf_counter() - t0)
+        sessions, size = store.usage()
+        file_size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+    for name, values in (('load', loads), ('record', records)):
+        values.sort()
+        print(f"sqlite    {name:6} p50={percentile(values, 0.5) * 1e6:.0f}us p95={percentile(values, 0.95) * 1e6:.0f}us "
+              f"p99={percentile(values, 0.99) * 1e6:.0f}us")
+    print(f"{'':9} sessions={sessions} data={size / 1e6:.1f}MB file={file_size / 1e6:.1f}MB stats={memory.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--turns', type=int, default=10, help='사용자당 최대 질문 수')
+    parser.add_argument('--cap-mb', type=float, default=4)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    report_prompt_size(50)
+    report_memory(args.users, args.turns)
+    report_cap(args.users, args.turns, int(args.cap_mb * 1e6))
+    report_sqlite(args.users, args.turns, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""로컬 FAQ 응답 벤치마크
+
+bench/faq_queries.jsonl 의 질문(정답 FAQ id, FAQ 밖의 질문은 null)으로
+기준값별 흡수율/정확도/오답률을 표로 보이고, 조회 지연 분포와 색인(핫 리로드) 시간을 잰다.
+
+    python -m bench.bench_faq
+    python -m bench.bench_faq --faq-share 0.4 --scale 50   # FAQ 를 50배로 늘려 색인/조회 시간 확인
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from bench.bench_load import percentile
+from faq import FAQ, FAQ_THRESHOLD, FAQIndex, load_entries
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8)
+
+
+def load_queries():
+    with open(os.path.join(ROOT, 'bench', 'faq_queries.jsonl'), encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def scaled_entries(entries, scale):
+    """색인 크기 확인용: 항목을 복제하고 질문 끝에 번호를 붙여 서로 다른 문서로 만든다"""
+    if scale <= 1:
+        return entries
+    return entries + [dict(entry, id=f"{entry['id']}-{k}", questions=[f"{q} {k}번" for q in entry['questions']])
+                      for k in range(1, scale) for entry in entries]
+
+
+def report_thresholds(index, queries, faq_share):
+    results = []
+    for query in queries:
+        found = index.search(query['text'])
+        results.append((query['faq'], found[0]['id'] if found else None, found[1] if found else 0.0))
+    in_faq = [r for r in results if r[0] is not None]
+    out_faq = [r for r in results if r[0] is None]
+    print(f"queries={len(results)} (FAQ {len(in_faq)}, 그 외 {len(out_faq)}), "
+          f"top1 정답={sum(1 for r in in_faq if r[0] == r[1])}/{len(in_faq)}")
+    print(f"{'threshold':>9} {'흡수율':>6} {'정확도':>6} {'FAQ재현율':>8} {'오답(FAQ밖)':>10} {'예상 트래픽 흡수':>14}")
+    for threshold in sorted(set(THRESHOLDS) | {FAQ_THRESHOLD}):
+        absorbed = [r for r in results if r[2] >= threshold]
+        correct = sum(1 for r in absorbed if r[0] is not None and r[0] == r[1])
+        recall = sum(1 for r in in_faq if r[2] >= threshold and r[0] == r[1]) / max(1, len(in_faq))
+        false_hits = sum(1 for r in out_faq if r[2] >= threshold) / max(1, len(out_faq))
+        # 실제 트래픽 중 FAQ 질문 비율이 faq_share 일 때 GPT 호출 없이 답하는 비율
+        traffic = faq_share * recall + (1 - faq_share) * false_hits
+        mark = '*' if threshold == FAQ_THRESHOLD else ' '
+        print(f"{threshold:>8.2f}{mark} {len(absorbed) / len(results) * 100:>5.1f}% "
+              f"{correct / max(1, len(absorbed)) * 100:>5.1f}% {recall * 100:>7.1f}% "
+              f"{false_hits * 100:>9.1f}% {traffic * 100:>13.1f}%")
+
+
+def report_latency(index, queries, repeat):
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            t0 = time.perf_counter()
+            index.search(query['text'])
+            latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    print(f"lookup    n={len(latencies)} p50={percentile(latencies, 0.50) * 1e6:.0f}us "
+          f"p95={percentile(latencies, 0.95) * 1e6:.0f}us p99={percentile(latencies, 0.99) * 1e6:.0f}us "
+          f"max={latencies[-1] * 1e6:.0f}us")
+
+
+def report_reload(entries, interval):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'faq.json')
+        shutil.copy(os.path.join(ROOT, 'faq.example.json'), path)
+        faq = FAQ(path, reload_interval=interval)
+        t0 = time.perf_counter()
+        faq.maybe_reload()
+        print(f"reload    entries={len(faq)} build={(time.perf_counter() - t0) * 1000:.1f}ms")
+
+        # 파일을 바꾼 뒤 새 답변이 보이기까지 걸린 시간
+        marker = "핫 리로드 확인용 새 질문입니다"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(entries + [{'id': 'new', 'questions': [marker], 'answer': 'new'}], f, ensure_ascii=False)
+        t0 = time.perf_counter()
+        while faq.lookup(marker) != 'new':
+            time.sleep(0.01)
+        print(f"hot reload visible after {(time.perf_counter() - t0) * 1000:.0f}ms "
+              f"(reload_interval={interval}s) stats={faq.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--faq-share', type=float, default=0.3, help='실제 트래픽 중 FAQ 질문 비율 가정')
+    parser.add_argument('--scale', type=int, default=1, help='FAQ 항목 수 배율')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--reload-interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    entries = load_entries(os.path.join(ROOT, 'faq.example.json'))
+    t0 = time.perf_counter()
+    index = FAQIndex(scaled_entries(entries, args.scale))
+    print(f"index     entries={len(index)} build={(time.perf_counter() - t0) * 1000:.1f}ms")
+    queries = load_queries()
+    report_thresholds(index, queries, args.faq_share)
+    report_latency(index, queries, args.repeat)
+    report_reload(entries, args.reload_interval)
+
+
+if __name__ == '__main__':
+    main()
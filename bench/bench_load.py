@@ -0,0 +1,244 @@
+"""app.py 부하 테스트
+
+gunicorn_config.py 설정 그대로 app.py 를 띄우고, 가짜 OpenAI / Calendar 서버를 붙인 뒤
+카카오 스킬 요청(action.params.question)을 목표 RPS로 보낸다.
+요청은 예정된 시각 기준으로 지연을 재므로 서버가 밀려도 측정이 낙관적으로 바뀌지 않는다.
+
+    python -m bench.bench_load --rps 20 --duration 30 --openai-latency 1.5
+    python -m bench.bench_load --rps 50 --openai-error-rate 0.05 --calendar-latency 0.3
+    python -m bench.bench_load --asgi   # ASGI 서빙 모드(asgi_app.py)로 측정
+    python -m bench.bench_load --faq    # FAQ 로컬 응답을 켜고 측정
+    python -m bench.bench_load --write-behind    # 일정 등록을 write-behind 큐로 처리하고 측정
+    python -m bench.bench_load --router    # 질문 라우터를 켜고 측정
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench.fakes import FakeCalendarServer, FakeOpenAIServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KAKAO_BUDGET = 5.0  # 카카오 스킬 서버 응답 제한 시간
+
+QUESTION_TEMPLATES = [
+    "영업시간이 어떻게 되나요 {}",
+    "상담 예약은 어떻게 하나요 {}",
+    "주차 가능한가요 {}",
+    "비용이 얼마인가요 {}",
+    "위치가 어디인가요 {}",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def load_gunicorn_config():
+    spec = importlib.util.spec_from_file_location('gunicorn_config', os.path.join(ROOT, 'gunicorn_config.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def server_env(port, openai_fake, calendar_fake, tmp, faq=False, write_behind=False, router=False):
+    """가짜 업스트림을 가리키는 gunicorn 환경 변수. 실제 키/인증정보는 쓰지 않는다
+
+    faq 가 거짓이면 FAQ 로컬 응답을 꺼서 /question 이 모두 OpenAI 까지 가게 한다.
+    """
+    env = {k: v for k, v in os.environ.items() if k not in ('GOOGLE_CREDENTIALS', 'OPENAI_API_KEY')}
+    env.update({
+        'PORT': str(port),
+        'OPENAI_API_KEY': 'sk-bench',
+        'OPENAI_API_BASE': openai_fake.api_base,
+        'GOOGLE_CALENDAR_API_ENDPOINT': calendar_fake.url + '/',
+        'GOOGLE_CALENDAR_ID': 'bench@example.com',
+        'GOOGLE_CREDENTIALS_FILE': os.path.join(tmp, 'missing-credentials.json'),
+        'CALENDAR_QUEUE_DB': os.path.join(tmp, 'calendar_queue.db'),
+        'ANSWER_CACHE_DB': os.path.join(tmp, 'answer_cache.db'),
+        'SCHEDULE_IDEMPOTENCY_DB': os.path.join(tmp, 'schedule_requests.db'),
+        'CONVERSATION_DB': os.path.join(tmp, 'conversations.db'),
+        'ROUTER_LOG': '0',
+    })
+    env['FAQ_FILE'] = os.path.join(ROOT, 'faq.example.json') if faq else ''
+    env['CALENDAR_WRITE_BEHIND'] = '1' if write_behind else '0'
+    env['ROUTER_FILE'] = os.path.join(ROOT, 'router_examples.jsonl') if router else ''
+    return env
+
+
+def load_schedule_utterances():
+    with open(os.path.join(ROOT, 'bench', 'schedule_corpus.jsonl'), encoding='utf-8') as f:
+        return [json.loads(line)['text'] for line in f if line.strip()]
+
+
+def make_payloads(args):
+    """(경로, 본문) 목록. distinct 개수로 답변 캐시 적중률을 조절한다."""
+    rng = random.Random(args.seed)
+    schedules = load_schedule_utterances()
+    payloads = []
+    for _ in range(int(args.rps * args.duration)):
+        if rng.random() < args.schedule_ratio:
+            path, text = '/schedule', rng.choice(schedules)
+        else:
+            template = rng.choice(QUESTION_TEMPLATES)
+            path, text = '/question', template.format(rng.randrange(args.distinct_questions))
+        payloads.append((path, {
+            "userRequest": {"utterance": text, "user": {"id": f"bench-user-{rng.randrange(1000)}"}},
+            "action": {"params": {"question": text}},
+        }))
+    return payloads
+
+
+def start_server(args, env, port):
+    if args.asgi:
+        env['SERVER_MODE'] = 'asgi'
+        target = 'asgi_app:app'
+    else:
+        target = 'app:application'
+    cmd = [sys.executable, '-m', 'gunicorn', target, '--config', 'gunicorn_config.py']
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                              stderr=None if args.verbose else subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn 이 종료되었습니다 (exit {server.returncode})")
+        try:
+            requests.get(url + '/metrics', timeout=1)
+            return server, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("gunicorn 이 30초 안에 뜨지 않았습니다")
+
+
+def run_load(url, payloads, rps, max_clients):
+    results = []
+    lock = threading.Lock()
+    local = threading.local()
+
+    def session():
+        s = getattr(local, 'session', None)
+        if s is None:
+            s = local.session = requests.Session()
+        return s
+
+    def fire(scheduled, path, body):
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        status = None
+        try:
+            resp = session().post(url + path, json=body, timeout=KAKAO_BUDGET)
+            status = resp.status_code
+        except requests.Timeout:
+            status = 'timeout'
+        except requests.RequestException:
+            status = 'error'
+        # 실제 전송 시각이 아니라 예정 시각부터 잰다 (coordinated omission 방지)
+        latency = time.monotonic() - scheduled
+        with lock:
+            results.append((path, status, latency))
+
+    start = time.monotonic() + 0.5
+    with ThreadPoolExecutor(max_workers=max_clients) as pool:
+        for i, (path, body) in enumerate(payloads):
+            scheduled = start + i / rps
+            wait = scheduled - time.monotonic() - 0.05
+            if wait > 0:
+                time.sleep(wait)
+            pool.submit(fire, scheduled, path, body)
+    elapsed = time.monotonic() - start
+    return results, elapsed
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def report(results, elapsed, workers, label):
+    latencies = sorted(latency for _, _, latency in results)
+    ok = sum(1 for _, status, _ in results if status == 200)
+    timeouts = sum(1 for _, status, latency in results if status == 'timeout' or latency > KAKAO_BUDGET)
+    errors = len(results) - ok - sum(1 for _, status, _ in results if status == 'timeout')
+    print(f"{label:9} requests={len(results)} ok={ok} errors={errors} "
+          f"timeout(>{KAKAO_BUDGET:.0f}s)={timeouts / max(1, len(results)) * 100:.2f}%")
+    print(f"{'':9} p50={percentile(latencies, 0.50) * 1000:.0f}ms p95={percentile(latencies, 0.95) * 1000:.0f}ms "
+          f"p99={percentile(latencies, 0.99) * 1000:.0f}ms "
+          f"throughput={ok / elapsed:.1f}/s per_worker={ok / elapsed / workers:.1f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rps', type=float, default=20)
+    parser.add_argument('--duration', type=float, default=20, help='부하 시간(초)')
+    parser.add_argument('--schedule-ratio', type=float, default=0.2, help='/schedule 요청 비율')
+    parser.add_argument('--distinct-questions', type=int, default=200, help='서로 다른 질문 수 (작을수록 캐시 적중)')
+    parser.add_argument('--openai-latency', type=float, default=1.5)
+    parser.add_argument('--openai-jitter', type=float, default=0.5)
+    parser.add_argument('--openai-error-rate', type=float, default=0.0)
+    parser.add_argument('--calendar-latency', type=float, default=0.2)
+    parser.add_argument('--calendar-error-rate', type=float, default=0.0)
+    parser.add_argument('--max-clients', type=int, default=512, help='부하 발생기 동시 연결 수 상한')
+    parser.add_argument('--asgi', action='store_true', help='asgi_app.py 를 uvicorn 워커로 측정')
+    parser.add_argument('--faq', action='store_true', help='faq.example.json 으로 FAQ 로컬 응답을 켜고 측정')
+    parser.add_argument('--router', action='store_true', help='router_examples.jsonl 로 질문 라우터를 켜고 측정')
+    parser.add_argument('--write-behind', action='store_true', help='일정 등록을 write-behind 큐로 처리하고 측정')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help='gunicorn 로그 출력')
+    args = parser.parse_args()
+
+    port = free_port()
+    payloads = make_payloads(args)
+    with FakeOpenAIServer(latency=args.openai_latency, jitter=args.openai_jitter,
+                          error_rate=args.openai_error_rate, seed=args.seed) as openai_fake, \
+            FakeCalendarServer(latency=args.calendar_latency, error_rate=args.calendar_error_rate,
+                               seed=args.seed) as calendar_fake, \
+            tempfile.TemporaryDirectory() as tmp:
+        env = server_env(port, openai_fake, calendar_fake, tmp, faq=args.faq, write_behind=args.write_behind,
+                         router=args.router)
+        os.environ['PORT'] = str(port)
+        if args.asgi:
+            os.environ['SERVER_MODE'] = 'asgi'
+        config = load_gunicorn_config()
+        workers = getattr(config, 'workers', 1)
+        print(f"mode={'asgi' if args.asgi else 'flask'} workers={workers} "
+              f"threads={getattr(config, 'threads', 1)} rps={args.rps} duration={args.duration}s "
+              f"openai_latency={args.openai_latency}±{args.openai_jitter}s")
+
+        server, url = start_server(args, env, port)
+        try:
+            results, elapsed = run_load(url, payloads, args.rps, args.max_clients)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+        report(results, elapsed, workers, 'all')
+        for path in ('/question', '/schedule'):
+            subset = [r for r in results if r[0] == path]
+            if subset:
+                report(subset, elapsed, workers, path)
+        print(f"  openai={openai_fake.stats}")
+        print(f"  calendar={calendar_fake.stats} stored={calendar_fake.event_count()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""VISTA POI 공간 색인 벤치마크
+
+제주 경계 상자 안에 POI --pois 개를 (관광지 주변에 몰리게) 흩뿌리고 임의 위치에서 검색한다.
+1. 색인 만들기 시간
+2. 반경(--radius-km) 검색, k-최근접(--k) 검색 지연: 전체 하버사인 순회(파이썬) / numpy 전체 계산 / 격자 색인
+3. 결과가 전체 계산과 같은지 확인
+
+    python -m bench.bench_poi_index
+    python -m bench.bench_poi_index --pois 100000 --radius-km 1 3 10 --k 10 50
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'VISTA', 'backend'))
+
+from bench.bench_load import percentile  # noqa: E402
+from bench.bench_route_cache import PLACES  # noqa: E402
+from poi_index import EARTH_RADIUS_M, PoiIndex, _haversine  # noqa: E402
+
+CATEGORIES = ['관광명소', '맛집', '핫플레이스', '교통', '숙박']
+
+
+def make_pois(count, rng):
+    pois = []
+    for i in range(count):
+        if rng.random() < 0.7:
+            # 관광지 주변 수 km 안에 몰린 가게/숙소
+            lng, lat = rng.choice(PLACES)
+            lng, lat = lng + rng.gauss(0, 0.03), lat + rng.gauss(0, 0.02)
+        else:
+            lng, lat = rng.uniform(126.15, 126.97), rng.uniform(33.19, 33.57)
+        pois.append({'id': i, 'name': f'poi-{i}', 'category': rng.choice(CATEGORIES),
+                     'rating': round(rng.uniform(3, 5), 1), 'coordinates': [lng, lat]})
+    return pois
+
+
+def python_scan(pois, lng, lat, radius_m):
+    # 지금까지의 방식: 목록 전체를 돌며 거리 계산
+    found = []
+    for poi in pois:
+        lng2, lat2 = poi['coordinates']
+        a = (math.sin(math.radians(lat2 - lat) / 2) ** 2
+             + math.cos(math.radians(lat)) * math.cos(math.radians(lat2)) * math.sin(math.radians(lng2 - lng) / 2) ** 2)
+        d = 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+        if d <= radius_m:
+            found.append((d, poi['id']))
+    found.sort()
+    return found
+
+
+def timed(fn, queries):
+    latencies = []
+    results = []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(fn(*q))
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    return results, f"p50={percentile(latencies, 0.5) * 1e6:>8.1f}us p99={percentile(latencies, 0.99) * 1e6:>8.1f}us"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pois', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--radius-km', type=float, nargs='+', default=[1, 3, 10])
+    parser.add_argument('--k', type=int, nargs='+', default=[10, 50])
+    parser.add_argument('--limit', type=int, default=20, help='반경 검색 한 페이지 크기')
+    parser.add_argument('--cell-m', type=float, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pois = make_pois(args.pois, rng)
+    t0 = time.perf_counter()
+    index = PoiIndex(pois, cell_m=args.cell_m)
+    print(f"POI {len(index)}개 색인: {(time.perf_counter() - t0) * 1000:.0f}ms (격자 {args.cell_m:.0f}m)")
+
+    coords = np.radians(np.array([poi['coordinates'] for poi in pois]))
+    lng_rad, lat_rad = coords[:, 0], coords[:, 1]
+    cos_lat = np.cos(lat_rad)
+    queries = [(rng.choice(PLACES)[0] + rng.gauss(0, 0.02), rng.choice(PLACES)[1] + rng.gauss(0, 0.02))
+               for _ in range(args.queries)]
+
+    def brute(lng, lat):
+        return _haversine(lng, lat, lng_rad, lat_rad, cos_lat)
+
+    for radius_km in args.radius_km:
+        radius_m = radius_km * 1000
+        _, python_time = timed(lambda lng, lat: python_scan(pois, lng, lat, radius_m), queries[:20])
+        expected, numpy_time = timed(lambda lng, lat: np.flatnonzero(brute(lng, lat) <= radius_m), queries)
+        results, index_time = timed(lambda lng, lat: index.within(lng, lat, radius_m, limit=args.limit), queries)
+        for want, (pos, dist, total) in zip(expected, results):
+            assert total == len(want), (total, len(want))
+        print(f"반경 {radius_km:>4g}km (결과 평균 {np.mean([r[2] for r in results]):>7.0f}개, 상위 {args.limit}개 정렬)")
+        print(f"  python 순회   {python_time}")
+        print(f"  numpy 전체    {numpy_time}")
+        print(f"  격자 색인     {index_time}")
+
+    for k in args.k:
+        expected, numpy_time = timed(lambda lng, lat: np.sort(brute(lng, lat))[:k], queries)
+        results, index_time = timed(lambda lng, lat: index.nearest(lng, lat, k), queries)
+        for want, (pos, dist) in zip(expected, results):
+            assert np.allclose(want, dist), (want[:3], dist[:3])
+        where = index.matcher(category='맛집')
+        _, filtered_time = timed(lambda lng, lat: index.nearest(lng, lat, k, where), queries)
+        print(f"k-최근접 k={k}")
+        print(f"  numpy 전체    {numpy_time}")
+        print(f"  격자 색인     {index_time}")
+        print(f"  + 카테고리    {filtered_time}")
+
+
+if __name__ == '__main__':
+    main()
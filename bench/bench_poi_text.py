@@ -0,0 +1,136 @@
+"""VISTA POI 이름 색인 벤치마크
+
+지역명 + 두 글자 상호 + 업종을 조합한 한글 POI 이름(키워드 포함) --pois 개로 색인을 만들고
+질의 종류별 지연과 "찾으려던 POI 가 상위 --top 개 안에 있는지"를 지금까지의 방식(이름 부분 문자열 순회)과 비교한다.
+- short: 이름 앞 1~2 글자 (결과가 많은 자동완성 첫 입력, 지연과 결과 수만 본다)
+- typing: 마지막 글자를 입력하는 중 ("애월바다카ㅍ", "애월바다카")
+- choseong: 이름 초성 ("ㅇㅇㅂㄷㅋㅍ")
+- infix: 이름 앞뒤 한 글자씩 뺀 가운데
+- spacing: 띄어 쓴 이름 ("애월 바다 카페")
+- typo: 자모 하나가 바뀐 이름
+
+    python -m bench.bench_poi_text
+    python -m bench.bench_poi_text --pois 100000 --queries 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'VISTA', 'backend'))
+
+from bench.bench_load import percentile  # noqa: E402
+from poi_text import CHOSEONG, JONGSEONG, JUNGSEONG, PoiTextIndex, choseong, normalize  # noqa: E402
+
+REGIONS = ['제주', '애월', '한림', '협재', '성산', '우도', '서귀포', '중문', '표선', '구좌', '조천', '함덕', '김녕', '대정',
+           '모슬포', '안덕', '남원', '한경', '이호', '삼양', '노형', '연동', '월정', '세화', '하도', '종달', '신창', '용담']
+SYLLABLES = '바다돌담푸른하늘노을감귤동백유채람오름해녀올레숲길소나무등대파도몽검은모래별빛달르방작큰옛할망삼섬미소정원향기'
+KINDS = ['카페', '식당', '횟집', '펜션', '게스트하우스', '흑돼지', '국수', '해장국', '베이커리', '박물관', '전망대', '해변',
+         '공원', '시장', '민박', '호텔', '갈치조림', '고기국수', '전복죽', '체험농장']
+
+
+def make_pois(count, rng):
+    pois = []
+    seen = set()
+    while len(pois) < count:
+        region, kind = rng.choice(REGIONS), rng.choice(KINDS)
+        word = rng.choice(SYLLABLES) + rng.choice(SYLLABLES)
+        name = f'{region}{word}{kind}'
+        if name in seen:
+            continue
+        seen.add(name)
+        pois.append({'id': len(pois), 'name': name, 'category': kind, 'rating': round(rng.uniform(3, 5), 1),
+                     'coordinates': [126.5, 33.4], 'keywords': [f'{word}{kind}', f'{region} {kind}'],
+                     'parts': (region, word, kind)})
+    return pois
+
+
+def typo(text, rng):
+    # 한 글자의 초성/중성/종성 중 하나를 다른 자모로 바꾼다
+    chars = [i for i, ch in enumerate(text) if 0xAC00 <= ord(ch) <= 0xD7A3]
+    i = rng.choice(chars)
+    index = ord(text[i]) - 0xAC00
+    cho, jung, jong = index // 588, index % 588 // 28, index % 28
+    part = rng.randrange(3)
+    if part == 0:
+        cho = (cho + rng.randrange(1, len(CHOSEONG))) % len(CHOSEONG)
+    elif part == 1:
+        jung = (jung + rng.randrange(1, len(JUNGSEONG))) % len(JUNGSEONG)
+    else:
+        jong = (jong + rng.randrange(1, len(JONGSEONG))) % len(JONGSEONG)
+    return text[:i] + chr(0xAC00 + cho * 588 + jung * 28 + jong) + text[i + 1:]
+
+
+def partial(text):
+    # 마지막 글자를 입력하는 중: 종성이 있으면 빼고, 없으면 초성만
+    index = ord(text[-1]) - 0xAC00
+    if index % 28:
+        return text[:-1] + chr(ord(text[-1]) - index % 28)
+    return text[:-1] + CHOSEONG[index // 588]
+
+
+def make_queries(pois, count, rng):
+    kinds = {'short': [], 'typing': [], 'choseong': [], 'infix': [], 'spacing': [], 'typo': []}
+    for _ in range(count):
+        poi = rng.choice(pois)
+        name = poi['name']
+        kinds['short'].append((name[:rng.choice([1, 2])], poi))
+        kinds['typing'].append((partial(name), poi))
+        kinds['choseong'].append((choseong(normalize(name)), poi))
+        kinds['infix'].append((name[1:-1], poi))
+        kinds['spacing'].append((' '.join(poi['parts']), poi))
+        kinds['typo'].append((typo(name, rng), poi))
+    return kinds
+
+
+def run(search, queries):
+    latencies, found, sizes = [], 0, 0
+    for query, poi in queries:
+        t0 = time.perf_counter()
+        results = search(query)
+        latencies.append(time.perf_counter() - t0)
+        found += poi['id'] in results
+        sizes += len(results)
+    latencies.sort()
+    return (f"p50={percentile(latencies, 0.5) * 1e6:>9.1f}us p99={percentile(latencies, 0.99) * 1e6:>9.1f}us "
+            f"찾음={found / len(queries) * 100:>5.1f}% 결과={sizes / len(queries):>7.1f}개")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pois', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--top', type=int, default=10, help='이 순위 안에 있으면 찾은 것으로 본다')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pois = make_pois(args.pois, rng)
+    t0 = time.perf_counter()
+    index = PoiTextIndex(pois)
+    print(f"POI {len(pois)}개, 검색어 항목 {len(index.terms)}개 색인: {time.perf_counter() - t0:.1f}s")
+
+    names = [poi['name'].lower() for poi in pois]
+
+    def linear(query):
+        # 지금까지의 방식: 모든 이름에 부분 문자열 검사 (순위 없이 목록 순서라 상위 --top 개만 본다)
+        query = query.lower()
+        return [pois[i]['id'] for i, name in enumerate(names) if query in name][:args.top]
+
+    def indexed(query):
+        return {poi['id'] for poi, _, _ in index.search(query, limit=args.top)}
+
+    def suggest(query):
+        return {poi['id'] for poi, _, _ in index.suggest(query, limit=args.top)}
+
+    for kind, queries in make_queries(pois, args.queries, rng).items():
+        print(f"[{kind}] 예: {queries[0][0]!r} → {queries[0][1]['name']}")
+        print(f"  부분 문자열 순회   {run(linear, queries[:30])}")
+        print(f"  색인 search        {run(indexed, queries)}")
+        if kind in ('short', 'typing', 'choseong'):
+            print(f"  색인 suggest       {run(suggest, queries)}")
+
+
+if __name__ == '__main__':
+    main()
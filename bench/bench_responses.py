@@ -0,0 +1,124 @@
+"""응답 직렬화 벤치마크
+
+응답 크기별로 기존 방식(Flask jsonify 와 같은 json.dumps → encode)과 responses 모듈(orjson, 미리 만든 카카오 틀)을 비교한다.
+1. 카카오 simpleText 응답 (짧은/긴 답변)
+2. VISTA 경로 응답 (좌표 수별 GeoJSON) — 직렬화 시간, gzip 수준별 압축 시간/크기, 스트리밍 첫 조각까지 시간
+3. Flask 테스트 클라이언트로 jsonify vs json_response 전체 응답 시간
+
+    python -m bench.bench_responses
+    python -m bench.bench_responses --coords 100 1000 10000 100000
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+
+from flask import Flask, jsonify
+
+import responses
+
+
+def measure(fn, repeat):
+    """중앙값(초)"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def jsonify_like(payload):
+    # Flask 2.0 jsonify (debug 아님): 키 정렬, 공백 없음, ensure_ascii, 끝 줄바꿈
+    return (json.dumps(payload, separators=(',', ':'), sort_keys=True) + '\n').encode('utf-8')
+
+
+def route_payload(coords, seed=0):
+    rng = random.Random(seed)
+    lng, lat = 126.4933, 33.5066
+    coordinates = []
+    for _ in range(coords):
+        lng += rng.uniform(-0.001, 0.002)
+        lat += rng.uniform(-0.001, 0.001)
+        coordinates.append([round(lng, 6), round(lat, 6)])
+    return {
+        'success': True,
+        'route': {
+            'distance': 25.4, 'duration': 1800,
+            'geometry': {'type': 'LineString', 'coordinates': coordinates},
+            'jeju_features': {
+                'total_scenery_score': 8.5,
+                'route_pois': [{'name': '성산일출봉', 'category': '관광명소', 'distance_from_route': 0.2}] * 10,
+                'voice_navigation': ['해안도로를 따라 동쪽으로 이동합니다.'] * 10,
+            },
+        },
+        'calculation_time': '2025-06-26T10:40:30',
+    }
+
+
+def report_kakao(repeat):
+    print(f"{'카카오 응답':<14} {'bytes':>7} {'jsonify':>9} {'orjson':>9} {'틀+답변':>9}")
+    for name, text in (('짧은 답변', '상담 예약은 평일 오전 9시부터 가능합니다.'), ('긴 답변', '제주 여행 일정 안내입니다. ' * 60)):
+        payload = responses.simple_text(text)
+        assert json.loads(responses.simple_text_bytes(text)) == payload
+        base = measure(lambda: jsonify_like(payload), repeat)
+        fast = measure(lambda: responses.dumps(payload), repeat)
+        prebuilt = measure(lambda: responses.simple_text_bytes(text), repeat)
+        print(f"{name:<14} {len(responses.simple_text_bytes(text)):>7} {base * 1e6:>7.1f}us {fast * 1e6:>7.1f}us "
+              f"{prebuilt * 1e6:>7.1f}us")
+
+
+def report_routes(coord_counts, repeat):
+    print(f"{'좌표 수':>8} {'bytes':>9} {'jsonify':>9} {'orjson':>9} {'배':>5} "
+          f"{'gzip1':>16} {'gzip5':>16} {'gzip9':>16} {'첫 조각':>8}")
+    for coords in coord_counts:
+        payload = route_payload(coords)
+        n = max(3, repeat // max(1, coords // 1000))
+        old_body = jsonify_like(payload)
+        body = responses.dumps(payload)
+        assert json.loads(body) == json.loads(old_body)
+        base = measure(lambda: jsonify_like(payload), n)
+        fast = measure(lambda: responses.dumps(payload), n)
+        cells = []
+        for level in (1, 5, 9):
+            compressed = b''.join(responses.gzip_chunks(body, level=level))
+            assert gzip.decompress(compressed) == body
+            seconds = measure(lambda: b''.join(responses.gzip_chunks(body, level=level)), n)
+            cells.append(f"{seconds * 1000:>6.2f}ms {len(compressed) / len(body) * 100:>4.0f}%")
+        first = measure(lambda: next(responses.gzip_chunks(body)), n)
+        print(f"{coords:>8} {len(body):>9} {base * 1000:>7.2f}ms {fast * 1000:>7.2f}ms {base / fast:>4.1f}x "
+              f"{cells[0]:>16} {cells[1]:>16} {cells[2]:>16} {first * 1000:>6.2f}ms")
+
+
+def report_flask(coords, repeat):
+    app = Flask(__name__)
+    payload = route_payload(coords)
+    app.add_url_rule('/jsonify', 'jsonify', lambda: jsonify(payload))
+    app.add_url_rule('/fast', 'fast', lambda: responses.json_response(payload))
+    client = app.test_client()
+    print(f"Flask 전체 응답 (좌표 {coords}개)")
+    for path, headers in (('/jsonify', {}), ('/fast', {}), ('/fast', {'Accept-Encoding': 'gzip'})):
+        resp = client.get(path, headers=headers)
+        size = len(resp.get_data())
+        seconds = measure(lambda: client.get(path, headers=headers).get_data(), repeat)
+        label = path + (' (gzip)' if headers else '')
+        print(f"  {label:<14} {seconds * 1000:>7.2f}ms {size:>9} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--coords', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"orjson={'있음' if responses.orjson is not None else '없음 (표준 json)'} "
+          f"gzip 기준={responses.RESPONSE_GZIP_MIN_BYTES}B 수준={responses.RESPONSE_GZIP_LEVEL}")
+    report_kakao(args.repeat * 10)
+    report_routes(args.coords, args.repeat)
+    report_flask(10000, max(5, args.repeat // 10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""VISTA 경로 일괄 계산 벤치마크
+
+가짜 OSRM 서버(--osrm-latency)를 띄우고 경로 --routes 개를 계산한다.
+1. 지금처럼 한 개씩 차례로, 호출마다 requests.get (커넥션 새로 맺음)
+2. 한 개씩 차례로, 커넥션 풀 세션
+3. RouteBatchRunner (스레드 풀 + 커넥션 풀 세션) 워커 수별: 첫 줄까지 시간, 전체 시간, 새 커넥션 수
+
+    python -m bench.bench_route_batch
+    python -m bench.bench_route_batch --routes 50 --osrm-latency 0.3 --workers 4 8 16
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'VISTA', 'backend'))
+
+from bench.fakes import FakeOSRMServer  # noqa: E402
+from responses import dumps  # noqa: E402
+from route_batch import RouteBatchRunner, create_routing_session  # noqa: E402
+
+
+def make_items(count, seed=0):
+    rng = random.Random(seed)
+    return [{'id': f'r{i}',
+             'start': [round(126.2 + rng.random() * 0.7, 5), round(33.25 + rng.random() * 0.25, 5)],
+             'end': [round(126.2 + rng.random() * 0.7, 5), round(33.25 + rng.random() * 0.25, 5)],
+             'preferences': {}} for i in range(count)]
+
+
+def make_compute(osrm_url, get):
+    """JejuNavigationSystem._get_osrm_route 와 같은 요청을 보내고 직렬화한 경로를 돌려준다"""
+    def compute(start, end, preferences):
+        response = get(f"{osrm_url}/route/v1/driving/{start[0]},{start[1]};{end[0]},{end[1]}",
+                       params={'overview': 'full', 'geometries': 'geojson', 'steps': 'true'}, timeout=15)
+        data = response.json()
+        if data['code'] != 'Ok':
+            raise ValueError(data['code'])
+        return dumps(data['routes'][0]), None
+    return compute
+
+
+def run_sequential(name, osrm, items, get):
+    before = dict(osrm.stats)
+    compute = make_compute(osrm.url, get)
+    t0 = time.perf_counter()
+    first = None
+    for item in items:
+        compute(item['start'], item['end'], item['preferences'])
+        first = first or time.perf_counter() - t0
+    total = time.perf_counter() - t0
+    print(f"{name:<26} 첫 결과={first * 1000:>7.0f}ms 전체={total * 1000:>7.0f}ms "
+          f"새 커넥션={osrm.stats['connections'] - before['connections']:>3} OSRM 동시={1:>3}")
+
+
+def run_batch(osrm, items, workers):
+    osrm.stats['max_in_flight'] = 0
+    before = dict(osrm.stats)
+    session = create_routing_session(workers)
+    runner = RouteBatchRunner(make_compute(osrm.url, session.get), workers=workers, max_items=len(items),
+                              max_pending=len(items))
+    t0 = time.perf_counter()
+    first = None
+    lines = []
+    for line in runner.submit(items):
+        first = first or time.perf_counter() - t0
+        lines.append(json.loads(line))
+    total = time.perf_counter() - t0
+    done = lines[-1]
+    assert done['done'] and done['total'] == len(items) and done['failed'] == 0, done
+    assert sorted(line['index'] for line in lines[:-1]) == list(range(len(items)))
+    print(f"{'batch workers=' + str(workers):<26} 첫 결과={first * 1000:>7.0f}ms 전체={total * 1000:>7.0f}ms "
+          f"새 커넥션={osrm.stats['connections'] - before['connections']:>3} "
+          f"OSRM 동시={osrm.stats['max_in_flight']:>3}")
+    session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--routes', type=int, default=30)
+    parser.add_argument('--osrm-latency', type=float, default=0.15)
+    parser.add_argument('--coords', type=int, default=1000, help='경로 하나의 좌표 수')
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 8, 16])
+    args = parser.parse_args()
+
+    items = make_items(args.routes)
+    with FakeOSRMServer(latency=args.osrm_latency, coords=args.coords) as osrm:
+        run_sequential('sequential requests.get', osrm, items, requests.get)
+        with requests.Session() as session:
+            run_sequential('sequential session', osrm, items, session.get)
+        for workers in args.workers:
+            run_batch(osrm, items, workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""VISTA 경로 캐시 벤치마크
+
+인기 관광지 출발/도착 쌍을 Zipf 분포로 뽑아(출발/도착 좌표에 수십 m 흔들림) RouteCache 를 돌린다.
+경로 계산은 OSRM 지연(--osrm-latency)을 흉내 내고 좌표 --coords 개짜리 경로를 만든다.
+1. 적중률(메모리/디스크/동시 요청 합치기)과 OSRM 호출 수
+2. 조회 경로별 지연: 메모리 적중, 디스크 적중(워커 재시작 직후), 미스
+3. 메모리 사용량
+
+    python -m bench.bench_route_cache
+    python -m bench.bench_route_cache --requests 5000 --pairs 300 --threads 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'VISTA', 'backend'))
+
+from bench.bench_load import percentile  # noqa: E402
+from route_cache import DISK_HIT, HIT, MISS, RouteCache  # noqa: E402
+
+# 제주 주요 관광지 (경도, 위도)
+PLACES = [
+    (126.4933, 33.5066), (126.9423, 33.4586), (126.3324, 33.4615), (126.2396, 33.3940), (126.5311, 33.3617),
+    (126.5219, 33.5126), (126.9513, 33.5069), (126.2411, 33.4154), (126.3200, 33.2400), (126.5600, 33.2500),
+    (126.6900, 33.5400), (126.8300, 33.5500), (126.4200, 33.2500), (126.1700, 33.2900), (126.6300, 33.4500),
+]
+
+
+def make_pairs(count, rng):
+    pairs = []
+    while len(pairs) < count:
+        a, b = rng.sample(PLACES, 2)
+        # 같은 관광지라도 주차장/입구가 다르면 수백 m 떨어진다
+        start = (a[0] + rng.uniform(-0.01, 0.01), a[1] + rng.uniform(-0.01, 0.01))
+        end = (b[0] + rng.uniform(-0.01, 0.01), b[1] + rng.uniform(-0.01, 0.01))
+        pairs.append((start, end, rng.choice([{}, {'priority': 'scenic'}, {'priority': 'fast'}])))
+    return pairs
+
+
+def make_compute(start, end, coords, latency, counter):
+    def compute():
+        with counter['lock']:
+            counter['calls'] += 1
+        time.sleep(latency)
+        step = ((end[0] - start[0]) / coords, (end[1] - start[1]) / coords)
+        return {
+            'distance': 25.4, 'duration': 1800,
+            'geometry': {'type': 'LineString',
+                         'coordinates': [[round(start[0] + step[0] * i, 6), round(start[1] + step[1] * i, 6)]
+                                         for i in range(coords)]},
+            'jeju_features': {'total_scenery_score': 8.5, 'route_pois': [], 'voice_navigation': []},
+        }
+    return compute
+
+
+def jitter(point, rng, meters):
+    # 같은 장소에서 GPS 로 잡은 출발점은 수십 m 씩 흔들린다
+    scale = meters / 111000
+    return [point[0] + rng.uniform(-scale, scale), point[1] + rng.uniform(-scale, scale)]
+
+
+def run(cache, pairs, args, rng, counter):
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(pairs))]
+    picks = rng.choices(range(len(pairs)), weights=weights, k=args.requests)
+    requests = [(jitter(pairs[i][0], rng, args.jitter), jitter(pairs[i][1], rng, args.jitter), pairs[i][2])
+                for i in picks]
+    latencies = {HIT: [], DISK_HIT: [], MISS: []}
+    lock = threading.Lock()
+
+    def one(request):
+        start, end, prefs = request
+        t0 = time.perf_counter()
+        _, source = cache.get_or_compute(start, end, prefs, make_compute(start, end, args.coords, args.osrm_latency,
+                                                                         counter))
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies[source].append(elapsed)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(one, requests))
+    return latencies, time.perf_counter() - t0
+
+
+def report(name, cache, latencies, seconds, counter, requests):
+    print(f"[{name}] requests={requests} {seconds:.1f}s OSRM 호출={counter['calls']} "
+          f"적중률={cache.hit_ratio() * 100:.1f}% stats={cache.stats}")
+    for source, values in latencies.items():
+        if values:
+            values.sort()
+            print(f"  {source:<8} n={len(values):>5} p50={percentile(values, 0.50) * 1e6:>9.1f}us "
+                  f"p99={percentile(values, 0.99) * 1e6:>9.1f}us")
+    entries, size = cache.usage()
+    print(f"  메모리 항목={entries} {size / 1e6:.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--pairs', type=int, default=300, help='서로 다른 출발/도착/선호 조합 수')
+    parser.add_argument('--zipf', type=float, default=1.1, help='인기 조합 쏠림 정도')
+    parser.add_argument('--jitter', type=float, default=30, help='출발/도착 좌표 흔들림(m)')
+    parser.add_argument('--coords', type=int, default=2000, help='경로 좌표 수')
+    parser.add_argument('--osrm-latency', type=float, default=0.15)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pairs = make_pairs(args.pairs, rng)
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench-route-cache-'), 'route_cache.db')
+
+    counter = {'calls': 0, 'lock': threading.Lock()}
+    cache = RouteCache(db_path=db_path)
+    latencies, seconds = run(cache, pairs, args, rng, counter)
+    report('cold start', cache, latencies, seconds, counter, args.requests)
+
+    # 워커 재시작: 메모리는 비었지만 SQLite 에 남은 경로로 바로 응답
+    counter = {'calls': 0, 'lock': threading.Lock()}
+    cache = RouteCache(db_path=db_path)
+    latencies, seconds = run(cache, pairs, args, rng, counter)
+    report('restarted worker', cache, latencies, seconds, counter, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""VISTA 경로 작업(비동기) 벤치마크
+
+요청 스레드 --request-threads 개짜리 서버에 --routes 개의 긴 경로 요청(--route-seconds)과
+가벼운 요청(/api/health 같은 것) --light 개를 섞어 보낸다.
+1. sync: 긴 경로를 요청 스레드에서 바로 계산 (지금의 /api/route/calculate 방식)
+2. jobs: 요청 스레드는 RouteJobQueue 에 넣고 작업 id 만 돌려준다. 결과는 폴링으로 받는다
+가벼운 요청 지연(p50/p99), 경로 요청 응답 시간, 경로 결과까지 걸린 시간을 비교한다.
+
+    python -m bench.bench_route_jobs
+    python -m bench.bench_route_jobs --routes 40 --route-seconds 3 --job-workers 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'VISTA', 'backend'))
+
+from bench.bench_load import percentile  # noqa: E402
+from route_jobs import DONE, JobQueueFull, RouteJobQueue  # noqa: E402
+
+
+def long_route(seconds):
+    def run(payload, progress):
+        # 경유지 경로 → (실패 시) 재시도를 흉내 낸다
+        progress('routing', 0.3)
+        time.sleep(seconds * 0.6)
+        progress('fallback', 0.6)
+        time.sleep(seconds * 0.4)
+        return {'distance': 41200.0, 'duration': 3600.0, 'payload': payload}
+    return run
+
+
+def run(mode, args):
+    """(가벼운 요청 지연 목록, 경로 요청 응답 시간 목록, 경로 결과까지 걸린 시간 목록, 거절 수)"""
+    server = ThreadPoolExecutor(args.request_threads)
+    compute = long_route(args.route_seconds)
+    jobs = RouteJobQueue(compute, workers=args.job_workers, queue_size=args.queue_size)
+    light, accepted, completed = [], [], []
+    rejected = 0
+    lock = threading.Lock()
+
+    def route_request(n):
+        nonlocal rejected
+        t0 = time.perf_counter()
+        if mode == 'sync':
+            server.submit(compute, {'n': n}, lambda stage, fraction: None).result()
+            with lock:
+                accepted.append(time.perf_counter() - t0)
+                completed.append(time.perf_counter() - t0)
+            return
+        try:
+            job = server.submit(jobs.submit, {'n': n}).result()
+        except JobQueueFull:
+            with lock:
+                rejected += 1
+            return
+        with lock:
+            accepted.append(time.perf_counter() - t0)
+        # 클라이언트 폴링 (조회 요청도 같은 요청 스레드를 쓴다)
+        while server.submit(lambda: jobs.get(job.id).status).result() != DONE:
+            time.sleep(args.poll_interval)
+        with lock:
+            completed.append(time.perf_counter() - t0)
+
+    def light_request():
+        t0 = time.perf_counter()
+        server.submit(lambda: None).result()
+        with lock:
+            light.append(time.perf_counter() - t0)
+
+    clients = ThreadPoolExecutor(args.routes + 8)
+    futures = [clients.submit(route_request, n) for n in range(args.routes)]
+    time.sleep(0.05)
+    for _ in range(args.light):
+        futures.append(clients.submit(light_request))
+        time.sleep(args.route_seconds * 2 / args.light)
+    for future in futures:
+        future.result()
+    clients.shutdown()
+    server.shutdown()
+    return light, accepted, completed, rejected
+
+
+def summary(values):
+    if not values:
+        return '-'
+    values = sorted(values)
+    return f"p50={percentile(values, 0.50) * 1000:>7.1f}ms p99={percentile(values, 0.99) * 1000:>7.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--routes', type=int, default=16)
+    parser.add_argument('--route-seconds', type=float, default=2.0)
+    parser.add_argument('--light', type=int, default=40)
+    parser.add_argument('--request-threads', type=int, default=4, help='gunicorn 스레드 수')
+    parser.add_argument('--job-workers', type=int, default=4)
+    parser.add_argument('--queue-size', type=int, default=32)
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    for mode in ('sync', 'jobs'):
+        t0 = time.perf_counter()
+        light, accepted, completed, rejected = run(mode, args)
+        print(f"[{mode}] {time.perf_counter() - t0:.1f}s 거절={rejected}")
+        print(f"  가벼운 요청      {summary(light)}")
+        print(f"  경로 요청 응답   {summary(accepted)}")
+        print(f"  경로 결과까지    {summary(completed)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""질문 라우터 벤치마크
+
+router_examples.jsonl 로 학습한 분류기를 따로 모아 둔 bench/router_queries.jsonl(정답 라벨)로 평가한다.
+1. 라벨별 정확도와 혼동 행렬
+2. 기준값(canned/small)별 경로 비율, 복잡한 질문이 싼 경로로 잘못 간 비율, full 만 쓸 때 대비 예상 비용
+3. 분류 지연과 학습 시간
+
+    python -m bench.bench_router
+    python -m bench.bench_router --small-cost 0.05
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+from bench.bench_load import percentile
+from router import (
+    CANNED_ANSWERS, FULL, ROUTER_CANNED_THRESHOLD, ROUTER_SMALL_THRESHOLD, QuestionClassifier, QuestionRouter,
+    load_examples,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CANNED_THRESHOLDS = (0.6, 0.7, 0.8, 0.9)
+SMALL_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+
+def load_queries():
+    with open(os.path.join(ROOT, 'bench', 'router_queries.jsonl'), encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def report_accuracy(classifier, queries):
+    confusion = Counter()
+    for query in queries:
+        probs = classifier.predict(query['text'])
+        confusion[query['label'], max(probs, key=probs.get)] += 1
+    labels = classifier.labels
+    correct = sum(confusion[label, label] for label in labels)
+    print(f"queries={len(queries)} top1 정확도={correct / len(queries) * 100:.1f}%")
+    print(f"{'정답/예측':>10} " + ' '.join(f"{label:>8}" for label in labels))
+    for actual in labels:
+        print(f"{actual:>10} " + ' '.join(f"{confusion[actual, predicted]:>8}" for predicted in labels))
+
+
+def report_thresholds(classifier, queries, small_cost):
+    probs = [(query['label'], classifier.predict(query['text'])) for query in queries]
+    complex_count = sum(1 for label, _ in probs if label == FULL)
+    print(f"{'canned':>6} {'small':>5} {'canned%':>7} {'small%':>6} {'full%':>6} {'잘못 싼 경로':>10} "
+          f"{'인사 GPT 호출':>11} {'예상 비용':>8}")
+    for canned in CANNED_THRESHOLDS:
+        for small in SMALL_THRESHOLDS:
+            router = QuestionRouter(path=None, canned_threshold=canned, small_threshold=small)
+            routes = [(label, router.decide(p).route) for label, p in probs]
+            counts = Counter(route for _, route in routes)
+            # 복잡한 질문이 canned/small 로 간 비율 (답변 품질이 떨어지는 쪽의 실수)
+            misrouted = sum(1 for label, route in routes if label == FULL and route != FULL)
+            # 인사/감사/작별인데 GPT 를 부른 수 (비용만 드는 쪽의 실수)
+            missed_canned = sum(1 for label, route in routes if label in CANNED_ANSWERS and route != 'canned')
+            cost = (counts[FULL] + small_cost * counts['small']) / len(routes)
+            mark = '*' if (canned, small) == (ROUTER_CANNED_THRESHOLD, ROUTER_SMALL_THRESHOLD) else ' '
+            print(f"{canned:>6.2f} {small:>4.2f}{mark} {counts['canned'] / len(routes) * 100:>6.1f}% "
+                  f"{counts['small'] / len(routes) * 100:>5.1f}% {counts[FULL] / len(routes) * 100:>5.1f}% "
+                  f"{misrouted:>5}/{complex_count:<5} {missed_canned:>11} {cost * 100:>7.1f}%")
+
+
+def report_latency(classifier, queries, repeat, examples):
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            t0 = time.perf_counter()
+            classifier.predict(query['text'])
+            latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    print(f"classify  n={len(latencies)} p50={percentile(latencies, 0.50) * 1e6:.0f}us "
+          f"p95={percentile(latencies, 0.95) * 1e6:.0f}us p99={percentile(latencies, 0.99) * 1e6:.0f}us")
+    t0 = time.perf_counter()
+    QuestionClassifier(examples)
+    print(f"train     examples={len(examples)} {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--small-cost', type=float, default=0.1, help='작은 모델 호출 비용 (full = 1)')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    examples = load_examples(os.path.join(ROOT, 'router_examples.jsonl'))
+    classifier = QuestionClassifier(examples)
+    queries = load_queries()
+    report_accuracy(classifier, queries)
+    report_thresholds(classifier, queries, args.small_cost)
+    report_latency(classifier, queries, args.repeat, examples)
+
+
+if __name__ == '__main__':
+    main()
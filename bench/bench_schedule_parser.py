@@ -0,0 +1,70 @@
+"""일정 파서 커버리지/지연 측정
+
+bench/schedule_corpus.jsonl 의 라벨된 문장으로 로컬 파서를 돌려
+GPT 없이 처리되는 비율, 정답률, 잘못 해석한 문장, 파싱 지연을 보고한다.
+expected 가 null 인 문장은 GPT로 넘겨야 하는 문장이다.
+
+    python -m bench.bench_schedule_parser
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from schedule_parser import parse_schedule
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'schedule_corpus.jsonl')
+# 코퍼스의 기대값은 이 시각(월요일 오전 9시)을 기준으로 작성되어 있다
+CORPUS_NOW = datetime(2025, 5, 12, 9, 0)
+
+
+def load_corpus(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default=CORPUS)
+    parser.add_argument('--repeat', type=int, default=200, help='지연 측정 반복 횟수')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    parseable = [c for c in corpus if c['expected'] is not None]
+    parsed_ok, wrong, missed = 0, [], []
+    for case in corpus:
+        now = datetime.fromisoformat(case['now']) if case.get('now') else CORPUS_NOW
+        result = parse_schedule(case['text'], now)
+        result = dict(result) if result is not None else None
+        if result == case['expected']:
+            if result is not None:
+                parsed_ok += 1
+        elif result is None:
+            missed.append(case['text'])
+        else:
+            wrong.append((case['text'], result, case['expected']))
+
+    timings = []
+    for _ in range(args.repeat):
+        for case in corpus:
+            t0 = time.perf_counter()
+            parse_schedule(case['text'], CORPUS_NOW)
+            timings.append(time.perf_counter() - t0)
+    timings.sort()
+
+    print(f"corpus={len(corpus)} parseable={len(parseable)} local_ok={parsed_ok} "
+          f"coverage={parsed_ok / max(1, len(parseable)):.1%} wrong={len(wrong)} missed={len(missed)}")
+    print(f"parse p50={timings[len(timings) // 2] * 1e6:.1f}us "
+          f"p99={timings[int(len(timings) * 0.99)] * 1e6:.1f}us")
+    for text in missed:
+        print(f"  GPT 폴백: {text}")
+    for text, got, expected in wrong:
+        print(f"  오답: {text}\n    got={got}\n    expected={expected}")
+    # 잘못된 일정 등록은 GPT 폴백보다 나쁘므로 오답이 있으면 실패로 처리
+    return 1 if wrong else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
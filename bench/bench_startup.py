@@ -0,0 +1,110 @@
+"""콜드 스타트 벤치마크
+
+gunicorn_config.py 설정으로 app.py 를 여러 번 새로 띄우면서
+프로세스 시작부터 GET /metrics 첫 바이트까지(워커가 요청을 받기 시작한 시점),
+첫 /question 답변까지(가짜 OpenAI 왕복 포함) 걸린 시간을 잰다.
+앱 모듈 import 시간은 별도 프로세스에서 따로 잰다.
+
+    python -m bench.bench_startup --runs 5
+    python -m bench.bench_startup --asgi
+"""
+import argparse
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from bench.bench_load import ROOT, free_port, server_env
+from bench.fakes import FakeCalendarServer, FakeOpenAIServer
+
+POLL_INTERVAL = 0.01
+START_TIMEOUT = 30
+
+
+def measure_import(module, env):
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def wait_first_byte(url, server, started):
+    deadline = started + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn 이 종료되었습니다 (exit {server.returncode})")
+        try:
+            with requests.get(url + '/metrics', timeout=1, stream=True) as resp:
+                next(resp.iter_content(1))
+            return time.monotonic() - started
+        except requests.RequestException:
+            time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"gunicorn 이 {START_TIMEOUT}초 안에 뜨지 않았습니다")
+
+
+def run_once(args, env, port, run):
+    target = 'asgi_app:app' if args.asgi else 'app:application'
+    cmd = [sys.executable, '-m', 'gunicorn', target, '--config', 'gunicorn_config.py']
+    url = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                              stderr=None if args.verbose else subprocess.DEVNULL)
+    try:
+        first_byte = wait_first_byte(url, server, started)
+        body = {"userRequest": {"utterance": f"영업시간 {run}", "user": {"id": "bench-startup"}},
+                "action": {"params": {"question": f"영업시간이 어떻게 되나요 {run}"}}}
+        resp = requests.post(url + '/question', json=body, timeout=START_TIMEOUT)
+        resp.raise_for_status()
+        first_answer = time.monotonic() - started
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return first_byte, first_answer
+
+
+def summary(label, values):
+    values = sorted(values)
+    print(f"{label:22} median={statistics.median(values) * 1000:.0f}ms "
+          f"min={values[0] * 1000:.0f}ms max={values[-1] * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--openai-latency', type=float, default=0.05)
+    parser.add_argument('--asgi', action='store_true', help='asgi_app.py 를 uvicorn 워커로 측정')
+    parser.add_argument('--verbose', action='store_true', help='gunicorn 로그 출력')
+    args = parser.parse_args()
+
+    module = 'asgi_app' if args.asgi else 'app'
+    with FakeOpenAIServer(latency=args.openai_latency, jitter=0) as openai_fake, \
+            FakeCalendarServer(latency=0.01) as calendar_fake:
+        imports, first_bytes, first_answers = [], [], []
+        for run in range(args.runs):
+            # 실행마다 새 포트와 빈 SQLite 파일로 띄워 캐시가 남지 않게 한다
+            with tempfile.TemporaryDirectory() as tmp:
+                port = free_port()
+                env = server_env(port, openai_fake, calendar_fake, tmp)
+                if args.asgi:
+                    env['SERVER_MODE'] = 'asgi'
+                imports.append(measure_import(module, env))
+                first_byte, first_answer = run_once(args, env, port, run)
+                first_bytes.append(first_byte)
+                first_answers.append(first_answer)
+
+        print(f"mode={'asgi' if args.asgi else 'flask'} runs={args.runs} openai_latency={args.openai_latency}s")
+        summary(f"import {module}", imports)
+        summary("first byte (/metrics)", first_bytes)
+        summary("first /question", first_answers)
+        print(f"  openai={openai_fake.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,451 @@
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# 벤치마크/로컬 검증용 가짜 외부 서버 모음
+
+
+class _FakeServer:
+    """임의 포트에서 백그라운드로 도는 HTTP 서버"""
+
+    handler_class = None
+
+    def __init__(self, host='127.0.0.1', port=0):
+        handler = type('Handler', (self.handler_class,), {'fake': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        return json.loads(body) if body else None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _CallbackHandler(_QuietHandler):
+    def do_POST(self):
+        payload = self._read_json()
+        self.fake.record(self.path, payload)
+        self._send_json(200, {"status": "SUCCESS"})
+
+
+class FakeCallbackReceiver(_FakeServer):
+    """카카오 callbackUrl 역할을 하는 수신 서버. 받은 응답을 기록한다."""
+
+    handler_class = _CallbackHandler
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__(host, port)
+        self.received = []
+        self._cond = threading.Condition()
+
+    def callback_url(self, job_id):
+        return f"{self.url}/callback/{job_id}"
+
+    def record(self, path, payload):
+        with self._cond:
+            self.received.append({'path': path, 'payload': payload, 'received_at': time.monotonic()})
+            self._cond.notify_all()
+
+    def wait_for(self, count, timeout=60):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self.received) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return list(self.received)
+
+
+def _google_error(status, reason, message):
+    return {"error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}}
+
+
+class _CalendarHandler(_QuietHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        if self.path.startswith('/batch/'):
+            self.fake.sleep()
+            self._send_batch(body)
+            return
+        self.fake.sleep()
+        status, payload = self.fake.handle(self.command, self.path, body)
+        self._send_json(status, payload)
+
+    def do_GET(self):
+        self.fake.sleep()
+        status, payload = self.fake.handle(self.command, self.path, b'')
+        self._send_json(status, payload)
+
+    def do_DELETE(self):
+        self.fake.sleep()
+        status, payload = self.fake.handle(self.command, self.path, b'')
+        if status == 204:
+            self.send_response(204)
+            self.end_headers()
+            return
+        self._send_json(status, payload)
+
+    def _send_batch(self, body):
+        import email.parser
+        import email.policy
+
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + body
+        )
+        boundary = 'batch_fake_' + uuid.uuid4().hex
+        chunks = []
+        for part in message.iter_parts():
+            inner = part.get_payload(decode=True) or part.get_payload().encode('utf-8')
+            head, _, inner_body = inner.replace(b'\r\n', b'\n').partition(b'\n\n')
+            method, path = head.split(b'\n', 1)[0].decode().split(' ')[:2]
+            status, payload = self.fake.handle(method, path, inner_body)
+            content_id = part['Content-ID'].strip('<>')
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload, ensure_ascii=False)}\r\n"
+            )
+        chunks.append(f"--{boundary}--\r\n")
+        data = ''.join(chunks).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/mixed; boundary={boundary}')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeCalendarServer(_FakeServer):
+    """Google Calendar v3 일부(일정 등록/삭제/목록, 증분 동기화 syncToken, 배치 요청)를 흉내 내는 서버
+
+    latency 는 HTTP 요청 한 번당 지연(초), error_rate 비율의 등록 요청은 error_status 로 거절한다.
+    syncToken 은 변경 순번이며, expire_sync_tokens() 후에는 이전 토큰에 410 을 돌려준다.
+    """
+
+    handler_class = _CalendarHandler
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, error_status=429, seed=0):
+        super().__init__(host, port)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.events = {}
+        self.stats = {'http_requests': 0, 'inserts': 0, 'errors': 0, 'duplicates': 0, 'lists': 0}
+        self._seq = 0
+        self._min_sync_seq = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        with self._lock:
+            self.stats['http_requests'] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def discovery_document(self):
+        from googleapiclient.discovery_cache import get_static_doc
+
+        doc = json.loads(get_static_doc('calendar', 'v3'))
+        doc['rootUrl'] = self.url + '/'
+        doc['baseUrl'] = self.url + '/' + doc['servicePath']
+        return doc
+
+    def build_service(self):
+        import httplib2
+        from googleapiclient.discovery import build_from_document
+
+        return build_from_document(self.discovery_document(), http=httplib2.Http(timeout=30))
+
+    def event_count(self):
+        with self._lock:
+            return sum(1 for events in self.events.values() for event in events.values()
+                       if event['status'] != 'cancelled')
+
+    def expire_sync_tokens(self):
+        with self._lock:
+            self._min_sync_seq = self._seq + 1
+
+    def handle(self, method, path, body):
+        parsed = urlparse(path)
+        parts = [unquote(p) for p in parsed.path.split('/') if p]
+        # /calendar/v3/calendars/{calendarId}/events
+        if len(parts) >= 5 and parts[:3] == ['calendar', 'v3', 'calendars'] and parts[4] == 'events':
+            calendar_id = parts[3]
+            if method == 'POST' and len(parts) == 5:
+                return self._insert(calendar_id, json.loads(body or b'{}'))
+            if method == 'GET' and len(parts) == 5:
+                return self._list(calendar_id, parse_qs(parsed.query))
+            if method == 'DELETE' and len(parts) == 6:
+                return self._delete(calendar_id, parts[5])
+        return 404, _google_error(404, 'notFound', 'Not Found')
+
+    def _insert(self, calendar_id, event):
+        with self._lock:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return self.error_status, _google_error(self.error_status, 'rateLimitExceeded', 'Rate Limit Exceeded')
+            events = self.events.setdefault(calendar_id, {})
+            event_id = event.get('id') or uuid.uuid4().hex
+            if event_id in events:
+                self.stats['duplicates'] += 1
+                return 409, _google_error(409, 'duplicate', 'The requested identifier already exists.')
+            self._seq += 1
+            event = dict(event, id=event_id, status='confirmed', updated=datetime.utcnow().isoformat() + 'Z')
+            events[event_id] = event
+            event['_seq'] = self._seq
+            self.stats['inserts'] += 1
+            return 200, _public(event)
+
+    def _delete(self, calendar_id, event_id):
+        with self._lock:
+            event = self.events.get(calendar_id, {}).get(event_id)
+            if event is None or event['status'] == 'cancelled':
+                return 410 if event else 404, _google_error(410 if event else 404, 'deleted', 'Resource has been deleted')
+            self._seq += 1
+            event.update(status='cancelled', _seq=self._seq)
+            return 204, None
+
+    def _list(self, calendar_id, query):
+        page_size = int(query.get('maxResults', ['250'])[0])
+        offset = int(query.get('pageToken', ['0'])[0])
+        with self._lock:
+            self.stats['lists'] += 1
+            if 'syncToken' in query:
+                if 'timeMin' in query:
+                    return 400, _google_error(400, 'invalid', 'timeMin cannot be used with syncToken')
+                since = int(query['syncToken'][0])
+                if since < self._min_sync_seq:
+                    return 410, _google_error(410, 'fullSyncRequired', 'Sync token is no longer valid')
+                items = [e for e in self.events.get(calendar_id, {}).values() if e['_seq'] > since]
+            else:
+                items = [e for e in self.events.get(calendar_id, {}).values() if e['status'] != 'cancelled']
+            items.sort(key=lambda e: e['_seq'])
+            if query.get('singleEvents', ['false'])[0] == 'true':
+                items = [instance for e in items for instance in _instances(e)]
+            if 'timeMin' in query:
+                # 끝난 시각이 timeMin 보다 뒤인 일정만
+                time_min = datetime.fromisoformat(query['timeMin'][0].replace('Z', '+00:00'))
+                items = [e for e in items if _end(e) > time_min]
+            page = [_public(e) for e in items[offset:offset + page_size]]
+            response = {'kind': 'calendar#events', 'items': page}
+            if offset + page_size < len(items):
+                response['nextPageToken'] = str(offset + page_size)
+            else:
+                response['nextSyncToken'] = str(self._seq)
+            return 200, response
+
+
+def _instances(event, limit=400):
+    """singleEvents=true 처럼 반복 일정을 인스턴스로 펼친다 (id 는 원본 id + 시작 시각 UTC)"""
+    if not event.get('recurrence'):
+        return [event]
+    from dateutil.rrule import rrulestr
+
+    start = datetime.fromisoformat(event['start']['dateTime'])
+    duration = datetime.fromisoformat(event['end']['dateTime']) - start
+    rule = rrulestr('\n'.join(event['recurrence']), dtstart=start.replace(tzinfo=None))
+    instances = []
+    for i, occurrence in enumerate(rule):
+        if i >= limit:
+            break
+        utc = occurrence - timedelta(hours=9)
+        instance = {k: v for k, v in event.items() if k != 'recurrence'}
+        instance.update(
+            id=f"{event['id']}_{utc:%Y%m%dT%H%M%SZ}",
+            recurringEventId=event['id'],
+            start=dict(event['start'], dateTime=occurrence.isoformat()),
+            end=dict(event['end'], dateTime=(occurrence + duration).isoformat()),
+        )
+        instances.append(instance)
+    return instances
+
+
+def _end(event):
+    end = event['end']
+    if 'dateTime' in end:
+        value = datetime.fromisoformat(end['dateTime'].replace('Z', '+00:00'))
+        return value if value.tzinfo else value.replace(tzinfo=timezone(timedelta(hours=9)))
+    return datetime.fromisoformat(end['date']).replace(tzinfo=timezone(timedelta(hours=9)))
+
+
+def _public(event):
+    return {k: v for k, v in event.items() if not k.startswith('_')}
+
+
+class _OpenAIHandler(_QuietHandler):
+    def do_POST(self):
+        payload = self._read_json() or {}
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": "Not Found", "type": "invalid_request_error"}})
+            return
+        status, body = self.fake.complete(payload)
+        self._send_json(status, body)
+
+
+class FakeOpenAIServer(_FakeServer):
+    """OpenAI chat/completions 를 흉내 내는 서버
+
+    latency 초(± jitter)만큼 기다린 뒤 답하고, error_rate 비율의 요청은 error_status 로 거절한다.
+    일정 추출 프롬프트에는 다음 날 15~16시 일정 JSON을 돌려준다.
+    """
+
+    handler_class = _OpenAIHandler
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=429, seed=0):
+        super().__init__(host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats = {'requests': 0, 'errors': 0, 'in_flight': 0, 'max_in_flight': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def api_base(self):
+        return self.url + '/v1'
+
+    def complete(self, payload):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+            fail = bool(self.error_rate) and self._rng.random() < self.error_rate
+            delay = self.latency + (self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        try:
+            if delay > 0:
+                time.sleep(delay)
+            if fail:
+                with self._lock:
+                    self.stats['errors'] += 1
+                return self.error_status, {"error": {"message": "Rate limit reached", "type": "requests"}}
+            content = (payload.get('messages') or [{}])[-1].get('content', '')
+            return 200, {
+                "id": "chatcmpl-" + uuid.uuid4().hex,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get('model', 'gpt-3.5-turbo'),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": self._answer(content)}}],
+                "usage": {"prompt_tokens": len(content), "completion_tokens": 16, "total_tokens": len(content) + 16},
+            }
+        finally:
+            with self._lock:
+                self.stats['in_flight'] -= 1
+
+    def _answer(self, content):
+        if 'start_datetime' in content:
+            day = datetime.now().date().toordinal() + 1
+            date = datetime.fromordinal(day).strftime('%Y-%m-%d')
+            return json.dumps({"start_datetime": f"{date}T15:00:00", "end_datetime": f"{date}T16:00:00",
+                               "summary": "상담"}, ensure_ascii=False)
+        return f"가짜 답변입니다: {content[:40]}"
+
+
+class _OSRMHandler(_QuietHandler):
+    # keep-alive 를 받아 커넥션 재사용 여부를 볼 수 있게 한다
+    protocol_version = 'HTTP/1.1'
+    # 헤더와 본문을 따로 쓰므로 Nagle 을 끄지 않으면 keep-alive 커넥션에서 응답마다 지연 ACK(40ms)를 기다린다
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.fake.count_connection()
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if not parsed.path.startswith('/route/v1/'):
+            self._send_json(404, {"code": "InvalidUrl"})
+            return
+        status, payload = self.fake.route(unquote(parsed.path.rsplit('/', 1)[-1]))
+        self._send_json(status, payload)
+
+
+class FakeOSRMServer(_FakeServer):
+    """OSRM /route/v1/{profile}/{lng,lat;lng,lat...} 를 흉내 내는 서버
+
+    latency 초 뒤 경유지를 잇는 직선을 coords 개 좌표의 GeoJSON 경로로 돌려준다.
+    stats['connections'] 로 새로 맺은 TCP 커넥션 수를 센다.
+    """
+
+    handler_class = _OSRMHandler
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, coords=500):
+        super().__init__(host, port)
+        self.latency = latency
+        self.coords = coords
+        self.stats = {'requests': 0, 'connections': 0, 'in_flight': 0, 'max_in_flight': 0}
+        self._lock = threading.Lock()
+
+    def count_connection(self):
+        with self._lock:
+            self.stats['connections'] += 1
+
+    def route(self, coordinates):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            try:
+                points = [[float(v) for v in pair.split(',')] for pair in coordinates.split(';')]
+            except ValueError:
+                return 400, {"code": "InvalidQuery"}
+            line = []
+            per_leg = max(1, self.coords // max(1, len(points) - 1))
+            for a, b in zip(points, points[1:]):
+                line.extend([a[0] + (b[0] - a[0]) * i / per_leg, a[1] + (b[1] - a[1]) * i / per_leg]
+                            for i in range(per_leg))
+            line.append(points[-1])
+            return 200, {"code": "Ok", "routes": [{"distance": 25400.0, "duration": 1800.0,
+                                                   "geometry": {"type": "LineString", "coordinates": line},
+                                                   "legs": []}]}
+        finally:
+            with self._lock:
+                self.stats['in_flight'] -= 1
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Google Calendar 클라이언트 풀
+# 서비스 계정 인증정보는 워커 프로세스당 한 번만 읽고, 만료 전에 백그라운드에서 토큰을 갱신한다.
+# httplib2 기반 서비스 객체는 스레드 안전하지 않으므로 스레드마다 하나씩 만들어 재사용한다.
+# discovery 문서는 google-api-python-client에 포함된 정적 사본을 사용한다.
+# GOOGLE_CALENDAR_API_ENDPOINT 가 있으면 그 주소로 요청을 보내고, 인증정보 파일이 없으면 익명으로 호출한다.
+# google-auth / googleapiclient 는 가져오는 데만 수백 ms 가 걸리므로 처음 쓸 때(또는 warm_up) 가져온다.
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
+# 서비스 계정 JSON 전체 내용. 있으면 파일 대신 메모리에서 바로 읽는다
+CREDENTIALS_JSON = os.getenv('GOOGLE_CREDENTIALS')
+TOKEN_REFRESH_MARGIN = int(os.getenv('GOOGLE_TOKEN_REFRESH_MARGIN', 300))
+# 부하 테스트 등에서 가짜 Calendar 서버로 보낼 때 사용 (예: http://127.0.0.1:8081/)
+CALENDAR_API_ENDPOINT = os.getenv('GOOGLE_CALENDAR_API_ENDPOINT')
+CALENDAR_HTTP_TIMEOUT = 10
+REFRESH_RETRY_INTERVAL = 30
+
+
+class CalendarClientPool:
+    def __init__(self, credentials_file=CREDENTIALS_FILE, scopes=SCOPES,
+                 refresh_margin=TOKEN_REFRESH_MARGIN, credentials_json=CREDENTIALS_JSON):
+        self.credentials_file = credentials_file
+        self.credentials_json = credentials_json
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self._credentials = None
+        self._discovery_doc = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._refresher = None
+
+    def credentials(self):
+        if self._credentials is None:
+            with self._lock:
+                if self._credentials is None:
+                    self._discovery_doc = self._load_discovery_doc()
+                    credentials = self._load_credentials()
+                    if credentials is None:
+                        from google.auth.credentials import AnonymousCredentials
+                        self._credentials = AnonymousCredentials()
+                        return self._credentials
+                    self._credentials = credentials
+                    self._start_refresher()
+        return self._credentials
+
+    def _load_credentials(self):
+        """서비스 계정 인증정보. 가짜 서버로 보낼 때 인증정보가 없으면 None"""
+        from google.oauth2 import service_account
+        if self.credentials_json:
+            return service_account.Credentials.from_service_account_info(
+                json.loads(self.credentials_json), scopes=self.scopes
+            )
+        if CALENDAR_API_ENDPOINT and not os.path.exists(self.credentials_file):
+            return None
+        return service_account.Credentials.from_service_account_file(self.credentials_file, scopes=self.scopes)
+
+    def warm_up(self):
+        """요청이 오기 전에 인증정보, discovery 문서, 현재 스레드의 서비스 객체를 미리 준비한다"""
+        self.service()
+
+    def _load_discovery_doc(self):
+        from googleapiclient.discovery_cache import get_static_doc
+        doc = get_static_doc('calendar', 'v3')
+        if not CALENDAR_API_ENDPOINT:
+            return doc
+        doc = json.loads(doc)
+        root = CALENDAR_API_ENDPOINT.rstrip('/') + '/'
+        doc['rootUrl'] = root
+        doc['baseUrl'] = root + doc['servicePath']
+        return doc
+
+    def service(self):
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            import httplib2
+            import google_auth_httplib2
+            from googleapiclient.discovery import build_from_document
+            credentials = self.credentials()
+            http = google_auth_httplib2.AuthorizedHttp(
+                credentials, http=httplib2.Http(timeout=CALENDAR_HTTP_TIMEOUT)
+            )
+            service = build_from_document(self._discovery_doc, http=http)
+            self._local.service = service
+        return service
+
+    def _start_refresher(self):
+        self._refresher = threading.Thread(target=self._refresh_loop, name='calendar-token-refresh', daemon=True)
+        self._refresher.start()
+
+    def _seconds_until_refresh(self):
+        expiry = self._credentials.expiry
+        if not self._credentials.token or expiry is None:
+            return 0
+        return (expiry - datetime.utcnow()).total_seconds() - self.refresh_margin
+
+    def refresh(self):
+        import httplib2
+        import google_auth_httplib2
+        from google.auth.credentials import AnonymousCredentials
+        if isinstance(self._credentials, AnonymousCredentials):
+            return
+        request = google_auth_httplib2.Request(httplib2.Http(timeout=CALENDAR_HTTP_TIMEOUT))
+        self._credentials.refresh(request)
+
+    def _refresh_loop(self):
+        while True:
+            wait = self._seconds_until_refresh()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Google 토큰 갱신 실패:", str(e))
+                time.sleep(REFRESH_RETRY_INTERVAL)
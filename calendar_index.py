@@ -0,0 +1,388 @@
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta, timezone
+
+from dateutil.rrule import rrulestr
+
+# 다가오는 일정의 로컬 구간 인덱스
+# 백그라운드 스레드가 Calendar 증분 동기화(syncToken)로 변경분만 받아 정렬된 구간 목록을 갱신한다.
+# /schedule 의 겹침 확인, 빈 시간 추천과 "내 일정 보기"는 API 호출 없이 이 인덱스만 조회한다.
+# 모든 시각은 Asia/Seoul 기준 naive datetime 으로 다룬다 (현재 시각도 서버 시간대와 상관없이 local_now()).
+# 방금 등록한 일정은 동기화로 확인될 때까지 따로 들고 있다가, 전체 재동기화로 인덱스를 바꿔도 다시 넣는다.
+
+CALENDAR_SYNC_INTERVAL = float(os.getenv('CALENDAR_SYNC_INTERVAL', 60))
+CALENDAR_SYNC = os.getenv('CALENDAR_SYNC', '1') == '1'
+# 빈 시간을 추천할 영업시간 (시작시-종료시)
+CALENDAR_BUSINESS_HOURS = os.getenv('CALENDAR_BUSINESS_HOURS', '9-18')
+FREE_SLOT_SEARCH_DAYS = 14
+SYNC_PAGE_SIZE = 250
+SYNC_RETRY_INTERVAL = 30
+# 이미 끝난 일정은 이 시간이 지나면 인덱스에서 뺀다
+PAST_RETENTION = timedelta(days=1)
+# 끝이 없는 반복 일정은 이 기간까지만 펼쳐서 겹침을 확인한다
+RECURRENCE_HORIZON = timedelta(days=int(os.getenv('CALENDAR_RECURRENCE_HORIZON_DAYS', 180)))
+RECURRENCE_SLOT_STEP = timedelta(minutes=30)
+# 동기화에서 보이지 않는 로컬 등록 일정은 이 시간이 지나면 버린다 (write-behind 큐가 등록에 실패한 경우 등)
+LOCAL_PENDING_TTL = 3600.0
+
+KST = timezone(timedelta(hours=9))
+WEEKDAYS = '월화수목금토일'
+
+SYNCING_TEXT = "일정을 불러오는 중입니다. 잠시 후 다시 시도해 주세요."
+
+
+def local_now():
+    """인덱스 기준(KST naive) 현재 시각"""
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def parse_business_hours(value):
+    start, end = (int(part) for part in value.split('-'))
+    return start, end
+
+
+def to_local(value):
+    """Calendar 의 start/end 객체(dateTime 또는 종일 date)를 KST naive datetime 으로"""
+    if 'dateTime' in value:
+        parsed = datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(KST).replace(tzinfo=None)
+        return parsed
+    return datetime.combine(date.fromisoformat(value['date']), datetime.min.time())
+
+
+def format_interval(start, end):
+    day = f"{start.month}/{start.day}({WEEKDAYS[start.weekday()]})"
+    if end.date() == start.date():
+        return f"{day} {start:%H:%M}~{end:%H:%M}"
+    return f"{day} {start:%H:%M}~{end.month}/{end.day} {end:%H:%M}"
+
+
+def conflict_message(conflicts, free_start, duration, recurring=False):
+    lines = ["요청하신 시간에 이미 일정이 있습니다."]
+    for interval in conflicts[:3]:
+        lines.append(f"- {format_interval(interval.start, interval.end)} {interval.summary}".rstrip())
+    if len(conflicts) > 3:
+        lines.append(f"- 외 {len(conflicts) - 3}건")
+    if free_start is not None:
+        if recurring:
+            lines.append(f"매번 비어 있는 가장 가까운 시간: {free_start:%H:%M}~{free_start + duration:%H:%M}")
+        else:
+            lines.append(f"가장 가까운 빈 시간: {format_interval(free_start, free_start + duration)}")
+    return "\n".join(lines)
+
+
+def expand_recurrence(start, end, rule, horizon=RECURRENCE_HORIZON):
+    """반복 일정의 (시작, 종료) 목록. 끝이 없는 규칙은 start + horizon 까지만 펼친다"""
+    duration = end - start
+    limit = start + horizon
+    occurrences = []
+    for occurrence in rrulestr(rule, dtstart=start):
+        if occurrence > limit:
+            break
+        occurrences.append((occurrence, occurrence + duration))
+    return occurrences
+
+
+def instance_id(event_id, start):
+    # Calendar 가 singleEvents 로 펼친 반복 일정 인스턴스 id 형식 (시작 시각 UTC)
+    return f"{event_id}_{(start - timedelta(hours=9)):%Y%m%dT%H%M%SZ}"
+
+
+def upcoming_message(intervals):
+    if not intervals:
+        return "예정된 일정이 없습니다."
+    lines = ["예정된 일정입니다."]
+    for interval in intervals:
+        lines.append(f"- {format_interval(interval.start, interval.end)} {interval.summary}".rstrip())
+    return "\n".join(lines)
+
+
+class Interval(tuple):
+    """(start, end, event_id, summary, owner) 정렬 가능한 일정 구간"""
+    __slots__ = ()
+
+    def __new__(cls, start, end, event_id, summary='', owner=None):
+        return tuple.__new__(cls, (start, end, event_id, summary or '', owner or ''))
+
+    start = property(lambda self: self[0])
+    end = property(lambda self: self[1])
+    event_id = property(lambda self: self[2])
+    summary = property(lambda self: self[3])
+    owner = property(lambda self: self[4])
+
+
+def interval_from_event(event):
+    """Calendar 일정 리소스를 Interval 로. 시각 정보가 없으면 None"""
+    try:
+        start = to_local(event['start'])
+        end = to_local(event['end'])
+    except (KeyError, ValueError):
+        return None
+    private = (event.get('extendedProperties') or {}).get('private') or {}
+    return Interval(start, end, event['id'], event.get('summary'), private.get('kakaoUserId'))
+
+
+class IntervalIndex:
+    """시작 시각으로 정렬된 구간 목록
+
+    겹침 조회는 가장 긴 일정 길이만큼 앞에서부터 이분 탐색하므로 일정 수가 많아도 몇 마이크로초면 된다.
+    """
+
+    def __init__(self):
+        self._intervals = []
+        self._by_id = {}
+        self._max_duration = timedelta(0)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def upsert(self, interval):
+        with self._lock:
+            self._remove(interval.event_id)
+            insort(self._intervals, interval)
+            self._by_id[interval.event_id] = interval
+            self._max_duration = max(self._max_duration, interval.end - interval.start)
+
+    def remove(self, event_id):
+        with self._lock:
+            self._remove(event_id)
+
+    def _remove(self, event_id):
+        old = self._by_id.pop(event_id, None)
+        if old is not None:
+            i = bisect_left(self._intervals, old)
+            if i < len(self._intervals) and self._intervals[i] == old:
+                del self._intervals[i]
+
+    def replace(self, intervals):
+        intervals = sorted(intervals)
+        with self._lock:
+            self._intervals = intervals
+            self._by_id = {interval.event_id: interval for interval in intervals}
+            self._max_duration = max((i.end - i.start for i in intervals), default=timedelta(0))
+
+    def prune(self, before):
+        """before 전에 끝난 일정을 뺀다"""
+        with self._lock:
+            keep = [i for i in self._intervals if i.end > before]
+            if len(keep) != len(self._intervals):
+                self._intervals = keep
+                self._by_id = {interval.event_id: interval for interval in keep}
+                self._max_duration = max((i.end - i.start for i in keep), default=timedelta(0))
+
+    def overlapping(self, start, end):
+        """[start, end) 와 겹치는 일정 목록"""
+        with self._lock:
+            lo = bisect_left(self._intervals, (start - self._max_duration,))
+            hi = bisect_left(self._intervals, (end,))
+            return [i for i in self._intervals[lo:hi] if i.end > start]
+
+    def between(self, start, end, owner=None):
+        """start 이후 시작해 end 전에 시작하는 일정 목록 (owner 가 있으면 그 사용자 것만)"""
+        with self._lock:
+            lo = bisect_left(self._intervals, (start,))
+            hi = bisect_right(self._intervals, (end,))
+            found = self._intervals[lo:hi]
+        if owner is not None:
+            found = [i for i in found if i.owner == owner]
+        return found
+
+    def free_slot(self, start, duration, business_hours=None, search_days=FREE_SLOT_SEARCH_DAYS):
+        """start 이후 duration 만큼 비어 있는 가장 이른 시각. 찾지 못하면 None"""
+        open_hour, close_hour = business_hours or parse_business_hours(CALENDAR_BUSINESS_HOURS)
+        limit = start + timedelta(days=search_days)
+        candidate = start
+        while candidate < limit:
+            day_open = candidate.replace(hour=open_hour, minute=0, second=0, microsecond=0)
+            day_close = candidate.replace(hour=close_hour, minute=0, second=0, microsecond=0)
+            if candidate < day_open:
+                candidate = day_open
+            if candidate + duration > day_close:
+                candidate = day_open + timedelta(days=1)
+                continue
+            conflicts = self.overlapping(candidate, candidate + duration)
+            if not conflicts:
+                return candidate
+            candidate = max(i.end for i in conflicts)
+        return None
+
+    def free_recurring_slot(self, occurrences, business_hours=None, step=RECURRENCE_SLOT_STEP):
+        """모든 반복 일정을 같은 만큼 옮겼을 때 전부 비는, 원래 시각에서 가장 가까운 첫 일정 시작 시각"""
+        open_hour, close_hour = business_hours or parse_business_hours(CALENDAR_BUSINESS_HOURS)
+        first_start, first_end = occurrences[0]
+        duration = first_end - first_start
+        day_open = first_start.replace(hour=open_hour, minute=0, second=0, microsecond=0)
+        day_close = first_start.replace(hour=close_hour, minute=0, second=0, microsecond=0)
+        candidates = []
+        slot = day_open
+        while slot + duration <= day_close:
+            candidates.append(slot)
+            slot += step
+        candidates.sort(key=lambda c: (abs(c - first_start), c < first_start))
+        for candidate in candidates:
+            shift = candidate - first_start
+            if not any(self.overlapping(s + shift, e + shift) for s, e in occurrences):
+                return candidate
+        return None
+
+    def check(self, start, end, rule=None):
+        """겹치면 안내 문구, 비어 있으면 None"""
+        if rule is None:
+            conflicts = self.overlapping(start, end)
+            if not conflicts:
+                return None
+            return conflict_message(conflicts, self.free_slot(start, end - start), end - start)
+        occurrences = expand_recurrence(start, end, rule)
+        conflicts = [i for s, e in occurrences for i in self.overlapping(s, e)]
+        if not conflicts:
+            return None
+        free_start = self.free_recurring_slot(occurrences)
+        return conflict_message(conflicts, free_start, end - start, recurring=True)
+
+
+def sync_time_min(now=None):
+    """전체 동기화 목록의 timeMin (RFC3339, 시간대 포함)"""
+    now = now or datetime.now(KST)
+    return (now - PAST_RETENTION).replace(microsecond=0).isoformat()
+
+
+class CalendarSync:
+    """Calendar 변경분을 주기적으로 받아 IntervalIndex 를 최신으로 유지한다"""
+
+    def __init__(self, service_factory, calendar_id, index=None, interval=CALENDAR_SYNC_INTERVAL):
+        self.service_factory = service_factory
+        self.calendar_id = calendar_id
+        self.index = index or IntervalIndex()
+        self.interval = interval
+        self.sync_token = None
+        self.ready = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._worker = None
+        # 동기화로 아직 확인되지 않은 로컬 등록 일정: 구간 id → (등록 시각, 구간)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self.stats = {'full_syncs': 0, 'incremental_syncs': 0, 'changes': 0, 'errors': 0, 'last_sync_at': 0.0}
+
+    def start(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='calendar-sync', daemon=True)
+                self._worker.start()
+
+    def request_sync(self):
+        self._wakeup.set()
+
+    def record_local(self, event):
+        """방금 등록(또는 큐에 넣은) 일정을 동기화 전에 바로 반영한다"""
+        interval = interval_from_event(event)
+        if interval is None:
+            return
+        if not event.get('recurrence'):
+            intervals = [interval]
+        else:
+            # 동기화(singleEvents)가 돌려줄 인스턴스와 같은 id 로 펼쳐 넣는다
+            intervals = [Interval(start, end, instance_id(interval.event_id, start), interval.summary, interval.owner)
+                         for start, end in expand_recurrence(interval.start, interval.end, event['recurrence'][0])]
+        recorded_at = time.monotonic()
+        with self._pending_lock:
+            for item in intervals:
+                self._pending[item.event_id] = (recorded_at, item)
+        for item in intervals:
+            self.index.upsert(item)
+
+    def _merge_pending(self, synced_ids, cutoff):
+        """전체 동기화 뒤: 동기화에 보인 로컬 일정은 확인된 것으로 빼고, 아직 안 보인 것은 인덱스에 다시 넣는다"""
+        expired_at = time.monotonic() - LOCAL_PENDING_TTL
+        with self._pending_lock:
+            for event_id, (recorded_at, interval) in list(self._pending.items()):
+                if event_id in synced_ids or recorded_at < expired_at or interval.end <= cutoff:
+                    del self._pending[event_id]
+                else:
+                    self.index.upsert(interval)
+
+    def _confirm(self, event_id):
+        with self._pending_lock:
+            self._pending.pop(event_id, None)
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+                wait = self.interval
+            except Exception as e:
+                self.stats['errors'] += 1
+                print("캘린더 동기화 오류:", str(e))
+                wait = SYNC_RETRY_INTERVAL
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def sync(self):
+        if self.sync_token is None:
+            self._full_sync()
+            return
+        from googleapiclient.errors import HttpError
+        try:
+            self._incremental_sync()
+        except HttpError as e:
+            if e.resp.status != 410:
+                raise
+            # 토큰이 만료되면 전체 동기화부터 다시 한다
+            self.sync_token = None
+            self._full_sync()
+
+    def _list(self, **params):
+        service = self.service_factory()
+        page_token = None
+        while True:
+            response = service.events().list(
+                calendarId=self.calendar_id, singleEvents=True, maxResults=SYNC_PAGE_SIZE,
+                pageToken=page_token, **params
+            ).execute()
+            yield from response.get('items', [])
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                self.sync_token = response.get('nextSyncToken')
+                return
+
+    def _full_sync(self):
+        now = datetime.now(KST)
+        cutoff = now.replace(tzinfo=None) - PAST_RETENTION
+        intervals = []
+        # 끝난 지 PAST_RETENTION 이 지난 일정은 받지 않는다. 없으면 singleEvents 가 반복 일정의 지난 회차를
+        # 달력 처음부터 모두 펼쳐 보낸다. timeMin 은 첫 목록에만 넣고(syncToken 요청에는 넣을 수 없음)
+        # 이 목록의 마지막 페이지도 nextSyncToken 을 준다
+        synced_ids = set()
+        for event in self._list(timeMin=sync_time_min(now)):
+            synced_ids.add(event['id'])
+            if event.get('status') == 'cancelled':
+                continue
+            interval = interval_from_event(event)
+            if interval is not None and interval.end > cutoff:
+                intervals.append(interval)
+        self.index.replace(intervals)
+        self._merge_pending(synced_ids, cutoff)
+        self.stats['full_syncs'] += 1
+        self.stats['last_sync_at'] = time.time()
+        self.ready.set()
+
+    def _incremental_sync(self):
+        changes = 0
+        for event in self._list(syncToken=self.sync_token):
+            changes += 1
+            self._confirm(event['id'])
+            interval = None if event.get('status') == 'cancelled' else interval_from_event(event)
+            if interval is None:
+                self.index.remove(event['id'])
+            else:
+                self.index.upsert(interval)
+        self.index.prune(local_now() - PAST_RETENTION)
+        self.stats['incremental_syncs'] += 1
+        self.stats['changes'] += changes
+        self.stats['last_sync_at'] = time.time()
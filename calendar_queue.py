@@ -0,0 +1,277 @@
+import contextlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+import metrics
+from circuit_breaker import CircuitOpen, is_upstream_failure
+
+# Google Calendar 일정 등록 write-behind 큐
+# /schedule 은 검증된 일정을 SQLite 큐에 넣고 바로 응답하며,
+# 백그라운드 워커가 Calendar 배치 요청으로 모아서 등록한다.
+# 429/5xx 는 지수 백오프로 재시도하고, 큐 파일은 gunicorn 워커들이 함께 사용한다.
+# 배치 요청도 Calendar 서킷 브레이커를 거치며, 브레이커가 열려 있으면 시도 횟수를 쓰지 않고 미룬다.
+# 끝내 등록하지 못한 일정은 status='failed' 로 CALENDAR_FAILED_RETENTION_DAYS 일 동안 남겨
+# /metrics 와 "내 일정 보기"에 알리고, 그 뒤 지운다.
+# 응답 전에 등록 결과를 확인하지 않으므로 기본값은 동기 등록이고 CALENDAR_WRITE_BEHIND=1 일 때만 켠다.
+
+CALENDAR_WRITE_BEHIND = os.getenv('CALENDAR_WRITE_BEHIND', '0') == '1'
+CALENDAR_QUEUE_DB = os.getenv('CALENDAR_QUEUE_DB', 'calendar_queue.db')
+CALENDAR_BATCH_SIZE = 50  # Calendar 배치 요청 한 번에 넣을 수 있는 최대 개수
+CALENDAR_MAX_ATTEMPTS = int(os.getenv('CALENDAR_MAX_ATTEMPTS', 8))
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 300.0
+POLL_INTERVAL = 2.0
+# 워커가 죽어서 처리 중으로 남은 항목은 이 시간이 지나면 다시 가져간다
+INFLIGHT_TIMEOUT = 120.0
+CALENDAR_FAILED_RETENTION_DAYS = float(os.getenv('CALENDAR_FAILED_RETENTION_DAYS', 7))
+PRUNE_INTERVAL = 3600.0
+
+# 403 은 권한/캘린더 설정 문제인 경우가 대부분이라 재시도하지 않는다
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+USER_ID_PATH = '$.extendedProperties.private.kakaoUserId'
+
+
+def new_event_id():
+    # 재시도 시 중복 등록을 막기 위해 클라이언트가 일정 id를 정한다 (base32hex 문자만 허용)
+    return uuid.uuid4().hex
+
+
+def backoff_delay(attempts):
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempts))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CalendarWriteBehindQueue:
+    def __init__(self, service_factory, db_path=CALENDAR_QUEUE_DB, batch_size=CALENDAR_BATCH_SIZE,
+                 max_attempts=CALENDAR_MAX_ATTEMPTS, poll_interval=POLL_INTERVAL, breaker=None,
+                 failed_retention=CALENDAR_FAILED_RETENTION_DAYS * 86400):
+        self.service_factory = service_factory
+        self.breaker = breaker
+        self.failed_retention = failed_retention
+        self._pruned_at = 0.0
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_id = uuid.uuid4().hex
+        self.stats = {'enqueued': 0, 'inserted': 0, 'retried': 0, 'failed': 0, 'batches': 0, 'deferred': 0,
+                      'pruned': 0}
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS pending_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, calendar_id TEXT NOT NULL, body TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt_at REAL NOT NULL, claimed_by TEXT, claimed_at REAL, "
+            "created_at REAL NOT NULL, last_error TEXT)"
+        )
+        self._conn().execute(
+            "CREATE INDEX IF NOT EXISTS pending_events_due ON pending_events (status, next_attempt_at)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def enqueue(self, calendar_id, event):
+        """일정을 큐에 저장하고 id를 돌려준다. 등록은 백그라운드에서 진행된다."""
+        event = dict(event)
+        event.setdefault('id', new_event_id())
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO pending_events (calendar_id, body, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+            (calendar_id, json.dumps(event, ensure_ascii=False), now, now)
+        )
+        self._count('enqueued')
+        self._ensure_started()
+        self._wakeup.set()
+        return event['id']
+
+    def pending(self):
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM pending_events WHERE status IN ('pending', 'inflight')"
+        ).fetchone()
+        return row[0]
+
+    def failed(self, user_id=None):
+        """등록하지 못하고 남아 있는 일정 수 (user_id 가 있으면 그 사용자가 요청한 것만)"""
+        if user_id is None:
+            row = self._conn().execute("SELECT COUNT(*) FROM pending_events WHERE status = 'failed'").fetchone()
+        else:
+            row = self._conn().execute(
+                "SELECT COUNT(*) FROM pending_events WHERE status = 'failed' AND json_extract(body, ?) = ?",
+                (USER_ID_PATH, user_id)
+            ).fetchone()
+        return row[0]
+
+    def prune_failed(self, now=None):
+        """보관 기간이 지난 실패 항목을 지운다"""
+        now = time.time() if now is None else now
+        deleted = self._conn().execute(
+            "DELETE FROM pending_events WHERE status = 'failed' AND created_at < ?",
+            (now - self.failed_retention,)
+        ).rowcount
+        self._count('pruned', deleted)
+        return deleted
+
+    def _ensure_started(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='calendar-write-behind', daemon=True)
+                self._worker.start()
+
+    def start(self):
+        # 다른 프로세스가 남긴 항목도 처리하도록 명시적으로 시작할 수 있다
+        self._ensure_started()
+
+    def _claim(self):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE pending_events SET status = 'pending', claimed_by = NULL "
+                "WHERE status = 'inflight' AND claimed_at < ?",
+                (now - INFLIGHT_TIMEOUT,)
+            )
+            conn.execute(
+                "UPDATE pending_events SET status = 'inflight', claimed_by = ?, claimed_at = ? "
+                "WHERE id IN (SELECT id FROM pending_events WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?)",
+                (self._worker_id, now, now, self.batch_size)
+            )
+            rows = conn.execute(
+                "SELECT id, calendar_id, body, attempts FROM pending_events "
+                "WHERE status = 'inflight' AND claimed_by = ? AND claimed_at = ?",
+                (self._worker_id, now)
+            ).fetchall()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _next_due_in(self):
+        row = self._conn().execute(
+            "SELECT MIN(next_attempt_at) FROM pending_events WHERE status = 'pending'"
+        ).fetchone()
+        if row[0] is None:
+            return self.poll_interval
+        return max(0.0, min(self.poll_interval, row[0] - time.time()))
+
+    def _run(self):
+        while True:
+            try:
+                rows = self._claim()
+                if rows:
+                    self._submit(rows)
+                    continue
+                if time.time() - self._pruned_at >= PRUNE_INTERVAL:
+                    self._pruned_at = time.time()
+                    self.prune_failed()
+                wait = self._next_due_in()
+            except Exception as e:
+                print("캘린더 큐 처리 오류:", str(e))
+                wait = self.poll_interval
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def _guard(self):
+        return self.breaker.guard() if self.breaker is not None else contextlib.nullcontext()
+
+    def _submit(self, rows):
+        results = {}
+
+        def callback(request_id, response, exception):
+            results[request_id] = exception
+
+        try:
+            service = self.service_factory()
+            batch = service.new_batch_http_request(callback=callback)
+            for row_id, calendar_id, body, _ in rows:
+                batch.add(
+                    service.events().insert(calendarId=calendar_id, body=json.loads(body), sendUpdates='all'),
+                    request_id=str(row_id)
+                )
+            with self._guard(), metrics.upstream('calendar_batch'):
+                batch.execute()
+                _raise_if_unavailable(results)
+        except CircuitOpen:
+            self._defer(rows)
+            return
+        except Exception as e:
+            # 배치 전체가 실패하면 모든 항목을 재시도 대상으로 돌린다 (항목별 결과가 있으면 그대로 쓴다)
+            if len(results) < len(rows):
+                results = {str(row[0]): e for row in rows}
+        self._count('batches')
+        self._record(rows, results)
+
+    def _defer(self, rows):
+        # 브레이커가 닫힐 때까지 시도 횟수를 늘리지 않고 미룬다
+        retry_at = time.time() + self.breaker.reset_timeout
+        self._conn().executemany(
+            "UPDATE pending_events SET status = 'pending', next_attempt_at = ?, claimed_by = NULL WHERE id = ?",
+            [(retry_at, row[0]) for row in rows]
+        )
+        self._count('deferred', len(rows))
+
+    def _record(self, rows, results):
+        from googleapiclient.errors import HttpError
+        conn = self._conn()
+        now = time.time()
+        done, retry, failed = [], [], []
+        for row_id, _, _, attempts in rows:
+            exception = results.get(str(row_id))
+            if exception is None:
+                done.append((row_id,))
+                continue
+            status = exception.resp.status if isinstance(exception, HttpError) else None
+            if status == 409:
+                # 같은 id의 일정이 이미 있다: 이전 시도가 실제로는 성공한 경우
+                done.append((row_id,))
+            elif (status is None or status in RETRYABLE_STATUSES) and attempts + 1 < self.max_attempts:
+                retry.append((now + backoff_delay(attempts), str(exception)[:500], row_id))
+            else:
+                failed.append((str(exception)[:500], row_id))
+                print("캘린더 일정 등록 실패:", row_id, str(exception))
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("DELETE FROM pending_events WHERE id = ?", done)
+        conn.executemany(
+            "UPDATE pending_events SET status = 'pending', attempts = attempts + 1, next_attempt_at = ?, "
+            "last_error = ?, claimed_by = NULL WHERE id = ?",
+            retry
+        )
+        conn.executemany(
+            "UPDATE pending_events SET status = 'failed', attempts = attempts + 1, last_error = ?, "
+            "claimed_by = NULL WHERE id = ?",
+            failed
+        )
+        conn.execute("COMMIT")
+        self._count('inserted', len(done))
+        self._count('retried', len(retry))
+        self._count('failed', len(failed))
+
+
+def _raise_if_unavailable(results):
+    """배치 안의 항목이 하나도 성공하지 못하고 업스트림 장애로 끝났으면 브레이커에 실패로 기록되도록 다시 던진다"""
+    errors = list(results.values())
+    if errors and all(e is not None and is_upstream_failure(e) for e in errors):
+        raise errors[0]
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 업스트림(OpenAI, Calendar)별 서킷 브레이커
+# 연속 실패가 BREAKER_FAILURE_THRESHOLD 번이면 열려(open) BREAKER_RESET_TIMEOUT 초 동안 호출을 바로 거절하고,
+# 그 뒤 반 열림(half-open) 상태에서 시험 호출 BREAKER_HALF_OPEN_PROBES 개만 보내 성공하면 닫고 실패하면 다시 연다.
+# 업스트림이 망가졌을 때 요청마다 타임아웃까지 기다리지 않고 바로 안내 응답을 줄 수 있다.
+# 실패로 세는 것은 5xx/429 응답, 연결 오류, 그리고 충분한 시간을 주고도 난 타임아웃이다.
+# 4xx(429 제외)처럼 업스트림은 정상인데 요청이 잘못된 오류는 세지 않는다.
+# 요청 타임아웃은 남은 마감시간(deadline)으로 잘리므로, 마감이 거의 다 된 요청이 평소 응답 시간보다 짧은 타임아웃으로
+# 끊긴 것은 세지 않는다. 설정된 타임아웃을 다 줬거나 평소 응답 시간(최근 성공 호출의 분위수)보다 넉넉히 줬는데도
+# 끊겼다면 업스트림이 느린 것이므로 센다. 그래야 느려지거나 멈춘 업스트림에서도 브레이커가 열린다.
+# 최근 성공 호출 시간도 모아 두어, 남은 마감시간 안에 끝낼 수 있는 호출인지 판단하는 데 쓴다.
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 15))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv('BREAKER_HALF_OPEN_PROBES', 1))
+LATENCY_WINDOW = 50
+# 이보다 짧게 준 타임아웃으로 끊긴 호출은 실패로 세지 않는다 (최근 응답 시간 기록이 적을 때의 기준이기도 하다)
+BREAKER_TIMEOUT_FLOOR = float(os.getenv('BREAKER_TIMEOUT_FLOOR', 1.0))
+# 연결 자체가 안 된 오류 (openai, httpx, httplib2). 라이브러리를 가져오지 않도록 클래스 이름으로 본다
+CONNECTION_ERRORS = ('APIConnectionError', 'ConnectError', 'NetworkError', 'RemoteProtocolError',
+                     'ServerNotFoundError')
+# 타임아웃 오류 (openai.error.Timeout, httpx.TimeoutException). TimeoutError/socket.timeout 은 isinstance 로 본다
+TIMEOUT_ERRORS = ('Timeout', 'TimeoutException')
+
+# 지표 값: 0 닫힘, 1 반 열림, 2 열림
+CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+STATE_NAMES = ('closed', 'half_open', 'open')
+
+UNAVAILABLE_TEXT = "AI 답변 서비스가 잠시 원활하지 않습니다. 잠시 후 다시 시도해 주세요."
+
+
+class CircuitOpen(Exception):
+    """브레이커가 열려 있어 업스트림을 호출하지 않음"""
+
+
+def is_upstream_failure(error):
+    """업스트림 장애로 볼 오류인지. openai/googleapiclient/httpx 오류의 HTTP 상태와 연결 오류 여부를 본다
+
+    True 장애, False 업스트림은 응답한 요청 오류(성공으로 기록), None 판단할 수 없음(기록하지 않음).
+    타임아웃도 None 이며, 실패로 셀지는 guard() 가 호출에 준 타임아웃을 보고 정한다.
+    """
+    status = getattr(error, 'http_status', None)
+    if status is None and getattr(error, 'resp', None) is not None:
+        status = getattr(error.resp, 'status', None)
+    if status is None and getattr(error, 'response', None) is not None:
+        status = getattr(error.response, 'status_code', None)
+    if status is None:
+        if isinstance(error, ConnectionError) or any(cls.__name__ in CONNECTION_ERRORS for cls in type(error).__mro__):
+            return True
+        return None
+    status = int(status)
+    return status >= 500 or status == 429
+
+
+def is_timeout(error):
+    return isinstance(error, TimeoutError) or any(cls.__name__ in TIMEOUT_ERRORS for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT,
+                 half_open_probes=BREAKER_HALF_OPEN_PROBES, is_failure=is_upstream_failure):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.is_failure = is_failure
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0, 'probes': 0}
+
+    def _current_state(self, now):
+        # 열린 지 reset_timeout 이 지나면 반 열림으로 (잠금 안에서 호출)
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def check(self):
+        """열려 있으면 CircuitOpen. 반 열림 자리는 차지하지 않는다 (대기열에 들어가기 전 빠른 확인용)"""
+        with self._lock:
+            if self._current_state(time.monotonic()) == OPEN:
+                self.stats['rejected'] += 1
+                raise CircuitOpen(f"{self.name} 서킷 브레이커 열림")
+
+    def _before(self):
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == OPEN or (state == HALF_OPEN and self._probes >= self.half_open_probes):
+                self.stats['rejected'] += 1
+                raise CircuitOpen(f"{self.name} 서킷 브레이커 열림")
+            if state == HALF_OPEN:
+                self._probes += 1
+                self.stats['probes'] += 1
+            return state
+
+    def _on_success(self, seconds):
+        with self._lock:
+            self.stats['successes'] += 1
+            self._latencies.append(seconds)
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+
+    def _on_failure(self, state):
+        with self._lock:
+            self.stats['failures'] += 1
+            self._failures += 1
+            if state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.stats['opened'] += 1
+                    print(f"서킷 브레이커 열림: {self.name} (연속 실패 {self._failures})")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _timeout_counts(self, timeout, configured):
+        """이 타임아웃을 업스트림 실패로 셀지: 마감시간 때문에 평소 응답 시간보다 짧게 잘린 호출이 아니면 센다"""
+        if timeout is None or (configured is not None and timeout >= configured):
+            return True
+        return timeout >= max(BREAKER_TIMEOUT_FLOOR, self.expected_seconds(BREAKER_TIMEOUT_FLOOR))
+
+    @contextmanager
+    def guard(self, timeout=None, configured=None):
+        """with 블록 안의 업스트림 호출 결과를 기록한다. 열려 있으면 블록을 실행하지 않고 CircuitOpen
+
+        timeout 은 이 호출에 실제로 준 타임아웃(초), configured 는 마감시간으로 자르기 전 설정값.
+        timeout 이 None 이면 클라이언트에 설정된 타임아웃을 다 준 것으로 본다.
+        """
+        state = self._before()
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            failed = self.is_failure(e)
+            if failed is None and is_timeout(e) and self._timeout_counts(timeout, configured):
+                failed = True
+            if failed:
+                self._on_failure(state)
+            elif failed is not None:
+                self._on_success(time.monotonic() - start)
+            raise
+        else:
+            self._on_success(time.monotonic() - start)
+        finally:
+            if state == HALF_OPEN:
+                with self._lock:
+                    self._probes -= 1
+
+    def expected_seconds(self, default, quantile=0.9):
+        """최근 성공 호출 시간의 분위수 (기록이 적으면 default)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 5:
+            return default
+        return max(default / 4, latencies[min(len(latencies) - 1, int(len(latencies) * quantile))])
+
+    def metrics(self):
+        """/metrics 용: 누적 수 + 현재 상태 값"""
+        return dict(self.stats, state=self.state())
@@ -0,0 +1,316 @@
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from answer_cache import normalize_utterance
+
+# /question 사용자별 대화 기억
+# 카카오 사용자 id 마다 최근 대화 몇 턴과 그 이전 대화의 요약만 남겨 다음 질문의 프롬프트에 붙인다.
+#   - 최근 턴은 개수(CONVERSATION_MAX_TURNS)와 토큰 예산(CONVERSATION_TOKEN_BUDGET)을 넘지 않는 링 버퍼
+#   - 넘치는 오래된 턴은 GPT 호출 없이 한 줄 요약("사용자: ... / 답변: ...")으로 접고,
+#     요약도 CONVERSATION_SUMMARY_TOKENS 를 넘으면 오래된 줄부터 버린다 → 프롬프트 크기가 항상 제한된다
+#   - 세션 하나는 struct 로 묶은 바이트열 하나로 저장한다 (사용자당 수백 바이트~수 KB)
+# CONVERSATION_DB 가 있으면 워커들이 SQLite 파일을 함께 쓰므로 다음 질문이 다른 워커로 가도 맥락이 이어진다.
+# 비워 두면 워커 메모리에만 두고, 전체 크기 상한(CONVERSATION_MAX_BYTES)을 넘으면 가장 오래 쉰 세션부터 지운다.
+# 기본으로는 꺼져 있다 (CONVERSATION_MEMORY=1 로 켠다). 켜더라도 앞 대화를 가리키는 질문(depends_on_context)만
+# 앞 대화와 함께 보내고, 나머지는 지금처럼 공유 답변 캐시/싱글플라이트를 쓴다.
+
+CONVERSATION_MEMORY = os.getenv('CONVERSATION_MEMORY', '0') == '1'
+CONVERSATION_MAX_TURNS = int(os.getenv('CONVERSATION_MAX_TURNS', 6))
+CONVERSATION_TOKEN_BUDGET = int(os.getenv('CONVERSATION_TOKEN_BUDGET', 800))
+CONVERSATION_SUMMARY_TOKENS = int(os.getenv('CONVERSATION_SUMMARY_TOKENS', 300))
+CONVERSATION_IDLE_TTL = float(os.getenv('CONVERSATION_IDLE_TTL', 1800))
+CONVERSATION_MAX_BYTES = int(os.getenv('CONVERSATION_MAX_BYTES', 64 * 1024 * 1024))
+CONVERSATION_DB = os.getenv('CONVERSATION_DB', 'conversations.db')
+# 저장할 때 메시지 하나를 자르는 길이 (카카오 simpleText 최대 1000자)
+MAX_MESSAGE_CHARS = 1000
+SUMMARY_SNIPPET_CHARS = 60
+SUMMARY_PROMPT = "이전 대화 요약:\n"
+
+USER, ASSISTANT = 0, 1
+ROLES = ('user', 'assistant')
+_HEADER = struct.Struct('<BHB')   # 형식 버전, 요약 바이트 수, 턴 수
+_TURN = struct.Struct('<BH')      # 역할, 바이트 수
+FORMAT_VERSION = 1
+# 앞 대화를 가리키는 표현. 첫 어절은 그대로, 나머지는 공백/문장부호를 뺀 질문에서 찾는다
+FOLLOW_UP_FIRST_WORDS = ('그럼', '그러면', '그래서', '그런데', '근데', '그리고', '또', '아까', '방금', '그때')
+FOLLOW_UP_FIRST_PREFIXES = ('그건', '그거', '그게', '그것', '그중', '거기')
+FOLLOW_UP_WORDS = ('말씀하신', '말한거', '얘기한', '알려준', '알려주신', '앞에서', '위에서', '더자세히', '다른건',
+                   '다른거', '그중에', '예를들면')
+FOLLOW_UP_QUESTIONS = ('왜', '왜요', '예시', '예를들면', '그래서', '진짜', '정말')
+# "주말은요?", "가격은?" 처럼 주어만 남긴 짧은 질문
+FOLLOW_UP_ENDINGS = ('은요', '는요', '이요', '도요', '은', '는')
+FOLLOW_UP_MAX_CHARS = 8
+# 메모리 저장소에서 세션 하나가 바이트열 말고 더 차지하는 대략의 크기 (dict 칸, 키 문자열, 튜플)
+ENTRY_OVERHEAD = 200
+
+
+def estimate_tokens(text):
+    """gpt-3.5 토큰 수 어림값: 한글 한 글자 ≈ 1토큰, 그 밖의 글자 4개 ≈ 1토큰"""
+    # 한글은 UTF-8 로 3바이트라 (바이트 수 - 글자 수) / 2 가 한글 글자 수다. 글자마다 도는 것보다 훨씬 빠르다
+    hangul = (len(text.encode('utf-8')) - len(text)) // 2
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def _snippet(text):
+    # 첫 문장만, 길면 자른다
+    text = ' '.join(text.split())
+    for mark in ('. ', '? ', '! ', '다. '):
+        i = text.find(mark)
+        if 0 < i < SUMMARY_SNIPPET_CHARS:
+            return text[:i + 1]
+    return text if len(text) <= SUMMARY_SNIPPET_CHARS else text[:SUMMARY_SNIPPET_CHARS] + '…'
+
+
+def depends_on_context(question):
+    """앞 대화를 알아야 답할 수 있는 질문인지 ("그럼 주말은요?", "아까 말씀하신 거 더 자세히")"""
+    words = (question or '').split()
+    if not words:
+        return False
+    first = normalize_utterance(words[0])
+    if first in FOLLOW_UP_FIRST_WORDS or first.startswith(FOLLOW_UP_FIRST_PREFIXES):
+        return True
+    text = normalize_utterance(question)
+    if text in FOLLOW_UP_QUESTIONS or any(word in text for word in FOLLOW_UP_WORDS):
+        return True
+    return len(text) <= FOLLOW_UP_MAX_CHARS and text.endswith(FOLLOW_UP_ENDINGS)
+
+
+class Conversation:
+    """요약 한 덩어리 + 최근 (역할, 내용) 턴 목록"""
+
+    __slots__ = ('summary', 'turns')
+
+    def __init__(self, summary='', turns=None):
+        self.summary = summary
+        self.turns = turns or []
+
+    def __bool__(self):
+        return bool(self.summary or self.turns)
+
+    def messages(self, question):
+        """ChatCompletion messages: 요약(system) + 최근 턴 + 이번 질문"""
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": SUMMARY_PROMPT + self.summary})
+        messages.extend({"role": ROLES[role], "content": text} for role, text in self.turns)
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def add(self, question, answer):
+        self.turns.append((USER, question[:MAX_MESSAGE_CHARS]))
+        self.turns.append((ASSISTANT, answer[:MAX_MESSAGE_CHARS]))
+
+    def compact(self, max_turns=CONVERSATION_MAX_TURNS, token_budget=CONVERSATION_TOKEN_BUDGET,
+                summary_tokens=CONVERSATION_SUMMARY_TOKENS):
+        """턴 수/토큰 예산을 넘는 오래된 질문-답변 쌍을 요약으로 접고, 접은 쌍 수를 돌려준다"""
+        folded = []
+        tokens = sum(estimate_tokens(text) for _, text in self.turns)
+        # 가장 최근 한 쌍은 예산을 넘더라도 남긴다
+        while len(self.turns) > 2 and (len(self.turns) > max_turns * 2 or tokens > token_budget):
+            pair, self.turns = self.turns[:2], self.turns[2:]
+            tokens -= sum(estimate_tokens(text) for _, text in pair)
+            folded.append(f"- 사용자: {_snippet(pair[0][1])} / 답변: {_snippet(pair[1][1])}")
+        if folded:
+            lines = (self.summary.split('\n') if self.summary else []) + folded
+            while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > summary_tokens:
+                lines.pop(0)
+            self.summary = '\n'.join(lines)
+        return len(folded)
+
+    def prompt_tokens(self, question=''):
+        return sum(estimate_tokens(m['content']) for m in self.messages(question))
+
+    def encode(self):
+        summary = self.summary.encode('utf-8')
+        parts = [_HEADER.pack(FORMAT_VERSION, len(summary), len(self.turns)), summary]
+        for role, text in self.turns:
+            data = text.encode('utf-8')
+            parts.append(_TURN.pack(role, len(data)))
+            parts.append(data)
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, blob):
+        version, summary_len, count = _HEADER.unpack_from(blob, 0)
+        if version != FORMAT_VERSION:
+            return cls()
+        offset = _HEADER.size
+        summary = blob[offset:offset + summary_len].decode('utf-8')
+        offset += summary_len
+        turns = []
+        for _ in range(count):
+            role, length = _TURN.unpack_from(blob, offset)
+            offset += _TURN.size
+            turns.append((role, blob[offset:offset + length].decode('utf-8')))
+            offset += length
+        return cls(summary, turns)
+
+
+class MemoryConversationStore:
+    """워커 메모리 저장소. 마지막 사용 순서로 정렬해 두고 쉰 지 오래된 세션부터 지운다"""
+
+    def __init__(self, max_bytes=CONVERSATION_MAX_BYTES, idle_ttl=CONVERSATION_IDLE_TTL):
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, user_id, now):
+        with self._lock:
+            entry = self._sessions.get(user_id)
+            if entry is None:
+                return None
+            if entry[1] <= now - self.idle_ttl:
+                self._remove(user_id)
+                return None
+            return entry[0]
+
+    def put(self, user_id, blob, now):
+        with self._lock:
+            if user_id in self._sessions:
+                self._remove(user_id)
+            self._sessions[user_id] = (blob, now)
+            self._bytes += len(blob) + ENTRY_OVERHEAD
+            self._evict(now)
+
+    def _remove(self, user_id):
+        blob, _ = self._sessions.pop(user_id)
+        self._bytes -= len(blob) + ENTRY_OVERHEAD
+
+    def _evict(self, now):
+        while self._sessions:
+            user_id, (_, last_active) = next(iter(self._sessions.items()))
+            if self._bytes <= self.max_bytes and last_active > now - self.idle_ttl:
+                return
+            self._remove(user_id)
+            self.evictions += 1
+
+    def usage(self):
+        """(세션 수, 대략의 메모리 바이트)"""
+        with self._lock:
+            return len(self._sessions), self._bytes
+
+
+class SQLiteConversationStore:
+    """워커들이 함께 쓰는 SQLite 저장소. 전체 크기 상한은 정리할 때 오래 쉰 세션부터 지워 맞춘다"""
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, max_bytes=CONVERSATION_MAX_BYTES, idle_ttl=CONVERSATION_IDLE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._local = threading.local()
+        self._writes = 0
+        self.evictions = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "user_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS conversations_updated_at ON conversations (updated_at)")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, user_id, now):
+        row = self._conn().execute(
+            "SELECT data FROM conversations WHERE user_id = ? AND updated_at > ?", (user_id, now - self.idle_ttl)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def put(self, user_id, blob, now):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO conversations (user_id, data, updated_at) VALUES (?, ?, ?)",
+            (user_id, blob, now)
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune(now)
+
+    def prune(self, now):
+        conn = self._conn()
+        cursor = conn.execute("DELETE FROM conversations WHERE updated_at <= ?", (now - self.idle_ttl,))
+        removed = cursor.rowcount
+        total = conn.execute("SELECT COALESCE(SUM(length(data)), 0) FROM conversations").fetchone()[0]
+        if total <= self.max_bytes:
+            self.evictions += removed
+            return
+        # 최근 세션부터 누적한 크기가 상한을 넘는 나머지를 지운다
+        cursor = conn.execute(
+            "DELETE FROM conversations WHERE user_id IN ("
+            "SELECT user_id FROM (SELECT user_id, SUM(length(data)) OVER (ORDER BY updated_at DESC) AS total "
+            "FROM conversations) WHERE total > ?)",
+            (self.max_bytes,)
+        )
+        self.evictions += removed + cursor.rowcount
+
+    def usage(self):
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(length(data)), 0) FROM conversations WHERE updated_at > ?",
+            (time.time() - self.idle_ttl,)
+        ).fetchone()
+        return row[0], row[1]
+
+
+class ConversationMemory:
+    def __init__(self, store=None, db_path=CONVERSATION_DB):
+        if store is None:
+            store = SQLiteConversationStore(db_path) if db_path else MemoryConversationStore()
+        self.store = store
+        self._stats_lock = threading.Lock()
+        self.stats = {'loads': 0, 'new_sessions': 0, 'saves': 0, 'folded_turns': 0, 'errors': 0}
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self.stats[name] += n
+
+    def load(self, user_id):
+        """사용자의 대화. 사용자 id 가 없거나 기록이 없으면 빈 대화"""
+        if not user_id:
+            return Conversation()
+        try:
+            blob = self.store.get(user_id, time.time())
+        except sqlite3.Error as e:
+            print("대화 기록 조회 오류:", str(e))
+            self._count('errors')
+            return Conversation()
+        self._count('loads' if blob is not None else 'new_sessions')
+        return Conversation.decode(blob) if blob is not None else Conversation()
+
+    def record(self, user_id, conversation, question, answer):
+        """이번 질문/답변을 붙이고 예산에 맞게 접어서 저장한다"""
+        if not user_id:
+            return
+        conversation.add(question, answer)
+        folded = conversation.compact()
+        if folded:
+            self._count('folded_turns', folded)
+        try:
+            self.store.put(user_id, conversation.encode(), time.time())
+            self._count('saves')
+        except sqlite3.Error as e:
+            print("대화 기록 저장 오류:", str(e))
+            self._count('errors')
+
+    def usage(self):
+        try:
+            return self.store.usage()
+        except sqlite3.Error:
+            return 0, 0
+
+    def metrics(self):
+        """/metrics 용 stats + 현재 세션 수/바이트/지운 세션 수"""
+        sessions, size = self.usage()
+        return dict(self.stats, sessions=sessions, bytes=size, evictions=self.store.evictions)
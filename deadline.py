@@ -0,0 +1,76 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# 요청별 마감시간(deadline budget)
+# 카카오 스킬 서버는 약 5초 안에 응답해야 하므로, 요청이 들어온 순간 마감시간을 잡고
+# 그 아래의 모든 업스트림 호출(OpenAI, Calendar)이 남은 시간만큼만 기다리게 한다.
+# contextvars 에 두어 Flask 스레드와 asyncio 태스크 모두에서 인자로 넘기지 않고 꺼내 쓸 수 있다.
+# 콜백 작업처럼 마감이 다른 작업은 scope() 로 자기 마감시간을 잡는다.
+
+KAKAO_SKILL_TIMEOUT = float(os.getenv('KAKAO_SKILL_TIMEOUT', 5.0))
+# 응답 직렬화/네트워크 전송에 남겨 둘 여유
+DEADLINE_MARGIN = float(os.getenv('DEADLINE_MARGIN', 0.3))
+# 남은 시간이 이보다 짧으면 업스트림 호출을 시작하지 않는다
+MIN_UPSTREAM_SECONDS = float(os.getenv('MIN_UPSTREAM_SECONDS', 0.5))
+
+TIMEOUT_TEXT = "처리 시간이 부족해 요청을 끝내지 못했습니다. 잠시 후 다시 시도해 주세요."
+
+_current = ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """남은 시간 안에 끝낼 수 없는 호출이라 시작하지 않음"""
+
+
+class Deadline:
+    __slots__ = ('expires_at',)
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def timeout(self, cap=None):
+        """cap 과 남은 시간 중 작은 값"""
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+    def require(self, seconds, what):
+        remaining = self.remaining()
+        if remaining < seconds:
+            raise DeadlineExceeded(f"{what}: 남은 시간 {remaining:.2f}초 < 필요 {seconds:.2f}초")
+
+
+def start(seconds=None):
+    """현재 컨텍스트(요청 스레드/태스크)의 마감시간을 새로 잡는다"""
+    deadline = Deadline(KAKAO_SKILL_TIMEOUT - DEADLINE_MARGIN if seconds is None else seconds)
+    _current.set(deadline)
+    return deadline
+
+
+@contextmanager
+def scope(seconds):
+    token = _current.set(Deadline(seconds))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def timeout(cap):
+    """마감시간이 없으면(배치 작업 등) cap 그대로"""
+    deadline = _current.get()
+    return cap if deadline is None else deadline.timeout(cap)
+
+
+def require(seconds, what):
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.require(seconds, what)
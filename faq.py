@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+
+from answer_cache import normalize_utterance
+
+# /question 로컬 FAQ 응답
+# 운영자가 관리하는 FAQ 파일을 글자 2-gram BM25 로 색인하고, 들어온 질문의 점수가 기준값 이상이면
+# GPT 호출 없이 FAQ 답변을 바로 돌려준다. 한국어는 띄어쓰기/조사가 제각각이라 형태소 대신 글자 n-gram 을 쓴다.
+# 한 FAQ 항목의 질문 문장들을 하나의 문서로 묶어 색인하고, 점수는 질문 자신과 완전히 일치할 때의
+# 점수(질문 n-gram 들의 idf 합)로 나눠 0~1 의 확신도로 쓴다. FAQ 에 없는 n-gram 이 많을수록 낮아진다.
+# 파일이 바뀌면(mtime) FAQ_RELOAD_INTERVAL 초 안에 다시 읽으며, 읽기에 실패하면 이전 색인을 계속 쓴다.
+#
+# FAQ 파일 형식 (JSON 배열):
+#   [{"id": "hours", "questions": ["영업시간이 어떻게 되나요", "몇 시까지 하나요"], "answer": "..."}]
+# faq.example.json 은 형식 예시일 뿐 실제 운영 정보가 아니다. 운영자가 실제 안내 문구로 파일을 만들어
+# FAQ_FILE 로 지정할 때만 켜진다 (기본값 빈 문자열 = 사용 안 함).
+
+FAQ_FILE = os.getenv('FAQ_FILE', '')
+FAQ_THRESHOLD = float(os.getenv('FAQ_THRESHOLD', 0.6))
+FAQ_RELOAD_INTERVAL = float(os.getenv('FAQ_RELOAD_INTERVAL', 5))
+NGRAM_SIZE = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def ngrams(text):
+    """정규화한 문장의 글자 n-gram 빈도"""
+    text = normalize_utterance(text)
+    if len(text) < NGRAM_SIZE:
+        return Counter([text]) if text else Counter()
+    return Counter(text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1))
+
+
+def load_entries(path):
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    for entry in entries:
+        if not entry.get('answer') or not entry.get('questions'):
+            raise ValueError(f"FAQ 항목에 questions/answer 가 없습니다: {entry.get('id')}")
+    return entries
+
+
+class FAQIndex:
+    """FAQ 항목별 글자 n-gram BM25 역색인"""
+
+    def __init__(self, entries, k1=BM25_K1, b=BM25_B):
+        self.entries = entries
+        docs = []
+        for entry in entries:
+            grams = Counter()
+            for question in entry['questions']:
+                grams.update(ngrams(question))
+            docs.append(grams)
+        total = len(docs)
+        avg_len = sum(sum(grams.values()) for grams in docs) / max(1, total)
+        df = Counter(gram for grams in docs for gram in grams)
+        self._idf = {gram: self._bm25_idf(total, count) for gram, count in df.items()}
+        # FAQ 에 나오지 않은 n-gram 은 가장 드문 n-gram 만큼 친다 (확신도 분모에만 쓰인다)
+        self._unknown_idf = self._bm25_idf(total, 1)
+        # 역색인: n-gram -> [(항목 번호, 미리 계산한 BM25 항)]
+        self._postings = {}
+        for i, grams in enumerate(docs):
+            length_norm = k1 * (1 - b + b * sum(grams.values()) / avg_len)
+            for gram, tf in grams.items():
+                weight = self._idf[gram] * tf * (k1 + 1) / (tf + length_norm)
+                self._postings.setdefault(gram, []).append((i, weight))
+
+    @staticmethod
+    def _bm25_idf(total, count):
+        return math.log(1 + (total - count + 0.5) / (count + 0.5))
+
+    def search(self, text):
+        """(FAQ 항목, 확신도 0~1) 또는 None"""
+        grams = ngrams(text)
+        if not grams:
+            return None
+        scores = {}
+        best_possible = 0.0
+        for gram in grams:
+            best_possible += self._idf.get(gram, self._unknown_idf)
+            for i, weight in self._postings.get(gram, ()):
+                scores[i] = scores.get(i, 0.0) + weight
+        if not scores:
+            return None
+        i = max(scores, key=scores.get)
+        return self.entries[i], min(1.0, scores[i] / best_possible)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class FAQ:
+    def __init__(self, path=FAQ_FILE, threshold=FAQ_THRESHOLD, reload_interval=FAQ_RELOAD_INTERVAL):
+        self.path = path
+        self.threshold = threshold
+        self.reload_interval = reload_interval
+        self._index = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'reloads': 0, 'reload_errors': 0}
+
+    def maybe_reload(self):
+        """파일이 바뀌었으면 다시 색인한다. 확인은 reload_interval 마다 한 번만"""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # 다른 스레드가 확인 중이면 기존 색인으로 응답
+        try:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns if self.path else None
+            except OSError:
+                mtime = None
+            if mtime == self._mtime:
+                return
+            if mtime is None:
+                self._index = None
+            else:
+                try:
+                    self._index = FAQIndex(load_entries(self.path))
+                except (OSError, ValueError) as e:
+                    self.stats['reload_errors'] += 1
+                    print("FAQ 파일 읽기 오류:", str(e))
+                    return
+                self.stats['reloads'] += 1
+            self._mtime = mtime
+        finally:
+            self._lock.release()
+
+    def search(self, question):
+        self.maybe_reload()
+        index = self._index
+        if index is None:
+            return None
+        return index.search(question)
+
+    def lookup(self, question):
+        """기준값 이상으로 비슷한 FAQ 답변, 없으면 None"""
+        found = self.search(question)
+        hit = found is not None and found[1] >= self.threshold
+        with self._stats_lock:
+            self.stats['hits' if hit else 'misses'] += 1
+        return found[0]['answer'] if hit else None
+
+    def __len__(self):
+        index = self._index
+        return len(index) if index is not None else 0
@@ -1,7 +1,21 @@
 import os
+import sys
 
 port = int(os.environ.get("PORT", 10000))
 bind = f"0.0.0.0:{port}"
 workers = 2
 threads = 4
-timeout = 120 
\ No newline at end of file
+timeout = 120
+
+# ASGI 모드: SERVER_MODE=asgi gunicorn asgi_app:app --config gunicorn_config.py
+# uvicorn 워커 하나가 이벤트 루프로 수백 개의 느린 업스트림 호출을 동시에 처리한다
+if os.environ.get("SERVER_MODE") == "asgi":
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def post_worker_init(worker):
+    # 포트는 이미 열려 있으므로 앱 모듈의 warm_up()으로 무거운 클라이언트를 백그라운드에서 준비한다
+    module = sys.modules.get(worker.app.app_uri.split(':')[0])
+    warm_up = getattr(module, 'warm_up', None)
+    if warm_up is not None:
+        warm_up()
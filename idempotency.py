@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from answer_cache import normalize_utterance
+from singleflight import AsyncSingleFlight, SingleFlight
+
+# /schedule 재전송 중복 방지
+# 카카오는 응답이 늦으면 같은 스킬 요청을 다시 보낸다. 사용자 id + 정규화한 발화를 키로
+# 처음 처리한 결과를 일정 시간 보관해 두고, 재전송에는 OpenAI/Calendar 호출 없이 그 결과를 돌려준다.
+# 같은 워커 안의 동시 재전송은 SingleFlight로 합치고, 다른 워커와는 SQLite 파일로 처리 중 표시를 공유한다.
+
+SCHEDULE_IDEMPOTENCY_WINDOW = float(os.getenv('SCHEDULE_IDEMPOTENCY_WINDOW', 600))
+SCHEDULE_IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('SCHEDULE_IDEMPOTENCY_MAX_ENTRIES', 4096))
+SCHEDULE_IDEMPOTENCY_DB = os.getenv('SCHEDULE_IDEMPOTENCY_DB', 'schedule_requests.db')
+# 다른 워커가 처리 중인 요청을 기다리는 최대 시간 (카카오 응답 제한 5초 안쪽)
+WAIT_TIMEOUT = 3.5
+WAIT_INTERVAL = 0.05
+# 처리 중 표시가 이 시간보다 오래되면 워커가 죽은 것으로 보고 다시 처리한다
+PENDING_TIMEOUT = 60.0
+
+IN_PROGRESS_TEXT = "앞서 보낸 일정 요청을 처리하고 있습니다. 잠시 후 다시 확인해 주세요."
+
+
+class InProgress(Exception):
+    """다른 워커가 같은 요청을 아직 처리 중"""
+
+
+def request_key(user_id, utterance):
+    """16바이트 키. 사용자 id나 발화가 없으면 None"""
+    text = normalize_utterance(utterance)
+    if not user_id or not text:
+        return None
+    return hashlib.blake2b(f"{user_id}\0{text}".encode('utf-8'), digest_size=16).digest()
+
+
+def event_id(key, start_datetime):
+    # 저장소를 놓쳐도 Calendar 쪽에서 중복(409)으로 걸러지도록 일정 id를 키에서 정한다
+    return hashlib.blake2b(key + start_datetime.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SQLiteRequestStore:
+    """워커들이 함께 쓰는 처리 결과/처리 중 표시 저장소"""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS schedule_requests ("
+            "key BLOB PRIMARY KEY, response TEXT, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, now):
+        """(response 또는 처리 중이면 None, expires_at) / 없으면 None"""
+        row = self._conn().execute(
+            "SELECT response, expires_at FROM schedule_requests WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return (json.loads(row[0]) if row[0] is not None else None), row[1]
+
+    def claim(self, key, now):
+        """처리 중 표시를 남긴다. 이미 유효한 항목이 있으면 False"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM schedule_requests WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO schedule_requests (key, response, expires_at) VALUES (?, NULL, ?)",
+                (key, now + PENDING_TIMEOUT)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def release(self, key):
+        self._conn().execute("DELETE FROM schedule_requests WHERE key = ? AND response IS NULL", (key,))
+
+    def set(self, key, response, expires_at):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO schedule_requests (key, response, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(response, ensure_ascii=False), expires_at)
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune(time.time())
+
+    def prune(self, now):
+        conn = self._conn()
+        conn.execute("DELETE FROM schedule_requests WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM schedule_requests WHERE key IN ("
+            "SELECT key FROM schedule_requests ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+
+class IdempotentRequests:
+    def __init__(self, window=SCHEDULE_IDEMPOTENCY_WINDOW, max_entries=SCHEDULE_IDEMPOTENCY_MAX_ENTRIES,
+                 db_path=SCHEDULE_IDEMPOTENCY_DB):
+        self.window = window
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = self._new_flights()
+        self._shared = SQLiteRequestStore(db_path, max_entries) if db_path else None
+        self.stats = {'hits': 0, 'shared_hits': 0, 'coalesced': 0, 'misses': 0, 'stored': 0, 'in_progress': 0}
+
+    def _new_flights(self):
+        return SingleFlight()
+
+    def do(self, key, fn):
+        """key 로 처리한 결과가 있으면 돌려주고, 없으면 fn() 을 한 번만 실행한다
+
+        fn 은 (response, final) 을 돌려준다. final 이 거짓이면(오류, 겹침 안내) 결과를 보관하지 않아
+        재전송 때 다시 처리한다. 다른 워커가 처리 중이면 InProgress 를 던진다.
+        """
+        response = self._lookup(key)
+        if response is not None:
+            return response
+        ran = []
+        result = self._flights.do(key, lambda: ran.append(True) or self._run(key, fn))
+        if not ran:
+            self._count('coalesced')
+        return result
+
+    def _run(self, key, fn):
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while True:
+            claimed, response = self._claim_shared(key, deadline)
+            if claimed or response is not None:
+                break
+            time.sleep(WAIT_INTERVAL)
+        if response is not None:
+            return response
+        try:
+            response, final = fn()
+        except Exception:
+            self._release(key)
+            raise
+        return self._finish(key, response, final)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _lookup(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.stats['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+        return None
+
+    def _claim_shared(self, key, deadline):
+        """(처리 권한을 얻었는지, 다른 워커가 남긴 결과)
+
+        둘 다 없으면 다른 워커가 처리 중이므로 잠시 뒤 다시 확인한다. 마감이 지나면 InProgress.
+        """
+        if self._shared is None:
+            self._count('misses')
+            return True, None
+        try:
+            now = time.time()
+            found = self._shared.get(key, now)
+            if found is not None and found[0] is not None:
+                response, expires_at = found
+                with self._lock:
+                    self._store(key, response, expires_at)
+                    self.stats['shared_hits'] += 1
+                return False, response
+            if found is None and self._shared.claim(key, now):
+                self._count('misses')
+                return True, None
+        except sqlite3.Error as e:
+            # 공유 저장소를 못 쓰면 워커 안에서만 중복을 막는다
+            print("일정 요청 저장소 오류:", str(e))
+            self._count('misses')
+            return True, None
+        if time.monotonic() >= deadline:
+            self._count('in_progress')
+            raise InProgress(IN_PROGRESS_TEXT)
+        return False, None
+
+    def _finish(self, key, response, final):
+        if not final:
+            self._release(key)
+            return response
+        expires_at = time.time() + self.window
+        with self._lock:
+            self._store(key, response, expires_at)
+            self.stats['stored'] += 1
+        if self._shared is not None:
+            try:
+                self._shared.set(key, response, expires_at)
+            except sqlite3.Error as e:
+                print("일정 요청 저장 오류:", str(e))
+        return response
+
+    def _release(self, key):
+        if self._shared is not None:
+            try:
+                self._shared.release(key)
+            except sqlite3.Error as e:
+                print("일정 요청 저장소 오류:", str(e))
+
+    def _store(self, key, response, expires_at):
+        self._entries[key] = (expires_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AsyncIdempotentRequests(IdempotentRequests):
+    """asyncio 버전. 이벤트 루프 하나 안에서만 사용하고, fn 은 코루틴 함수다.
+
+    공유 SQLite 저장소를 쓰는 단계(처리 권한 얻기, 결과 저장, 처리 중 표시 지우기)는 스레드 풀에서 돌린다.
+    """
+
+    def _new_flights(self):
+        return AsyncSingleFlight()
+
+    async def _blocking(self, fn, *args):
+        if self._shared is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def do(self, key, fn):
+        response = self._lookup(key)
+        if response is not None:
+            return response
+        ran = []
+
+        async def run():
+            ran.append(True)
+            return await self._run(key, fn)
+
+        result = await self._flights.do(key, run)
+        if not ran:
+            self._count('coalesced')
+        return result
+
+    async def _run(self, key, fn):
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while True:
+            claimed, response = await self._blocking(self._claim_shared, key, deadline)
+            if claimed or response is not None:
+                break
+            await asyncio.sleep(WAIT_INTERVAL)
+        if response is not None:
+            return response
+        try:
+            response, final = await fn()
+        except BaseException:
+            await self._blocking(self._release, key)
+            raise
+        return await self._blocking(self._finish, key, response, final)
@@ -0,0 +1,119 @@
+import os
+import queue
+import threading
+import time
+
+from responses import JSON_CONTENT_TYPE, dumps, simple_text
+
+# 카카오 오픈빌더 콜백 모드
+# 스킬 응답 제한(약 5초) 안에 useCallback 응답을 먼저 돌려주고,
+# 실제 답변은 백그라운드 워커가 만들어 callbackUrl로 전송한다.
+
+CALLBACK_ENABLED = os.getenv('KAKAO_CALLBACK_ENABLED', '1') == '1'
+CALLBACK_WORKERS = int(os.getenv('KAKAO_CALLBACK_WORKERS', 4))
+CALLBACK_QUEUE_SIZE = int(os.getenv('KAKAO_CALLBACK_QUEUE_SIZE', 32))
+# callbackUrl은 발급 후 1분간 유효하므로 여유를 두고 마감시간을 잡는다
+CALLBACK_DEADLINE = float(os.getenv('KAKAO_CALLBACK_DEADLINE', 55))
+CALLBACK_POST_TIMEOUT = 5
+
+ACK_TEXT = "답변을 준비하고 있어요. 잠시만 기다려 주세요!"
+BUSY_TEXT = "지금은 질문이 많아 답변이 어렵습니다. 잠시 후 다시 시도해 주세요."
+TIMEOUT_TEXT = "답변 생성 시간이 초과되었습니다. 다시 질문해 주세요."
+
+
+def get_callback_url(request_data):
+    return (request_data.get('userRequest') or {}).get('callbackUrl')
+
+
+def get_user_id(request_data):
+    # 봇 사용자 키. 재전송된 요청을 구분하는 데 쓴다
+    return ((request_data.get('userRequest') or {}).get('user') or {}).get('id')
+
+
+def ack_response(text=ACK_TEXT):
+    return {"version": "2.0", "useCallback": True, "data": {"text": text}}
+
+
+class CallbackJob:
+    def __init__(self, callback_url, handler, deadline):
+        self.callback_url = callback_url
+        self.handler = handler
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+
+
+class CallbackDispatcher:
+    """크기가 제한된 작업 큐와 워커 스레드로 콜백 응답을 처리"""
+
+    def __init__(self, workers=CALLBACK_WORKERS, queue_size=CALLBACK_QUEUE_SIZE,
+                 deadline=CALLBACK_DEADLINE, post_timeout=CALLBACK_POST_TIMEOUT):
+        self.workers = workers
+        self.deadline = deadline
+        self.post_timeout = post_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._session = None
+        self.stats = {'submitted': 0, 'rejected': 0, 'delivered': 0, 'expired': 0, 'failed': 0}
+
+    def _ensure_started(self):
+        # gunicorn이 워커를 fork한 뒤에 스레드를 띄우도록 첫 제출 시점에 시작
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            # requests 는 콜백을 처음 보낼 때 가져온다 (기동 시간 단축)
+            import requests
+            self._session = requests.Session()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f'kakao-callback-{i}', daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, callback_url, handler):
+        """handler(timeout)는 카카오 응답 dict를 반환해야 한다. 큐가 가득 차면 False"""
+        self._ensure_started()
+        job = CallbackJob(callback_url, handler, time.monotonic() + self.deadline)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._count('rejected')
+            return False
+        self._count('submitted')
+        return True
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._process(job)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job):
+        remaining = job.deadline - time.monotonic()
+        if remaining <= 0:
+            self._count('expired')
+            body = simple_text(TIMEOUT_TEXT)
+        else:
+            try:
+                body = job.handler(remaining)
+            except Exception as e:
+                body = simple_text(f"AI 답변 중 오류가 발생했습니다: {str(e)}")
+        try:
+            resp = self._session.post(job.callback_url, data=dumps(body), timeout=self.post_timeout,
+                                      headers={'Content-Type': JSON_CONTENT_TYPE})
+            resp.raise_for_status()
+            self._count('delivered')
+        except Exception as e:
+            self._count('failed')
+            print("콜백 전송 실패:", job.callback_url, str(e))
@@ -0,0 +1,197 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Prometheus 텍스트 형식 지표
+# 핫패스 비용을 줄이기 위해 관측 시에는 버킷 위치만 찾아 더하고, 누적/문자열 변환은 /metrics 요청 때 한다.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 25.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=(), registry=None):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [버킷별 개수..., +Inf 개수, 합계]
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return sum(series[:-1]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class StatsCollector:
+    """기존 모듈들이 들고 있는 stats dict 를 지표로 내보낸다 (gauges 에 없는 키는 counter)"""
+
+    def __init__(self, prefix, stats, help_text, gauges=(), registry=None):
+        self.prefix = prefix
+        self.stats = stats
+        self.help = help_text
+        self.gauges = set(gauges)
+        (registry or REGISTRY).register(self)
+
+    def render(self):
+        stats = self.stats() if callable(self.stats) else self.stats
+        lines = []
+        for key, value in stats.items():
+            if key in self.gauges:
+                name, kind = f"{self.prefix}_{key}", 'gauge'
+            else:
+                name, kind = f"{self.prefix}_{key}_total", 'counter'
+            lines.append(f"# HELP {name} {self.help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help_text, fn, registry=None):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        (registry or REGISTRY).register(self)
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_value(self.fn())}"]
+
+
+class Registry:
+    def __init__(self):
+        self._collectors = []
+
+    def register(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for collector in self._collectors:
+            try:
+                lines.extend(collector.render())
+            except Exception as e:
+                lines.append(f"# 지표 수집 실패 {getattr(collector, 'name', collector)}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+REGISTRY = Registry()
+
+REQUEST_LATENCY = Histogram('kakao_chatbot_request_seconds', '엔드포인트별 전체 처리 시간', ['endpoint'])
+STAGE_LATENCY = Histogram('kakao_chatbot_stage_seconds', '엔드포인트 처리 단계별 소요 시간', ['endpoint', 'stage'])
+UPSTREAM_LATENCY = Histogram('kakao_chatbot_upstream_seconds', '외부 API 호출 시간', ['upstream'])
+ERRORS = Counter('kakao_chatbot_errors_total', '단계별 예외 발생 수 (예외 클래스별)', ['endpoint', 'stage', 'error'])
+
+
+@contextmanager
+def span(endpoint, stage):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.inc(endpoint, stage, type(e).__name__)
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, endpoint, stage)
+
+
+@contextmanager
+def upstream(name):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.inc('upstream', name, type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, name)
+
+
+def timed(endpoint):
+    """Flask 라우트 전체 처리 시간을 기록하는 데코레이터"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                ERRORS.inc(endpoint, 'total', type(e).__name__)
+                raise
+            finally:
+                REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint)
+        return wrapper
+    return decorator
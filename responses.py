@@ -0,0 +1,87 @@
+import json
+import os
+import zlib
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 으로 (결과 바이트는 같다)
+    orjson = None
+
+# 응답 직렬화 공용 모듈 (app.py, asgi_app.py, VISTA/backend/api_server.py)
+# - 카카오 스킬 응답 틀 {"version":"2.0","template":{"outputs":[{"simpleText":...}]}} 은 앞뒤 바이트를 미리 만들어 두고
+#   답변 문자열만 인코딩해 붙인다
+# - 그 밖의 응답은 orjson 으로 바로 bytes 를 만든다 (jsonify 는 json.dumps → str → encode 를 거친다)
+# - RESPONSE_GZIP_MIN_BYTES 이상이고 클라이언트가 gzip 을 받으면 조각 단위로 압축하며 흘려 보낸다
+#   (경로 GeoJSON 처럼 큰 본문을 한 번에 압축해 메모리에 두지 않고 첫 바이트를 빨리 보낸다)
+
+RESPONSE_GZIP_MIN_BYTES = int(os.getenv('RESPONSE_GZIP_MIN_BYTES', 4096))
+# 좌표 목록은 수준 1 로도 원래 크기의 1/3 이 되고, 5 이상은 몇 % 더 줄이려고 CPU 를 3배 넘게 쓴다 (bench_responses)
+RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', 1))
+GZIP_CHUNK_BYTES = 64 * 1024
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # numpy 배열/스칼라 (orjson 이 직접 처리하지 못한 dtype, 표준 json 대체 경로)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"JSON 으로 바꿀 수 없는 값: {type(obj).__name__}")
+
+
+def dumps(obj):
+    """obj → UTF-8 JSON bytes (공백 없음, 한글은 이스케이프하지 않음)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def simple_text(text):
+    return {"version": "2.0", "template": {"outputs": [{"simpleText": {"text": text}}]}}
+
+
+_TEXT_PREFIX, _TEXT_SUFFIX = dumps(simple_text('\0')).split(dumps('\0'))
+
+
+def simple_text_bytes(text):
+    """simple_text(text) 를 인코딩한 것과 같은 bytes"""
+    return _TEXT_PREFIX + dumps(text) + _TEXT_SUFFIX
+
+
+def accepts_gzip(accept_encoding):
+    return 'gzip' in (accept_encoding or '').lower()
+
+
+def should_gzip(body, accept_encoding):
+    return len(body) >= RESPONSE_GZIP_MIN_BYTES and accepts_gzip(accept_encoding)
+
+
+def gzip_chunks(body, level=RESPONSE_GZIP_LEVEL, chunk_bytes=GZIP_CHUNK_BYTES):
+    """body 를 chunk_bytes 씩 압축하며 gzip 스트림 조각을 돌려준다"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip 헤더/트레일러
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_bytes):
+        chunk = compressor.compress(view[start:start + chunk_bytes])
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def json_response(payload, status=200):
+    """Flask 응답. payload 는 dict/list 또는 이미 인코딩한 bytes"""
+    from flask import Response, request
+
+    body = payload if isinstance(payload, bytes) else dumps(payload)
+    if should_gzip(body, request.headers.get('Accept-Encoding')):
+        return Response(gzip_chunks(body), status=status, content_type=JSON_CONTENT_TYPE,
+                        headers={'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'})
+    return Response(body, status=status, content_type=JSON_CONTENT_TYPE)
+
+
+def text_response(text, status=200):
+    """카카오 simpleText 응답 (Flask)"""
+    return json_response(simple_text_bytes(text), status)
@@ -0,0 +1,192 @@
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from answer_cache import normalize_utterance
+
+# /question 질문 라우터
+# 모든 질문을 같은 모델로 보내는 대신, 글자 n-gram 로지스틱 회귀로 질문을 분류해
+#   - 인사/감사/작별 → GPT 호출 없이 정해진 답변 (canned)
+#   - 짧은 사실 질문 → 빠르고 싼 작은 모델 (small, 답변 길이 제한)
+#   - 상담/조언/글쓰기 같은 복잡한 질문 → 기존 모델 (full)
+# 로 나눈다. 애매하면 항상 full 로 보낸다: 싼 경로는 확률이 기준값 이상일 때만 쓴다.
+# 학습 예문 파일(JSONL: {"text", "label"})을 읽어 워커 안에서 학습하고(예문 수백 개에 1초 미만, 워밍업 때 미리),
+# FAQ 처럼 파일이 바뀌면(mtime) 다시 학습한다. ROUTER_FILE 을 지정하지 않거나 파일이 없으면 모두 full (기존 동작).
+# 모델은 ROUTER_FULL_MODEL 하나에서 정해지고, 작은 모델은 따로 지정하지 않으면 같은 모델에 답변 길이만 제한한다.
+# ROUTER_SMALL_MODEL 은 full 보다 싼 모델로만 바꾼다.
+
+ROUTER_FILE = os.getenv('ROUTER_FILE', '')
+ROUTER_CANNED_THRESHOLD = float(os.getenv('ROUTER_CANNED_THRESHOLD', 0.6))
+ROUTER_SMALL_THRESHOLD = float(os.getenv('ROUTER_SMALL_THRESHOLD', 0.7))
+ROUTER_FULL_MODEL = os.getenv('ROUTER_FULL_MODEL', 'gpt-3.5-turbo')
+ROUTER_SMALL_MODEL = os.getenv('ROUTER_SMALL_MODEL', ROUTER_FULL_MODEL)
+ROUTER_SMALL_MAX_TOKENS = int(os.getenv('ROUTER_SMALL_MAX_TOKENS', 300))
+ROUTER_RELOAD_INTERVAL = float(os.getenv('ROUTER_RELOAD_INTERVAL', 5))
+# 1 이면 라우팅 결정과 경로별 처리 시간을 한 줄 JSON 으로 남긴다 (기준값 조정용, 질문 원문은 남기지 않음)
+ROUTER_LOG = os.getenv('ROUTER_LOG', '0') == '1'
+
+CANNED_ANSWERS = {
+    'greeting': "안녕하세요! 상담 예약이나 궁금한 점을 편하게 물어보세요.",
+    'thanks': "도움이 되었다니 다행이에요. 더 궁금한 점이 있으면 언제든 물어보세요.",
+    'bye': "이용해 주셔서 감사합니다. 좋은 하루 보내세요!",
+}
+SMALL, FULL = 'small', 'full'
+FEATURE_DIM = 4096
+NGRAM_SIZES = (1, 2, 3)
+LENGTH_BUCKETS = (2, 4, 8, 16, 32, 64)
+
+Decision = namedtuple('Decision', 'route label probability answer model max_tokens')
+# 분류기가 없거나 라우팅을 거치지 않은 호출은 기존처럼 full 모델로 보낸다
+FULL_DECISION = Decision(FULL, None, 0.0, None, ROUTER_FULL_MODEL, None)
+
+
+def features(text):
+    """(해시 위치 배열, L2 정규화한 값 배열). 앞/뒤 표시를 붙인 글자 n-gram + 길이 구간"""
+    text = normalize_utterance(text)
+    grams = Counter()
+    padded = f"^{text}$"
+    for n in NGRAM_SIZES:
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    # 짧은 인사와 긴 상담 문장을 가르는 데 길이가 큰 단서라 구간을 특징으로 넣는다
+    bucket = sum(1 for limit in LENGTH_BUCKETS if len(text) > limit)
+    grams[f"<len{bucket}>"] += 2
+    counts = Counter()
+    for gram, tf in grams.items():
+        counts[zlib.crc32(gram.encode('utf-8')) % FEATURE_DIM] += 1 + math.log(tf)
+    index = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return index, values / np.linalg.norm(values)
+
+
+def load_examples(path):
+    with open(path, encoding='utf-8') as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+    for example in examples:
+        if not example.get('text') or not example.get('label'):
+            raise ValueError(f"라우터 예문에 text/label 이 없습니다: {example}")
+    return examples
+
+
+class QuestionClassifier:
+    """다항 로지스틱 회귀. 예문 수백 개라 전체 배치 경사 하강으로 충분하다"""
+
+    def __init__(self, examples, epochs=300, learning_rate=8.0, l2=1e-5):
+        self.labels = sorted({example['label'] for example in examples})
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        X = np.zeros((len(examples), FEATURE_DIM), dtype=np.float32)
+        y = np.zeros((len(examples), len(self.labels)), dtype=np.float32)
+        for row, example in enumerate(examples):
+            index, values = features(example['text'])
+            X[row, index] = values
+            y[row, label_index[example['label']]] = 1
+        # 예문 수가 적은 라벨(작별 등)이 묻히지 않게 라벨별로 같은 무게를 준다
+        weights = (len(examples) / (len(self.labels) * y.sum(axis=0)))[None, :] * y
+        sample_weight = weights.sum(axis=1, keepdims=True) / len(examples)
+        # 예문에 나온 해시 위치만 학습하고 나머지 가중치는 0 으로 둔다
+        used = np.flatnonzero(X.any(axis=0))
+        X = X[:, used]
+        W = np.zeros((len(used), len(self.labels)), dtype=np.float32)
+        self.b = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(epochs):
+            grad = (self._softmax(X @ W + self.b) - y) * sample_weight
+            W -= learning_rate * (X.T @ grad + l2 * W)
+            self.b -= learning_rate * grad.sum(axis=0)
+        self.W = np.zeros((FEATURE_DIM, len(self.labels)), dtype=np.float32)
+        self.W[used] = W
+
+    @staticmethod
+    def _softmax(logits):
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, text):
+        """{라벨: 확률}"""
+        index, values = features(text)
+        probs = self._softmax(values @ self.W[index] + self.b)
+        return dict(zip(self.labels, probs.tolist()))
+
+
+class QuestionRouter:
+    def __init__(self, path=ROUTER_FILE, canned_threshold=ROUTER_CANNED_THRESHOLD,
+                 small_threshold=ROUTER_SMALL_THRESHOLD, reload_interval=ROUTER_RELOAD_INTERVAL):
+        self.path = path
+        self.canned_threshold = canned_threshold
+        self.small_threshold = small_threshold
+        self.reload_interval = reload_interval
+        self._classifier = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'canned': 0, SMALL: 0, FULL: 0, 'escalated': 0, 'reloads': 0, 'reload_errors': 0}
+
+    def maybe_reload(self):
+        """예문 파일이 바뀌었으면 다시 학습한다. 확인은 reload_interval 마다 한 번만"""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # 다른 스레드가 학습 중이면 기존 분류기로 응답
+        try:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns if self.path else None
+            except OSError:
+                mtime = None
+            if mtime == self._mtime:
+                return
+            if mtime is None:
+                self._classifier = None
+            else:
+                try:
+                    self._classifier = QuestionClassifier(load_examples(self.path))
+                except (OSError, ValueError) as e:
+                    self.stats['reload_errors'] += 1
+                    print("라우터 예문 파일 읽기 오류:", str(e))
+                    return
+                self.stats['reloads'] += 1
+            self._mtime = mtime
+        finally:
+            self._lock.release()
+
+    def classify(self, question):
+        """{라벨: 확률}, 분류기가 없으면 None"""
+        self.maybe_reload()
+        classifier = self._classifier
+        return classifier.predict(question) if classifier is not None else None
+
+    def decide(self, probs):
+        if not probs:
+            return FULL_DECISION
+        label = max(probs, key=probs.get)
+        probability = probs[label]
+        if label in CANNED_ANSWERS and probability >= self.canned_threshold:
+            return Decision('canned', label, probability, CANNED_ANSWERS[label], None, None)
+        # full 이 아닐 확률이 충분히 높을 때만 작은 모델로 보낸다
+        not_full = 1.0 - probs.get(FULL, 0.0)
+        if label != FULL and not_full >= self.small_threshold:
+            return Decision(SMALL, label, not_full, None, ROUTER_SMALL_MODEL, ROUTER_SMALL_MAX_TOKENS)
+        return Decision(FULL, label, probability, None, ROUTER_FULL_MODEL, None)
+
+    def route(self, question):
+        decision = self.decide(self.classify(question))
+        with self._stats_lock:
+            self.stats[decision.route] += 1
+            if decision.route == FULL and decision.label not in (None, FULL):
+                self.stats['escalated'] += 1
+        return decision
+
+    def log(self, decision, seconds, question):
+        if ROUTER_LOG:
+            print("route", json.dumps({
+                'route': decision.route, 'label': decision.label, 'p': round(decision.probability, 3),
+                'chars': len(question), 'ms': round(seconds * 1000, 1),
+            }, ensure_ascii=False))
@@ -0,0 +1,432 @@
+import re
+from datetime import datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+from dateutil.rrule import DAILY, MONTHLY, WEEKLY, rrule, rrulestr
+
+# /schedule 문장용 규칙 기반 날짜/시간 파서
+# "내일 오후 3시부터 4시 회의", "다음주 화요일 10시 상담" 같은 단순한 문장은 GPT 없이 처리한다.
+# "매주 화요일 오후 2시 상담 4주간" 같은 반복 일정은 RRULE 로 바꿔 반복 일정 하나로 등록한다.
+# 조금이라도 해석이 애매하면 None을 반환해서 GPT로 넘긴다.
+
+DEFAULT_DURATION = timedelta(hours=1)
+
+WEEKDAYS = {'월': 0, '화': 1, '수': 2, '목': 3, '금': 4, '토': 5, '일': 6}
+RELATIVE_DAYS = {'오늘': 0, '금일': 0, '내일모레': 2, '내일': 1, '명일': 1, '모레': 2, '글피': 3}
+WEEK_OFFSETS = {'이번주': 0, '금주': 0, '다음주': 1, '담주': 1, '차주': 1, '다다음주': 2}
+KOREAN_HOURS = {'한': 1, '하나': 1, '두': 2, '세': 3, '네': 4, '다섯': 5, '여섯': 6, '일곱': 7,
+                '여덟': 8, '아홉': 9, '열': 10, '열한': 11, '열두': 12}
+KOREAN_COUNTS = {'한': 1, '두': 2, '세': 3, '네': 4, '다섯': 5}
+AM_WORDS = ('오전', '아침', '새벽')
+PM_WORDS = ('오후', '저녁', '밤', '낮', '점심')
+# 오전/오후 표현별 (더할 시간, 그 표현과 함께 쓰는 시). 저녁/밤 12시는 다음 날 0시(24).
+# 이 밖의 조합("밤 2시", "새벽 12시", "오전 12시")은 날짜나 오전/오후가 애매하므로 GPT로 넘긴다
+MERIDIEM_HOURS = {
+    '오전': (0, range(1, 12)),
+    '아침': (0, range(5, 12)),
+    '새벽': (0, range(1, 7)),
+    '오후': (12, range(1, 13)),
+    '낮': (12, (12, 1, 2, 3, 4, 5)),
+    '점심': (12, (12, 1, 2)),
+    '저녁': (12, range(5, 13)),
+    '밤': (12, range(6, 13)),
+}
+MIDNIGHT_WORDS = ('저녁', '밤')
+
+_KOREAN_HOUR = '|'.join(sorted(KOREAN_HOURS, key=len, reverse=True))
+_MERIDIEM = '|'.join(AM_WORDS + PM_WORDS)
+
+DATE_PATTERNS = [
+    ('iso', re.compile(r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})')),
+    ('month_day', re.compile(r'(\d{1,2})\s*월\s*(\d{1,2})\s*일')),
+    ('slash', re.compile(r'(?<![\d:])(\d{1,2})/(\d{1,2})(?![\d/])')),
+    ('days_after', re.compile(r'(\d{1,2})\s*일\s*(?:후|뒤)')),
+    ('week_weekday', re.compile(r'(다다음\s?주|다음\s?주|담주|차주|이번\s?주|금주)\s*([월화수목금토일])(?:요일|욜)')),
+    ('weekday', re.compile(r'([월화수목금토일])(?:요일|욜)')),
+    ('relative', re.compile('|'.join(sorted(RELATIVE_DAYS, key=len, reverse=True)))),
+    ('day', re.compile(r'(?<![\d/.-])(\d{1,2})\s*일(?!\s*(?:후|뒤|간|동안))')),
+]
+
+TIME_PATTERN = re.compile(
+    r'(?:(?P<mer>' + _MERIDIEM + r')\s*)?'
+    r'(?:'
+    r'(?P<h>\d{1,2})\s*시(?!간)(?:\s*(?:(?P<m>\d{1,2})\s*분|(?P<half>반)))?'
+    r'|(?P<kh>' + _KOREAN_HOUR + r')\s*시(?!간)(?:\s*(?:(?P<km>\d{1,2})\s*분|(?P<khalf>반)))?'
+    r'|(?P<ch>\d{1,2}):(?P<cm>\d{2})'
+    r'|(?P<noon>정오)'
+    r')'
+)
+DURATION_PATTERN = re.compile(
+    r'(?:(?P<h>\d{1,2}|한|두|세|네|다섯)\s*시간(?:\s*(?:(?P<half>반)|(?P<hm>\d{1,2})\s*분))?'
+    r'|(?P<m>\d{1,3})\s*분)\s*(?:간|동안)?'
+)
+# 반복 일정: 주기 표현과 반복 횟수/기간 표현
+_DAY_ITEM = r'[월화수목금토일](?:요일|욜)'
+_DAY_LIST = (r'(?:[월화수목금토일](?:요일|욜)?\s*(?:,|·|/|와|과|및|랑|하고)\s*)+' + _DAY_ITEM +
+             r'|' + _DAY_ITEM + r'|[월화수목금토일]{2,5}(?:요일)?(?=\s|$)')
+RECURRENCE_PATTERNS = [
+    ('weekly', re.compile(r'(?P<every>매주|격주)\s*(?P<days>' + _DAY_LIST + r')(?:\s*마다)?')),
+    ('weekly', re.compile(r'(?P<days>' + _DAY_ITEM + r')\s*마다')),
+    ('weekdays', re.compile(r'매\s*평일|평일\s*(?:마다|매일)')),
+    ('daily', re.compile(r'매일')),
+    ('monthly', re.compile(r'(?:매월|매달)\s*(?P<day>\d{1,2})\s*일(?:\s*마다)?')),
+]
+RECURRENCE_BOUNDS = [
+    ('count', re.compile(r'(?P<n>\d{1,3})\s*(?:회|번)(?:\s*(?:만|간|동안|반복))?(?=\s|$)(?!\s*(?:회의실|방|호실|룸))')),
+    ('weeks', re.compile(r'(?P<n>\d{1,2}|한|두|세|네|다섯)\s*주\s*(?:간|동안)')),
+    ('months', re.compile(r'(?P<n>\d{1,2}|한|두|세|네|다섯)\s*(?:개월|달)\s*(?:간|동안)')),
+    ('days', re.compile(r'(?P<n>\d{1,3})\s*일\s*(?:간|동안)')),
+    ('until', re.compile(r'(?P<month>\d{1,2})\s*월\s*(?P<day>\d{1,2})\s*일\s*까지')),
+]
+# "다음주부터 매주 수요일"처럼 반복 시작 주를 정하는 표현
+RECURRENCE_START_WEEK = re.compile(r'(다다음\s?주|다음\s?주|담주|차주|이번\s?주|금주)\s*부터')
+RRULE_DAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+RRULE_FREQS = {DAILY: 'DAILY', WEEKLY: 'WEEKLY', MONTHLY: 'MONTHLY'}
+# 이보다 많이 반복되는 일정은 규칙으로 만들지 않는다
+RECURRENCE_MAX_COUNT = 366
+
+RANGE_SEPARATOR = re.compile(r'^\s*(?:부터|에서|~|-|–)\s*$')
+RANGE_END = re.compile(r'^\s*까지')
+
+# 이런 표현이 남아 있으면 규칙으로 확신할 수 없으므로 GPT로 넘긴다
+UNSUPPORTED = re.compile(r'매주|매일|매달|매월|격주|마다|주말|평일|다음\s?달|이번\s?달|담달|월말|월초|초순|중순|하순|'
+                         r'아니면|또는|이나|혹은|말고|취소|변경|옮겨|미뤄|당겨|자정|오전중|오후중|\d')
+
+PARTICLES = ('에서', '으로', '부터', '까지', '에', '로', '은', '는', '이', '가', '을', '를', '도')
+FILLER_WORDS = {'좀', '일정', '스케줄', '예약', '등록', '추가', '잡기', '잡아', '잡아줘', '잡아주세요', '해줘', '해주세요',
+                '부탁해', '부탁해요', '부탁드려요', '부탁합니다', '넣어줘', '넣어주세요', '만들어줘', '만들어주세요',
+                '예약해줘', '예약해주세요', '등록해줘', '등록해주세요', '잡아줄래', '해', '해요', '할게요', '하자',
+                '있어', '있어요', '쯤', '경', '정도', '시에', '약', '~', '-', '–'}
+FILLER_SUFFIXES = ('해줘', '해주세요', '해줄래', '해줄래요', '할래', '할래요', '하고싶어', '하고싶어요', '부탁해')
+
+
+class ParsedSchedule(dict):
+    """start_datetime / end_datetime / summary 를 담는 GPT 응답과 같은 모양의 dict
+
+    반복 일정이면 recurrence 에 "RRULE:..." 문자열이 들어가고 start/end 는 첫 번째 일정이다.
+    """
+
+
+def _to_hour(hour, meridiem):
+    """날짜 0시부터 센 시 (다음 날 0시는 24). 확신할 수 없으면 None"""
+    if meridiem is not None:
+        offset, hours = MERIDIEM_HOURS[meridiem]
+        if hour not in hours:
+            return None
+        if hour == 12:
+            return 24 if meridiem in MIDNIGHT_WORDS else offset
+        return hour + offset
+    if hour > 23:
+        return None
+    if 1 <= hour <= 6:
+        # 오전/오후가 없으면 업무 시간 기준으로 1~6시는 오후로 본다
+        return hour + 12
+    return hour
+
+
+def _parse_time(match):
+    g = match.groupdict()
+    if g['noon']:
+        return 12, 0, g['mer'] or '낮'
+    if g['h'] is not None:
+        hour, minute = int(g['h']), int(g['m']) if g['m'] else (30 if g['half'] else 0)
+    elif g['kh'] is not None:
+        hour, minute = KOREAN_HOURS[g['kh']], int(g['km']) if g['km'] else (30 if g['khalf'] else 0)
+    else:
+        hour, minute = int(g['ch']), int(g['cm'])
+    if minute > 59:
+        return None
+    return hour, minute, g['mer']
+
+
+def _parse_duration(match):
+    g = match.groupdict()
+    if g['h'] is not None:
+        hours = KOREAN_COUNTS.get(g['h']) or int(g['h'])
+        minutes = 30 if g['half'] else int(g['hm'] or 0)
+        return timedelta(hours=hours, minutes=minutes)
+    return timedelta(minutes=int(g['m']))
+
+
+def _find_date(text, today):
+    """(date, span) 또는 날짜 표현이 없으면 (None, None). 해석 불가면 ValueError"""
+    for kind, pattern in DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        if kind == 'iso':
+            date = datetime(int(match.group(1)), int(match.group(2)), int(match.group(3))).date()
+        elif kind in ('month_day', 'slash'):
+            month, day = int(match.group(1)), int(match.group(2))
+            date = datetime(today.year, month, day).date()
+            if date < today:
+                date = datetime(today.year + 1, month, day).date()
+        elif kind == 'days_after':
+            date = today + timedelta(days=int(match.group(1)))
+        elif kind == 'week_weekday':
+            week = WEEK_OFFSETS[re.sub(r'\s', '', match.group(1))]
+            monday = today - timedelta(days=today.weekday())
+            date = monday + timedelta(weeks=week, days=WEEKDAYS[match.group(2)])
+        elif kind == 'weekday':
+            date = today + timedelta(days=(WEEKDAYS[match.group(1)] - today.weekday()) % 7)
+        elif kind == 'relative':
+            date = today + timedelta(days=RELATIVE_DAYS[match.group(0)])
+        else:
+            day = int(match.group(1))
+            date = datetime(today.year, today.month, day).date()
+            if date < today:
+                month = today.month % 12 + 1
+                date = datetime(today.year + (today.month == 12), month, day).date()
+        return date, match.span()
+    return None, None
+
+
+def _extract_summary(residue):
+    words = []
+    for token in residue.split():
+        token = token.strip('.,!?~')
+        if not token or token in FILLER_WORDS or token.endswith(FILLER_SUFFIXES):
+            continue
+        for particle in PARTICLES:
+            if token.endswith(particle) and len(token) - len(particle) >= 2:
+                token = token[:-len(particle)]
+                break
+        if token in FILLER_WORDS or token in PARTICLES:
+            continue
+        words.append(token)
+    return ' '.join(words)
+
+
+def _find_recurrence(text):
+    """(rrule 인자 dict, 종료 조건, 지울 span 목록) 또는 반복 표현이 없으면 (None, None, [])"""
+    for kind, pattern in RECURRENCE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            break
+    else:
+        return None, None, []
+    spans = [match.span()]
+    if kind == 'weekly':
+        days = sorted({WEEKDAYS[ch] for ch in re.sub(r'요일|욜', '', match.group('days')) if ch in WEEKDAYS})
+        interval = 2 if match.groupdict().get('every') == '격주' else 1
+        spec = {'freq': WEEKLY, 'interval': interval, 'byweekday': days}
+    elif kind == 'weekdays':
+        spec = {'freq': WEEKLY, 'interval': 1, 'byweekday': [0, 1, 2, 3, 4]}
+    elif kind == 'daily':
+        spec = {'freq': DAILY, 'interval': 1}
+    else:
+        day = int(match.group('day'))
+        if not 1 <= day <= 31:
+            raise ValueError(day)
+        spec = {'freq': MONTHLY, 'interval': 1, 'bymonthday': [day]}
+
+    bound = None
+    masked = _mask(text, spans)
+    for bound_kind, pattern in RECURRENCE_BOUNDS:
+        found = pattern.search(masked)
+        if found:
+            bound = (bound_kind, found)
+            spans.append(found.span())
+            break
+    return spec, bound, spans
+
+
+def _recurrence_count(spec, first, bound):
+    """첫 일정부터 종료 조건까지의 반복 횟수. 종료 조건이 없으면 None"""
+    if bound is None:
+        return None
+    kind, match = bound
+    if kind == 'count':
+        return int(match.group('n'))
+    if kind == 'until':
+        until = datetime(first.year, int(match.group('month')), int(match.group('day')), 23, 59, 59)
+        if until < first:
+            until = until.replace(year=first.year + 1)
+    else:
+        n = KOREAN_COUNTS.get(match.group('n')) or int(match.group('n'))
+        step = {'weeks': relativedelta(weeks=n), 'months': relativedelta(months=n), 'days': relativedelta(days=n)}[kind]
+        until = datetime.combine(first.date() + step, datetime.min.time()) - timedelta(seconds=1)
+    return rrule(dtstart=first, until=until, **spec).count()
+
+
+def format_rrule(spec, count=None):
+    parts = [f"FREQ={RRULE_FREQS[spec['freq']]}"]
+    if spec.get('interval', 1) > 1:
+        parts.append(f"INTERVAL={spec['interval']}")
+    if spec.get('byweekday'):
+        parts.append('BYDAY=' + ','.join(RRULE_DAYS[d] for d in spec['byweekday']))
+    if spec.get('bymonthday'):
+        parts.append('BYMONTHDAY=' + ','.join(str(d) for d in spec['bymonthday']))
+    if count is not None:
+        parts.append(f"COUNT={count}")
+    return 'RRULE:' + ';'.join(parts)
+
+
+def validate_recurrence(rule, start):
+    """GPT 등이 준 반복 규칙을 "RRULE:..." 한 줄로 정리한다. 잘못된 규칙이면 ValueError"""
+    rule = (rule or '').strip()
+    if not rule.upper().startswith('RRULE:'):
+        rule = 'RRULE:' + rule
+    if '\n' in rule:
+        raise ValueError(f"반복 규칙은 한 줄이어야 합니다: {rule}")
+    parsed = rrulestr(rule, dtstart=start)
+    if parsed.after(start, inc=True) is None:
+        raise ValueError(f"반복 일정이 하나도 없습니다: {rule}")
+    return rule.upper()
+
+
+def describe_recurrence(rule):
+    """RRULE:FREQ=WEEKLY;BYDAY=TU;COUNT=4 -> 매주 화요일, 4회"""
+    fields = dict(part.split('=', 1) for part in rule.split(':', 1)[-1].split(';') if '=' in part)
+    freq, interval = fields.get('FREQ'), int(fields.get('INTERVAL', 1))
+    if freq == 'DAILY' and interval == 1:
+        text = '매일'
+    elif freq == 'WEEKLY' and 'BYDAY' in fields and interval <= 2:
+        days = fields['BYDAY'].split(',')
+        if days == list(RRULE_DAYS[:5]) and interval == 1:
+            text = '평일마다'
+        elif all(d in RRULE_DAYS for d in days):
+            names = '·'.join('월화수목금토일'[RRULE_DAYS.index(d)] for d in days)
+            text = f"{'격주' if interval == 2 else '매주'} {names}요일"
+        else:
+            return rule
+    elif freq == 'MONTHLY' and 'BYMONTHDAY' in fields and interval == 1:
+        text = f"매월 {fields['BYMONTHDAY']}일"
+    else:
+        return rule
+    if 'COUNT' in fields:
+        text += f", {fields['COUNT']}회"
+    elif 'UNTIL' in fields:
+        until = fields['UNTIL']
+        text += f", {until[:4]}-{until[4:6]}-{until[6:8]}까지"
+    return text
+
+
+def _mask(text, spans):
+    chars = list(text)
+    for start, end in spans:
+        for i in range(start, end):
+            chars[i] = ' '
+    return ''.join(chars)
+
+
+def parse_schedule(user_input, now=None):
+    """확신할 수 있으면 ParsedSchedule, 아니면 None"""
+    if not user_input:
+        return None
+    now = now or datetime.now()
+    text = re.sub(r'\s+', ' ', user_input.strip())
+
+    try:
+        recurrence, bound, spans = _find_recurrence(text)
+        date, date_span = _find_date(_mask(text, spans), now.date())
+    except ValueError:
+        return None
+    if date_span:
+        spans.append(date_span)
+    elif recurrence is not None:
+        start_week = RECURRENCE_START_WEEK.search(_mask(text, spans))
+        if start_week:
+            monday = now.date() - timedelta(days=now.weekday())
+            date = monday + timedelta(weeks=WEEK_OFFSETS[re.sub(r'\s', '', start_week.group(1))])
+            spans.append(start_week.span())
+    # "다음주 화요일"처럼 주 단위 표현만 남는 경우를 막기 위해 날짜/반복 부분을 먼저 지운다
+    masked = _mask(text, spans)
+
+    times = list(TIME_PATTERN.finditer(masked))
+    if not times or len(times) > 2:
+        return None
+    parsed_times = [_parse_time(m) for m in times]
+    if any(t is None for t in parsed_times):
+        return None
+
+    start_h, start_m, start_mer = parsed_times[0]
+    start_hour = _to_hour(start_h, start_mer)
+    if start_hour is None:
+        return None
+    spans.append(times[0].span())
+
+    end_delta = None
+    if len(times) == 2:
+        between = masked[times[0].end():times[1].start()]
+        after = masked[times[1].end():]
+        if not (RANGE_SEPARATOR.match(between) or (between.strip() == '' and RANGE_END.match(after))):
+            return None
+        end_h, end_m, end_mer = parsed_times[1]
+        if end_mer or end_h > 12:
+            end_hour = _to_hour(end_h, end_mer)
+        else:
+            # 종료 시각에 오전/오후가 없으면 시작 시각 이후 가장 가까운 시각으로 해석 ("밤 11시부터 12시"는 다음 날 0시)
+            hours = (end_h % 12, end_h % 12 + 12) + ((24,) if end_h == 12 else ())
+            candidates = [h for h in hours if (h, end_m) > (start_hour, start_m)]
+            end_hour = candidates[0] if candidates else None
+        if end_hour is None:
+            return None
+        spans.append((times[0].end(), times[1].end()))
+        range_end = RANGE_END.match(after)
+        if range_end:
+            spans.append((times[1].end(), times[1].end() + range_end.end()))
+        end_delta = timedelta(hours=end_hour, minutes=end_m) - timedelta(hours=start_hour, minutes=start_m)
+    else:
+        masked_times = _mask(masked, spans)
+        duration = DURATION_PATTERN.search(masked_times)
+        if duration:
+            end_delta = _parse_duration(duration)
+            spans.append(duration.span())
+        else:
+            end_delta = DEFAULT_DURATION
+    if end_delta <= timedelta(0):
+        return None
+
+    if date is None:
+        date = now.date()
+    start = datetime(date.year, date.month, date.day) + timedelta(hours=start_hour, minutes=start_m)
+    rule = None
+    if recurrence is not None:
+        # 날짜 표현은 반복 시작 기준일로 보고, 그 이후 첫 번째 반복을 시작 일정으로 삼는다
+        start = rrule(dtstart=start, **recurrence).after(max(start, now), inc=True)
+        if start is None:
+            return None
+        count = _recurrence_count(recurrence, start, bound)
+        if count is not None and not 1 <= count <= RECURRENCE_MAX_COUNT:
+            return None
+        rule = format_rrule(recurrence, count)
+    if start < now:
+        return None
+    end = start + end_delta
+
+    residue = _mask(text, spans)
+    residue = re.sub(r'(?<=\s)(?:부터|까지|에서|에)(?=\s|$)', ' ', residue)
+    if UNSUPPORTED.search(residue):
+        return None
+    if start_mer is None:
+        # "7시 저녁 약속"처럼 추정한 오전/오후와 어긋나는 단서가 남아 있으면 규칙으로 판단하지 않는다
+        cues = ('오후', '저녁', '밤') if start_hour < 12 else AM_WORDS
+        if any(word in residue for word in cues):
+            return None
+    summary = _extract_summary(residue)
+
+    parsed = ParsedSchedule(
+        start_datetime=start.strftime('%Y-%m-%dT%H:%M:%S'),
+        end_datetime=end.strftime('%Y-%m-%dT%H:%M:%S'),
+        summary=summary or None,
+    )
+    if rule is not None:
+        parsed['recurrence'] = rule
+    return parsed
+
+
+# 규칙 파서가 처리하지 못한 문장은 이 프롬프트로 GPT에 넘긴다
+def build_gpt_prompt_for_schedule(user_input, today_str):
+    return f"""
+아래 문장에서 날짜와 시작/종료 시간을 ISO 8601 포맷(YYYY-MM-DDTHH:MM:SS)으로 추출해서 JSON으로 반환해줘.
+오늘 날짜는 {today_str}야.
+만약 일정 제목(요약)이 있으면 summary 필드도 포함해줘.
+반복 일정이면 첫 번째 일정의 시각을 start_datetime/end_datetime으로 하고, recurrence 필드에 RFC 5545 RRULE 한 줄을 넣어줘.
+반복 횟수나 기간이 있으면 COUNT로 표현해줘. (예: "매주 화요일 오후 2시 상담 4주간" → "RRULE:FREQ=WEEKLY;BYDAY=TU;COUNT=4")
+
+예시 입력: "내일 오후 3시부터 4시 회의"
+예시 출력: {{"start_datetime": "2025-05-11T15:00:00", "end_datetime": "2025-05-11T16:00:00", "summary": "회의"}}
+
+입력: "{user_input}"
+"""
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+# 동시에 들어온 같은 요청을 하나의 업스트림 호출로 합치는 single-flight
+# 먼저 들어온 요청(리더)만 실제로 호출하고, 같은 키로 기다리던 요청들은 결과를 나눠 받는다.
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'shared': 0, 'errors': 0}
+
+    def do(self, key, fn, timeout=None):
+        """fn()을 실행하거나 같은 key로 진행 중인 호출의 결과를 기다린다"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats['shared'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['calls'] += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError("동일 요청의 응답을 기다리다 시간이 초과되었습니다.")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """asyncio 버전. 이벤트 루프 하나 안에서만 사용한다."""
+
+    def __init__(self):
+        self._calls = {}
+        self.stats = {'calls': 0, 'shared': 0, 'errors': 0}
+
+    async def do(self, key, fn):
+        future = self._calls.get(key)
+        if future is not None:
+            self.stats['shared'] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats['calls'] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # 리더가 취소돼도(요청 연결 끊김 등) 기다리던 요청까지 CancelledError 로 끝나지 않도록 일반 오류로 알린다
+            self.stats['errors'] += 1
+            future.set_exception(TimeoutError("동일 요청을 처리하던 호출이 취소되었습니다."))
+            future.exception()
+            raise
+        except Exception as e:
+            self.stats['errors'] += 1
+            future.set_exception(e)
+            future.exception()  # 기다리는 쪽이 없어도 경고가 나지 않도록 소비
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def in_flight(self):
+        return len(self._calls)
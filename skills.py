@@ -0,0 +1,273 @@
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import admission
+import calendar_index
+import calendar_queue
+import deadline
+import faq
+import idempotency
+import metrics
+import router
+from answer_cache import AnswerCache, normalize_utterance
+from circuit_breaker import CircuitOpen, UNAVAILABLE_TEXT
+from conversation import CONVERSATION_MEMORY, ConversationMemory, depends_on_context
+from responses import simple_text
+from schedule_parser import build_gpt_prompt_for_schedule, describe_recurrence, parse_schedule, validate_recurrence
+
+# 카카오 스킬 공통 처리 (app.py 의 Flask, asgi_app.py 의 ASGI 진입점이 함께 쓴다)
+# 진입점마다 다른 것은 OpenAI/Calendar 호출(동기/비동기)과 요청/응답 방식뿐이고,
+# 그 앞뒤의 발화 해석, 검증, 일정 만들기, 캐시/대화 기억, 응답 문구는 모두 여기서 한다.
+# Questions 의 메서드와 캘린더 큐 넣기는 SQLite/메모리 맵 파일을 읽고 쓰므로 ASGI 쪽은 스레드 풀에서 부른다.
+
+EMPTY_QUESTION_TEXT = "AI에게 할 말을 입력해 주세요."
+EMPTY_SCHEDULE_TEXT = "일정 내용을 입력해 주세요."
+CALENDAR_UNAVAILABLE_TEXT = "캘린더 서비스가 잠시 원활하지 않습니다. 잠시 후 다시 시도해 주세요."
+FAILED_SCHEDULE_TEXT = "\n\n등록하지 못한 일정이 {count}건 있습니다. 다시 등록해 주세요."
+DEFAULT_SUMMARY = "상담 일정"
+EVENT_DESCRIPTION = "카카오톡 챗봇을 통한 상담 예약"
+MY_SCHEDULE_DAYS = 30
+MY_SCHEDULE_LIMIT = 10
+
+# GPT 를 불러야 하는 질문: 라우팅 결정, 불러온 대화(대화 기억을 끄면 None), 앞 대화를 함께 보낼지
+PendingQuestion = namedtuple('PendingQuestion', 'user_input user_id conversation decision contextual')
+
+
+def utterance(request_data):
+    return request_data['action']['params'].get('question')
+
+
+def upstream_error_text(e, prefix):
+    """OpenAI 호출 예외 → 사용자 안내 문구"""
+    if isinstance(e, admission.Overloaded):
+        return admission.SHED_TEXT
+    if isinstance(e, CircuitOpen):
+        return UNAVAILABLE_TEXT
+    if isinstance(e, (deadline.DeadlineExceeded, TimeoutError)):
+        return deadline.TIMEOUT_TEXT
+    return f"{prefix}: {str(e)}"
+
+
+class Questions:
+    """/question 의 GPT 호출 앞뒤: FAQ, 라우터, 답변 캐시, 대화 기억"""
+
+    def __init__(self):
+        self.answer_cache = AnswerCache()
+        # 자주 묻는 질문은 FAQ 파일에서 바로 답한다 (파일이 바뀌면 자동으로 다시 읽음)
+        self.faq = faq.FAQ()
+        # 사용자별 최근 대화/요약 (CONVERSATION_MEMORY=1 일 때만, CONVERSATION_DB 를 워커들이 함께 씀)
+        self.conversations = ConversationMemory() if CONVERSATION_MEMORY else None
+        # 인사/감사는 정해진 답변, 짧은 사실 질문은 작은 모델, 나머지는 기존 모델로 보낸다
+        self.router = router.QuestionRouter()
+
+    def warm_up(self):
+        self.faq.maybe_reload()
+        self.router.maybe_reload()
+
+    def answer_locally(self, user_input, user_id):
+        """GPT 없이 답할 수 있으면 (답변, None), 아니면 (None, PendingQuestion)"""
+        # FAQ/정해진 답변은 앞 대화와 상관없고, 대화 기억에 남기면 다음 질문이 공유 캐시를 못 쓰게 되므로 남기지 않는다
+        with metrics.span('question', 'faq'):
+            answer = self.faq.lookup(user_input)
+        if answer is not None:
+            return answer, None
+
+        started = time.perf_counter()
+        with metrics.span('question', 'route'):
+            decision = self.router.route(user_input)
+        if decision.answer is not None:
+            self.router.log(decision, time.perf_counter() - started, user_input)
+            return decision.answer, None
+
+        conversation = None
+        if self.conversations is not None:
+            with metrics.span('question', 'conversation'):
+                conversation = self.conversations.load(user_id)
+        # 이어지는 대화("그럼 주말은요?")만 앞 대화에 따라 답이 달라지므로 공유 캐시를 쓰지 않는다
+        contextual = bool(conversation) and depends_on_context(user_input)
+        if not contextual:
+            with metrics.span('question', 'cache'):
+                cached = self.answer_cache.get(user_input)
+            if cached is not None:
+                self._record(user_id, conversation, user_input, cached)
+                return cached, None
+        return None, PendingQuestion(user_input, user_id, conversation, decision, contextual)
+
+    def completion(self, pending):
+        """create_chat_completion 키워드 인자 (싱글플라이트 키, 메시지, 모델)"""
+        decision = pending.decision
+        options = {'model': decision.model, 'max_tokens': decision.max_tokens}
+        if pending.contextual:
+            # 이전 대화에 따라 답이 달라지므로 사용자별로 묶는다
+            return dict(options, key=('question', pending.user_id, normalize_utterance(pending.user_input)),
+                        messages=pending.conversation.messages(pending.user_input))
+        return dict(options, key=('question', normalize_utterance(pending.user_input)))
+
+    def answered(self, pending, gpt_response):
+        """GPT 답변을 답변 캐시(앞 대화 없이 답한 질문만)와 대화 기억에 남긴다"""
+        if not pending.contextual:
+            self.answer_cache.set(pending.user_input, gpt_response)
+        self._record(pending.user_id, pending.conversation, pending.user_input, gpt_response)
+
+    def _record(self, user_id, conversation, question, answer):
+        if conversation is not None:
+            self.conversations.record(user_id, conversation, question, answer)
+
+    def log(self, pending, seconds):
+        self.router.log(pending.decision, seconds, pending.user_input)
+
+    def register_metrics(self):
+        metrics.StatsCollector('kakao_chatbot_answer_cache', self.answer_cache.stats, '답변 캐시 조회/제거 수')
+        if self.conversations is not None:
+            metrics.StatsCollector('kakao_chatbot_conversation', self.conversations.stats,
+                                   '사용자별 대화 기억 조회/저장/요약 수')
+            metrics.Gauge('kakao_chatbot_conversation_sessions', '대화 기억 세션 수',
+                          lambda: self.conversations.usage()[0])
+            metrics.Gauge('kakao_chatbot_conversation_bytes', '대화 기억 저장 크기(바이트)',
+                          lambda: self.conversations.usage()[1])
+        metrics.StatsCollector('kakao_chatbot_question_route', self.router.stats, '질문 라우팅 경로별 수/다시 학습')
+        metrics.StatsCollector('kakao_chatbot_faq', self.faq.stats, 'FAQ 로컬 응답 조회/다시 읽기 수')
+        metrics.Gauge('kakao_chatbot_faq_entries', 'FAQ 항목 수', lambda: len(self.faq))
+
+
+class ScheduleRejected(Exception):
+    """등록하지 않고 돌려줄 안내 (GPT 응답 형식 오류, 겹치는 일정)"""
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.response = simple_text(text)
+
+
+def local_schedule(user_input, now):
+    """로컬 규칙 파서로 해석한 일정. 확신할 수 없으면 None (GPT 로 넘긴다)"""
+    with metrics.span('schedule', 'local_parse'):
+        local = parse_schedule(user_input, now)
+    if local is None:
+        return None
+    return {'start_datetime': local["start_datetime"], 'end_datetime': local["end_datetime"],
+            'summary': local["summary"] or DEFAULT_SUMMARY, 'recurrence': local.get("recurrence")}
+
+
+def schedule_prompt(user_input, now):
+    return build_gpt_prompt_for_schedule(user_input, now.strftime("%Y-%m-%d"))
+
+
+def parse_gpt_schedule(gpt_response):
+    """GPT 응답 JSON → 일정. 형식이 잘못되면 ScheduleRejected"""
+    try:
+        with metrics.span('schedule', 'gpt_parse'):
+            parsed = json.loads(gpt_response)
+            return {'start_datetime': parsed["start_datetime"], 'end_datetime': parsed["end_datetime"],
+                    'summary': parsed.get("summary", DEFAULT_SUMMARY), 'recurrence': parsed.get("recurrence")}
+    except Exception as e:
+        raise ScheduleRejected(f"GPT 응답 파싱 오류: {str(e)}\n{gpt_response}") from e
+
+
+def build_event(schedule, key=None, user_id=None, calendar_sync=None):
+    """일정을 검증하고 (calendar_id, Calendar 일정 body) 를 돌려준다
+
+    잘못된 일정은 ValueError, 이미 있는 일정과 겹치면 ScheduleRejected. 반복 규칙은 정규화해 schedule 에 다시 넣는다.
+    """
+    start_datetime, end_datetime = schedule['start_datetime'], schedule['end_datetime']
+    if datetime.fromisoformat(end_datetime) <= datetime.fromisoformat(start_datetime):
+        raise ValueError(f"종료 시각이 시작 시각보다 빠릅니다: {start_datetime} ~ {end_datetime}")
+    calendar_id = os.getenv('GOOGLE_CALENDAR_ID')
+    if not calendar_id:
+        raise ValueError("GOOGLE_CALENDAR_ID 환경 변수가 설정되지 않았습니다.")
+    recurrence = schedule['recurrence']
+    if recurrence:
+        recurrence = schedule['recurrence'] = validate_recurrence(recurrence, datetime.fromisoformat(start_datetime))
+    if calendar_sync is not None and calendar_sync.ready.is_set():
+        # 반복 일정은 각 회차를 모두 확인한다
+        with metrics.span('schedule', 'conflict_check'):
+            conflict = calendar_sync.index.check(datetime.fromisoformat(start_datetime),
+                                                 datetime.fromisoformat(end_datetime), recurrence)
+        if conflict:
+            raise ScheduleRejected(conflict)
+    event = {
+        'summary': schedule['summary'],
+        'description': EVENT_DESCRIPTION,
+        'start': {'dateTime': start_datetime, 'timeZone': 'Asia/Seoul'},
+        'end': {'dateTime': end_datetime, 'timeZone': 'Asia/Seoul'},
+    }
+    event['id'] = idempotency.event_id(key, start_datetime) if key is not None else calendar_queue.new_event_id()
+    if recurrence:
+        event['recurrence'] = [recurrence]
+    if user_id:
+        event['extendedProperties'] = {'private': {'kakaoUserId': user_id}}
+    return calendar_id, event
+
+
+def registered_response(schedule):
+    summary, start_datetime, end_datetime = schedule['summary'], schedule['start_datetime'], schedule['end_datetime']
+    if schedule['recurrence']:
+        return simple_text(f"반복 상담 일정이 등록되었습니다!\n{summary}\n{describe_recurrence(schedule['recurrence'])}\n"
+                           f"첫 일정: {start_datetime} ~ {end_datetime}")
+    return simple_text(f"상담 일정이 성공적으로 등록되었습니다!\n{summary}\n{start_datetime} ~ {end_datetime}")
+
+
+def schedule_error(e):
+    """일정 검증/등록 중 예외 → (응답, 보관 여부)
+
+    등록에 성공한 응답만 보관한다. 오류나 겹침 안내를 보관하면 같은 문장을 다시 보낸 사용자가
+    SCHEDULE_IDEMPOTENCY_WINDOW 동안 다시 확인하지 않은 예전 안내를 받게 된다.
+    """
+    if isinstance(e, ScheduleRejected):
+        return e.response, False
+    if isinstance(e, CircuitOpen):
+        return simple_text(CALENDAR_UNAVAILABLE_TEXT), False
+    if isinstance(e, deadline.DeadlineExceeded):
+        return simple_text(deadline.TIMEOUT_TEXT), False
+    return simple_text(f"일정 등록 중 오류가 발생했습니다: {str(e)}"), False
+
+
+def my_schedule_text(calendar_sync, user_id, calendar_writer=None):
+    """"내 일정 보기": Calendar API 호출 없이 로컬 인덱스에서 이 사용자가 등록한 일정만 보여준다
+
+    write-behind 큐에서 끝내 등록하지 못한 이 사용자의 일정이 있으면 함께 알린다.
+    """
+    text = _upcoming_text(calendar_sync, user_id)
+    failed = calendar_writer.failed(user_id) if calendar_writer is not None and user_id else 0
+    if failed:
+        text += FAILED_SCHEDULE_TEXT.format(count=failed)
+    return text
+
+
+def _upcoming_text(calendar_sync, user_id):
+    if calendar_sync is None:
+        return "일정 조회가 설정되지 않았습니다."
+    if not calendar_sync.ready.is_set():
+        return calendar_index.SYNCING_TEXT
+    if not user_id:
+        return "사용자 정보를 확인할 수 없습니다."
+    now = calendar_index.local_now()
+    upcoming = calendar_sync.index.between(now, now + timedelta(days=MY_SCHEDULE_DAYS), owner=user_id)
+    return calendar_index.upcoming_message(upcoming[:MY_SCHEDULE_LIMIT])
+
+
+def register_upstream_metrics(gpt_flights, llm_admission, openai_breaker, calendar_breaker,
+                              schedule_requests, calendar_sync, calendar_writer, warm_up_stats):
+    metrics.StatsCollector('kakao_chatbot_openai_singleflight', gpt_flights.stats,
+                           'OpenAI 호출 합치기 (shared = 절약된 호출 수)')
+    metrics.StatsCollector('kakao_chatbot_schedule_idempotency', schedule_requests.stats, '일정 요청 재전송 처리 수')
+    metrics.StatsCollector('kakao_chatbot_llm_admission', llm_admission.stats, 'OpenAI 동시 호출 제한 대기/거절',
+                           gauges=('max_wait_seconds',))
+    metrics.Gauge('kakao_chatbot_llm_in_flight', '진행 중인 OpenAI 호출 수', llm_admission.in_flight)
+    metrics.Gauge('kakao_chatbot_llm_queue_depth', 'OpenAI 호출 대기 수', llm_admission.queue_depth)
+    metrics.StatsCollector('kakao_chatbot_circuit_openai', openai_breaker.metrics,
+                           'OpenAI 서킷 브레이커 (state: 0 닫힘, 1 반 열림, 2 열림)', gauges=('state',))
+    metrics.StatsCollector('kakao_chatbot_circuit_calendar', calendar_breaker.metrics,
+                           'Calendar 서킷 브레이커 (state: 0 닫힘, 1 반 열림, 2 열림)', gauges=('state',))
+    metrics.StatsCollector('kakao_chatbot_warm_up', warm_up_stats, '워커 기동 후 클라이언트 워밍업',
+                           gauges=('seconds',))
+    if calendar_sync is not None:
+        metrics.StatsCollector('kakao_chatbot_calendar_sync', calendar_sync.stats, '캘린더 증분 동기화',
+                               gauges=('last_sync_at',))
+        metrics.Gauge('kakao_chatbot_calendar_index_events', '로컬 일정 인덱스 크기', lambda: len(calendar_sync.index))
+    if calendar_writer is not None:
+        metrics.StatsCollector('kakao_chatbot_calendar_queue', calendar_writer.stats, '캘린더 write-behind 큐 처리 수')
+        # 0 보다 크면 알림: 재시도를 다 쓰고도 등록하지 못한 일정 (보관 기간 동안 남는다)
+        metrics.Gauge('kakao_chatbot_calendar_queue_failed', '등록하지 못한 일정 수', calendar_writer.failed)
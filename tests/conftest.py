@@ -0,0 +1,8 @@
+import os
+import sys
+
+# 저장소 루트의 모듈(calendar_index, schedule_parser 등)을 바로 import 한다
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# VISTA 백엔드 모듈(route_cache, poi_index 등)은 bench 처럼 경로를 더해 가져온다
+sys.path.append(os.path.join(ROOT, 'VISTA', 'backend'))
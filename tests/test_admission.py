@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from admission import PRIORITY_QUESTION, PRIORITY_SCHEDULE, AdmissionController, AsyncAdmissionController, Overloaded
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_admits_up_to_the_limit_without_waiting():
+    controller = AdmissionController(max_in_flight=2)
+    assert controller.acquire(PRIORITY_QUESTION) == 0.0
+    assert controller.acquire(PRIORITY_QUESTION) == 0.0
+    assert controller.in_flight() == 2
+    with pytest.raises(Overloaded):
+        controller.acquire(PRIORITY_QUESTION, timeout=0.01)
+    assert controller.stats['shed'] == 1
+    assert controller.queue_depth() == 0
+
+
+def test_schedule_is_admitted_before_questions():
+    controller = AdmissionController(max_in_flight=1)
+    controller.acquire(PRIORITY_QUESTION)
+    order = []
+
+    def wait(priority, name):
+        with controller.admit(priority, timeout=5):
+            order.append(name)
+
+    question = threading.Thread(target=wait, args=(PRIORITY_QUESTION, 'question'))
+    question.start()
+    wait_until(lambda: controller.queue_depth() == 1)
+    schedule = threading.Thread(target=wait, args=(PRIORITY_SCHEDULE, 'schedule'))
+    schedule.start()
+    wait_until(lambda: controller.queue_depth() == 2)
+    controller.release()
+    question.join()
+    schedule.join()
+    assert order == ['schedule', 'question']
+    assert controller.in_flight() == 0
+
+
+def test_shed_waiter_does_not_take_a_slot():
+    controller = AdmissionController(max_in_flight=1)
+    controller.acquire(PRIORITY_QUESTION)
+    with pytest.raises(Overloaded):
+        controller.acquire(PRIORITY_QUESTION, timeout=0.01)
+    controller.release()
+    assert controller.in_flight() == 0
+    assert controller.acquire(PRIORITY_QUESTION) == 0.0
+
+
+def test_async_priority_and_shedding():
+    async def main():
+        controller = AsyncAdmissionController(max_in_flight=1)
+        await controller.acquire(PRIORITY_QUESTION)
+        order = []
+
+        async def wait(priority, name):
+            async with controller.admit(priority, timeout=5):
+                order.append(name)
+
+        question = asyncio.create_task(wait(PRIORITY_QUESTION, 'question'))
+        await asyncio.sleep(0)
+        schedule = asyncio.create_task(wait(PRIORITY_SCHEDULE, 'schedule'))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await controller.acquire(PRIORITY_QUESTION, timeout=0.01)
+        controller.release()
+        await asyncio.gather(question, schedule)
+        return order, controller
+
+    order, controller = asyncio.run(main())
+    assert order == ['schedule', 'question']
+    assert controller.in_flight() == 0
+    assert controller.queue_depth() == 0
+    assert controller.stats['shed'] == 1
+
+
+def test_async_cancelled_waiter_leaves_the_queue():
+    async def main():
+        controller = AsyncAdmissionController(max_in_flight=1)
+        await controller.acquire(PRIORITY_QUESTION)
+        waiter = asyncio.create_task(controller.acquire(PRIORITY_QUESTION, timeout=5))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queue_depth() == 0
+        controller.release()
+        assert controller.in_flight() == 0
+
+    asyncio.run(main())
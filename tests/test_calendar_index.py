@@ -0,0 +1,114 @@
+import time
+from datetime import datetime, timedelta
+
+from calendar_index import KST, PAST_RETENTION, CalendarSync, Interval, IntervalIndex, local_now, sync_time_min
+
+
+class FakeEvents:
+    """events().list(...).execute() 만 흉내 내고 받은 인자를 남긴다"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        page = self.pages[len(self.calls) - 1]
+        return type('Request', (), {'execute': lambda _: page})()
+
+
+def event(event_id, start):
+    return {'id': event_id, 'summary': '상담', 'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': (start + timedelta(hours=1)).isoformat()}}
+
+
+def test_full_sync_lists_only_recent_and_upcoming_events():
+    start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    service = FakeEvents([{'items': [event('e1', start)], 'nextSyncToken': 'token-1'}])
+    sync = CalendarSync(lambda: service, 'cal@example.com')
+
+    before = datetime.now(KST)
+    sync.sync()
+
+    params = service.calls[0]
+    assert params['singleEvents'] is True
+    assert 'syncToken' not in params
+    # RFC3339 (시간대 포함), 지금부터 PAST_RETENTION 전
+    time_min = datetime.fromisoformat(params['timeMin'])
+    assert time_min.utcoffset() == timedelta(hours=9)
+    assert abs(time_min - (before - PAST_RETENTION)) < timedelta(seconds=5)
+    assert sync.sync_token == 'token-1'
+    assert len(sync.index) == 1 and sync.ready.is_set()
+
+
+def test_incremental_sync_sends_sync_token_without_time_min():
+    start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    service = FakeEvents([{'items': [], 'nextSyncToken': 'token-1'},
+                          {'items': [event('e2', start)], 'nextSyncToken': 'token-2'}])
+    sync = CalendarSync(lambda: service, 'cal@example.com')
+    sync.sync()
+    sync.sync()
+
+    params = service.calls[1]
+    # Calendar API 는 syncToken 과 timeMin 을 함께 받지 않는다 (400)
+    assert params['syncToken'] == 'token-1'
+    assert 'timeMin' not in params
+    assert params['singleEvents'] is True
+    assert sync.sync_token == 'token-2' and len(sync.index) == 1
+
+
+def test_sync_time_min_format():
+    now = datetime(2026, 3, 10, 9, 30, 15, 123456, tzinfo=KST)
+    assert sync_time_min(now) == (now - PAST_RETENTION).replace(microsecond=0).isoformat()
+    assert sync_time_min(now).endswith('+09:00')
+
+
+def test_prune_recomputes_max_duration():
+    index = IntervalIndex()
+    now = local_now()
+    index.upsert(Interval(now - timedelta(days=10), now - timedelta(days=2), 'long'))
+    index.upsert(Interval(now + timedelta(hours=1), now + timedelta(hours=2), 'short'))
+    index.prune(now - PAST_RETENTION)
+    assert index._max_duration == timedelta(hours=1)
+    assert [i.event_id for i in index.overlapping(now, now + timedelta(days=1))] == ['short']
+
+
+def test_incremental_prune_uses_kst(monkeypatch):
+    # 서버 시간대가 UTC 여도 인덱스(KST) 기준으로 지난 일정을 뺀다
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    try:
+        ended = local_now() - PAST_RETENTION - timedelta(hours=3)
+        service = FakeEvents([{'items': [], 'nextSyncToken': 'token-1'},
+                              {'items': [], 'nextSyncToken': 'token-2'}])
+        sync = CalendarSync(lambda: service, 'cal@example.com')
+        sync.sync()
+        sync.index.upsert(Interval(ended - timedelta(hours=1), ended, 'old'))
+        sync.sync()
+        assert len(sync.index) == 0
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_full_resync_keeps_unconfirmed_local_events():
+    start = local_now().replace(microsecond=0) + timedelta(days=1)
+    service = FakeEvents([{'items': [], 'nextSyncToken': 'token-1'},
+                          {'items': [event('local', start)], 'nextSyncToken': 'token-2'},
+                          {'items': [], 'nextSyncToken': 'token-3'}])
+    sync = CalendarSync(lambda: service, 'cal@example.com')
+    sync.record_local(event('local', start))
+
+    # 큐에 있어 아직 Calendar 목록에 없는 일정도 전체 동기화 뒤 인덱스에 남는다
+    sync.sync()
+    assert [i.event_id for i in sync.index.between(start, start + timedelta(minutes=1))] == ['local']
+
+    # 동기화로 확인되면 더 이상 따로 들고 있지 않는다: 그 뒤 삭제되면 전체 동기화에서 빠진다
+    sync.sync_token = None
+    sync.sync()
+    sync.sync_token = None
+    sync.sync()
+    assert len(sync.index) == 0
@@ -0,0 +1,117 @@
+import time
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import calendar_queue
+import skills
+from bench.fakes import FakeCalendarServer
+from calendar_queue import CalendarWriteBehindQueue
+from circuit_breaker import OPEN, CircuitBreaker
+
+CALENDAR_ID = 'test@example.com'
+
+
+def make_event(user_id='u1'):
+    return {
+        'summary': '상담',
+        'start': {'dateTime': '2026-10-20T15:00:00', 'timeZone': 'Asia/Seoul'},
+        'end': {'dateTime': '2026-10-20T16:00:00', 'timeZone': 'Asia/Seoul'},
+        'extendedProperties': {'private': {'kakaoUserId': user_id}},
+    }
+
+
+@pytest.fixture
+def make_queue(tmp_path, monkeypatch):
+    def make(service_factory=None, **kwargs):
+        queue = CalendarWriteBehindQueue(service_factory, db_path=str(tmp_path / 'queue.db'), **kwargs)
+        # 백그라운드 워커 없이 _claim/_submit 을 직접 부른다
+        monkeypatch.setattr(queue, '_ensure_started', lambda: None)
+        return queue
+    return make
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({'status': status}), b'{}')
+
+
+def attempts(queue):
+    return [row[0] for row in queue._conn().execute("SELECT attempts FROM pending_events ORDER BY id")]
+
+
+def test_write_behind_is_opt_in():
+    assert calendar_queue.CALENDAR_WRITE_BEHIND is False
+    assert 403 not in calendar_queue.RETRYABLE_STATUSES
+
+
+def test_forbidden_is_not_retried(make_queue):
+    queue = make_queue()
+    queue.enqueue(CALENDAR_ID, make_event('u1'))
+    rows = queue._claim()
+    queue._record(rows, {str(rows[0][0]): http_error(403)})
+    assert queue.pending() == 0
+    assert queue.failed() == 1
+    assert queue.failed('u1') == 1
+    assert queue.failed('u2') == 0
+
+
+def test_server_errors_are_retried(make_queue):
+    queue = make_queue()
+    queue.enqueue(CALENDAR_ID, make_event())
+    rows = queue._claim()
+    queue._record(rows, {str(rows[0][0]): http_error(503)})
+    assert queue.pending() == 1
+    assert queue.failed() == 0
+    assert queue.stats['retried'] == 1
+
+
+def test_batch_goes_through_the_breaker(make_queue):
+    breaker = CircuitBreaker('calendar', failure_threshold=1, reset_timeout=60)
+    with FakeCalendarServer(error_rate=1.0, error_status=503) as fake:
+        queue = make_queue(fake.build_service, breaker=breaker)
+        queue.enqueue(CALENDAR_ID, make_event())
+        queue.enqueue(CALENDAR_ID, make_event())
+        queue._submit(queue._claim())
+        assert breaker.state() == OPEN
+        assert attempts(queue) == [1, 1]
+
+        # 열린 동안에는 Calendar 를 부르지 않고, 시도 횟수도 쓰지 않고 미룬다
+        queue._conn().execute("UPDATE pending_events SET next_attempt_at = 0")
+        requests_before = fake.stats['http_requests']
+        queue._submit(queue._claim())
+        assert fake.stats['http_requests'] == requests_before
+        assert attempts(queue) == [1, 1]
+        assert queue.stats['deferred'] == 2
+        assert queue._claim() == []
+
+
+def test_successful_batch_is_recorded_once(make_queue):
+    breaker = CircuitBreaker('calendar')
+    with FakeCalendarServer() as fake:
+        queue = make_queue(fake.build_service, breaker=breaker)
+        for _ in range(3):
+            queue.enqueue(CALENDAR_ID, make_event())
+        queue._submit(queue._claim())
+        assert fake.event_count() == 3
+    assert queue.pending() == 0
+    assert breaker.stats['successes'] == 1
+
+
+def test_prune_failed(make_queue):
+    queue = make_queue(failed_retention=60)
+    queue.enqueue(CALENDAR_ID, make_event())
+    rows = queue._claim()
+    queue._record(rows, {str(rows[0][0]): http_error(400)})
+    assert queue.prune_failed() == 0
+    assert queue.prune_failed(now=time.time() + 61) == 1
+    assert queue.failed() == 0
+
+
+def test_my_schedule_reports_failed_events(make_queue):
+    queue = make_queue()
+    queue.enqueue(CALENDAR_ID, make_event('u1'))
+    rows = queue._claim()
+    queue._record(rows, {str(rows[0][0]): http_error(403)})
+    assert '등록하지 못한 일정이 1건' in skills.my_schedule_text(None, 'u1', queue)
+    assert '등록하지 못한' not in skills.my_schedule_text(None, 'u2', queue)
@@ -0,0 +1,83 @@
+import httpx
+import openai.error
+import pytest
+
+from circuit_breaker import CLOSED, OPEN, CircuitBreaker, is_upstream_failure
+
+REQUEST = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+
+
+def http_status_error(status):
+    return httpx.HTTPStatusError('error', request=REQUEST, response=httpx.Response(status, request=REQUEST))
+
+
+@pytest.mark.parametrize('error', [
+    openai.error.ServiceUnavailableError('unavailable', http_status=503),
+    openai.error.RateLimitError('rate limited', http_status=429),
+    http_status_error(502),
+    openai.error.APIConnectionError('connection refused'),
+    httpx.ConnectError('connection refused'),
+    httpx.RemoteProtocolError('server disconnected'),
+    ConnectionResetError(),
+])
+def test_upstream_failures(error):
+    assert is_upstream_failure(error) is True
+
+
+@pytest.mark.parametrize('error', [
+    openai.error.InvalidRequestError('bad request', 'messages', http_status=400),
+    http_status_error(404),
+])
+def test_client_errors_are_not_failures(error):
+    assert is_upstream_failure(error) is False
+
+
+@pytest.mark.parametrize('error', [
+    openai.error.Timeout('request timed out'),
+    httpx.ReadTimeout('read timed out'),
+    httpx.ConnectTimeout('connect timed out'),
+    TimeoutError(),
+])
+def test_timeouts_are_left_to_the_guard(error):
+    assert is_upstream_failure(error) is None
+
+
+def raise_in_guard(breaker, error, *args):
+    with pytest.raises(type(error)):
+        with breaker.guard(*args):
+            raise error
+
+
+@pytest.mark.parametrize('args', [(), (25.0, 25.0), (4.7, 25.0)])
+def test_repeated_timeouts_open_the_breaker(args):
+    # 설정된 타임아웃을 다 줬거나(클라이언트 설정, 25초) 마감시간에 잘렸어도 평소 응답 시간보다 넉넉히 준 호출
+    breaker = CircuitBreaker('test', failure_threshold=3)
+    for _ in range(3):
+        raise_in_guard(breaker, openai.error.Timeout('request timed out'), *args)
+    assert breaker.state() == OPEN
+    assert breaker.stats['failures'] == 3
+
+
+def test_timeouts_cut_short_by_the_deadline_are_not_counted():
+    breaker = CircuitBreaker('test', failure_threshold=3)
+    for _ in range(10):
+        raise_in_guard(breaker, httpx.ReadTimeout('read timed out'), 0.3, 25.0)
+    assert breaker.state() == CLOSED
+    assert breaker.stats['failures'] == 0 and breaker.stats['successes'] == 0
+
+    raise_in_guard(breaker, openai.error.ServiceUnavailableError('unavailable', http_status=503))
+    raise_in_guard(breaker, openai.error.ServiceUnavailableError('unavailable', http_status=503))
+    # 사이에 낀 잘린 타임아웃이 연속 실패 수를 지우지 않는다
+    raise_in_guard(breaker, httpx.ReadTimeout('read timed out'), 0.3, 25.0)
+    raise_in_guard(breaker, openai.error.ServiceUnavailableError('unavailable', http_status=503))
+    assert breaker.state() == OPEN
+
+
+def test_timeout_shorter_than_usual_latency_is_not_counted():
+    breaker = CircuitBreaker('test', failure_threshold=1)
+    # 최근 성공 호출이 3초씩 걸렸다
+    breaker._latencies.extend([3.0] * 10)
+    raise_in_guard(breaker, TimeoutError(), 2.0, 25.0)
+    assert breaker.state() == CLOSED
+    raise_in_guard(breaker, TimeoutError(), 3.5, 25.0)
+    assert breaker.state() == OPEN
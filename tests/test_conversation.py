@@ -0,0 +1,36 @@
+import pytest
+
+import conversation
+from conversation import depends_on_context
+
+
+def test_disabled_by_default():
+    assert conversation.CONVERSATION_MEMORY is False
+
+
+@pytest.mark.parametrize('question', [
+    '그럼 주말은요?',
+    '주말은요?',
+    '가격은?',
+    '아까 말씀하신 거 더 자세히',
+    '그거 어떻게 해요',
+    '거기 주차 돼요?',
+    '또 다른 방법은?',
+    '왜요?',
+])
+def test_follow_up_questions_depend_on_context(question):
+    assert depends_on_context(question)
+
+
+@pytest.mark.parametrize('question', [
+    '파이썬 리스트 정렬 방법',
+    '영어 공부 어떻게 시작하나요',
+    '면접 준비는 어떻게 하나요',
+    '왜 하늘은 파란가요',
+    '또래 친구 사귀는 법',
+    '그림 잘 그리는 법',
+    '안녕하세요',
+    '',
+])
+def test_standalone_questions_do_not_depend_on_context(question):
+    assert not depends_on_context(question)
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+import faq
+from faq import FAQ, FAQIndex, load_entries
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE = os.path.join(ROOT, 'faq.example.json')
+
+
+def load_queries():
+    with open(os.path.join(ROOT, 'bench', 'faq_queries.jsonl'), encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_faq(path, answer):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{'id': 'hours', 'questions': ['영업시간이 어떻게 되나요'], 'answer': answer}], f, ensure_ascii=False)
+
+
+def test_disabled_by_default():
+    assert faq.FAQ_FILE == ''
+    assert FAQ().lookup('영업시간이 어떻게 되나요') is None
+
+
+@pytest.mark.parametrize('question, entry_id', [
+    ('영업시간이 어떻게 되나요?', 'hours'),
+    ('운영 시간 알려주세요', 'hours'),
+    ('상담 예약은 어떻게 하나요', 'booking'),
+])
+def test_matches_reworded_questions(question, entry_id):
+    entry, confidence = FAQIndex(load_entries(EXAMPLE)).search(question)
+    assert entry['id'] == entry_id
+    assert confidence >= faq.FAQ_THRESHOLD
+
+
+def test_no_false_hits_on_the_query_set():
+    # 기준값 이상으로 찾은 답은 모두 맞아야 한다 (틀린 FAQ 답변보다 GPT 로 넘기는 편이 낫다)
+    index = FAQIndex(load_entries(EXAMPLE))
+    for query in load_queries():
+        found = index.search(query['text'])
+        if found is not None and found[1] >= faq.FAQ_THRESHOLD:
+            assert found[0]['id'] == query['faq'], query['text']
+
+
+@pytest.mark.parametrize('question', ['파이썬 리스트 정렬 방법', '?', ''])
+def test_unrelated_questions_go_to_gpt(question):
+    assert FAQ(path=EXAMPLE, reload_interval=0).lookup(question) is None
+
+
+def test_reloads_when_file_changes(tmp_path):
+    path = str(tmp_path / 'faq.json')
+    write_faq(path, '평일 9시부터 6시까지')
+    store = FAQ(path=path, reload_interval=0)
+    assert store.lookup('영업시간이 어떻게 되나요') == '평일 9시부터 6시까지'
+
+    write_faq(path, '평일 10시부터 7시까지')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.lookup('영업시간이 어떻게 되나요') == '평일 10시부터 7시까지'
+    assert store.stats['reloads'] == 2
+
+
+def test_invalid_file_keeps_previous_index(tmp_path):
+    path = str(tmp_path / 'faq.json')
+    write_faq(path, '평일 9시부터 6시까지')
+    store = FAQ(path=path, reload_interval=0)
+    store.maybe_reload()
+    assert len(store) == 1
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{'id': 'broken', 'questions': []}], f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.lookup('영업시간이 어떻게 되나요') == '평일 9시부터 6시까지'
+    assert store.stats['reload_errors'] == 1
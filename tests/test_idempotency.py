@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import idempotency
+from idempotency import AsyncIdempotentRequests, IdempotentRequests, InProgress, event_id, request_key
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'schedule_requests.db')
+
+
+def registered(text='등록되었습니다'):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return {'text': text}, True
+    return fn, calls
+
+
+def test_request_key_normalizes_utterance():
+    assert request_key('u1', '내일 3시 상담') == request_key('u1', ' 내일 3시 상담 ')
+    assert request_key('u1', '내일 3시 상담') != request_key('u2', '내일 3시 상담')
+    assert request_key(None, '내일 3시 상담') is None
+    assert request_key('u1', '') is None
+
+
+def test_event_id_is_stable_calendar_id():
+    key = request_key('u1', '내일 3시 상담')
+    assert event_id(key, '2026-10-18T15:00:00') == event_id(key, '2026-10-18T15:00:00')
+    assert event_id(key, '2026-10-18T15:00:00') != event_id(key, '2026-10-18T16:00:00')
+    # Calendar 일정 id 는 base32hex 문자(0-9, a-v)만 허용한다
+    assert set(event_id(key, '2026-10-18T15:00:00')) <= set('0123456789abcdef')
+
+
+def test_retry_returns_the_first_response(db_path):
+    requests = IdempotentRequests(db_path=db_path)
+    fn, calls = registered()
+    key = request_key('u1', '내일 3시 상담')
+    assert requests.do(key, fn) == {'text': '등록되었습니다'}
+    assert requests.do(key, fn) == {'text': '등록되었습니다'}
+    assert len(calls) == 1
+    assert requests.stats['hits'] == 1
+
+
+def test_non_final_responses_are_not_kept(db_path):
+    requests = IdempotentRequests(db_path=db_path)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return {'text': '이미 일정이 있습니다'}, False
+
+    key = request_key('u1', '내일 3시 상담')
+    requests.do(key, fn)
+    requests.do(key, fn)
+    assert len(calls) == 2
+
+
+def test_errors_release_the_claim(db_path):
+    requests = IdempotentRequests(db_path=db_path)
+    key = request_key('u1', '내일 3시 상담')
+
+    def fail():
+        raise RuntimeError('calendar down')
+
+    with pytest.raises(RuntimeError):
+        requests.do(key, fail)
+    fn, calls = registered()
+    assert requests.do(key, fn) == {'text': '등록되었습니다'}
+
+
+def test_response_is_shared_between_workers(db_path):
+    # 워커마다 따로 만든 인스턴스도 SQLite 파일로 결과를 나눈다
+    key = request_key('u1', '내일 3시 상담')
+    first, calls = registered()
+    IdempotentRequests(db_path=db_path).do(key, first)
+    other = IdempotentRequests(db_path=db_path)
+    assert other.do(key, first) == {'text': '등록되었습니다'}
+    assert len(calls) == 1
+    assert other.stats['shared_hits'] == 1
+
+
+def test_in_progress_in_another_worker(db_path, monkeypatch):
+    monkeypatch.setattr(idempotency, 'WAIT_TIMEOUT', 0.1)
+    key = request_key('u1', '내일 3시 상담')
+    other_worker = IdempotentRequests(db_path=db_path)
+    assert other_worker._shared.claim(key, time.time())
+    fn, calls = registered()
+    with pytest.raises(InProgress):
+        IdempotentRequests(db_path=db_path).do(key, fn)
+    assert calls == []
+
+
+def test_concurrent_retries_in_one_worker_run_once(db_path):
+    requests = IdempotentRequests(db_path=db_path)
+    key = request_key('u1', '내일 3시 상담')
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'text': '등록되었습니다'}, True
+
+    first = threading.Thread(target=lambda: results.append(requests.do(key, slow)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(requests.do(key, slow)))
+    second.start()
+    while requests._flights.stats['shared'] == 0:
+        pass
+    release.set()
+    first.join()
+    second.join()
+    assert results == [{'text': '등록되었습니다'}] * 2
+    assert len(calls) == 1
+    assert requests.stats['coalesced'] == 1
+
+
+def test_async_retry_returns_the_first_response(db_path):
+    async def main():
+        requests = AsyncIdempotentRequests(db_path=db_path)
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'text': '등록되었습니다'}, True
+
+        key = request_key('u1', '내일 3시 상담')
+        results = await asyncio.gather(requests.do(key, fn), requests.do(key, fn))
+        results.append(await requests.do(key, fn))
+        return results, calls
+
+    results, calls = asyncio.run(main())
+    assert results == [{'text': '등록되었습니다'}] * 3
+    assert len(calls) == 1
@@ -0,0 +1,98 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from poi_index import EARTH_RADIUS_M, PoiIndex, load_pois
+
+SEONGSAN = (126.9423, 33.4586)
+
+
+def haversine(lng1, lat1, lng2, lat2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+@pytest.fixture(scope='module')
+def pois():
+    rng = random.Random(0)
+    categories = ['관광명소', '맛집', '카페']
+    return [{'id': i, 'name': f'poi{i}', 'category': categories[i % 3], 'rating': rng.uniform(3, 5),
+             'coordinates': [rng.uniform(126.15, 126.98), rng.uniform(33.19, 33.57)]} for i in range(2000)]
+
+
+@pytest.fixture(scope='module')
+def index(pois):
+    return PoiIndex(pois, cell_m=500)
+
+
+def brute_force(pois, lng, lat, category=None):
+    found = [(haversine(lng, lat, *poi['coordinates']), poi['id']) for poi in pois
+             if category is None or poi['category'] == category]
+    return sorted(found)
+
+
+def ids_of(index, positions):
+    return [index.pois[pos]['id'] for pos in positions.tolist()]
+
+
+@pytest.mark.parametrize('radius_m', [0, 300, 2500, 12000, 200000])
+def test_within_matches_brute_force(pois, index, radius_m):
+    lng, lat = SEONGSAN
+    expected = [poi_id for dist, poi_id in brute_force(pois, lng, lat) if dist <= radius_m]
+    positions, distances, total = index.within(lng, lat, radius_m)
+    assert total == len(expected)
+    assert ids_of(index, positions) == expected
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_within_limit_keeps_the_closest(pois, index):
+    lng, lat = 126.53, 33.36
+    expected = [poi_id for dist, poi_id in brute_force(pois, lng, lat) if dist <= 10000]
+    positions, _, total = index.within(lng, lat, 10000, limit=5)
+    assert total == len(expected)
+    assert ids_of(index, positions) == expected[:5]
+
+
+@pytest.mark.parametrize('k', [1, 7, 50])
+def test_nearest_matches_brute_force(pois, index, k):
+    lng, lat = 126.49, 33.51
+    expected = brute_force(pois, lng, lat, '맛집')[:k]
+    positions, distances = index.nearest(lng, lat, k, index.matcher('맛집'))
+    assert ids_of(index, positions) == [poi_id for _, poi_id in expected]
+    assert np.allclose(distances, [dist for dist, _ in expected])
+
+
+def test_nearest_outside_the_grid_and_with_max_radius(pois, index):
+    # 격자 밖(바다 한가운데)에서도 반경을 넓혀 찾는다
+    positions, _ = index.nearest(127.5, 34.0, 3)
+    assert ids_of(index, positions) == [poi_id for _, poi_id in brute_force(pois, 127.5, 34.0)[:3]]
+    positions, _ = index.nearest(127.5, 34.0, 3, max_radius_m=1000)
+    assert len(positions) == 0
+
+
+def test_ranked_by_rating_with_matcher(pois, index):
+    positions = index.ranked(index.matcher(ids=[5, 6, 7]))
+    expected = sorted([5, 6, 7], key=lambda i: -pois[i]['rating'])
+    assert ids_of(index, positions) == expected
+    assert index.matcher() is None
+
+
+def test_empty_index():
+    index = PoiIndex([])
+    assert len(index) == 0
+    assert index.within(*SEONGSAN, 1000)[2] == 0
+    assert len(index.nearest(*SEONGSAN, 3)[0]) == 0
+
+
+def test_load_pois_skips_invalid_coordinates(tmp_path):
+    path = tmp_path / 'db.json'
+    path.write_text('{"poi": {"성산일출봉": {"category": "관광명소", "coordinates": [126.9423, 33.4586]},'
+                    '"잘못된 곳": {"coordinates": ["x", 1]}, "위도 초과": {"coordinates": [126.5, 95]}}}',
+                    encoding='utf-8')
+    pois = load_pois(str(path), extra={'맛집': {'성산일출봉': {'coordinates': [0, 0]},
+                                               '고기국수집': {'coordinates': [126.52, 33.5]}}})
+    assert [(poi['id'], poi['name'], poi['category']) for poi in pois] == [
+        (0, '성산일출봉', '관광명소'), (1, '고기국수집', '맛집')]
@@ -0,0 +1,101 @@
+import math
+import unicodedata
+
+import pytest
+
+from poi_index import EARTH_RADIUS_M, PoiIndex
+from poi_text import PoiTextIndex, choseong, is_choseong, jamo, normalize
+
+POIS = [
+    {'id': 0, 'name': '성산일출봉', 'rating': 4.8, 'coordinates': [126.9423, 33.4586]},
+    {'id': 1, 'name': '한라산', 'keywords': ['백록담'], 'rating': 4.9, 'coordinates': [126.5311, 33.3617]},
+    {'id': 2, 'name': '협재해수욕장', 'rating': 4.6, 'coordinates': [126.2397, 33.3948]},
+    {'id': 3, 'name': '한림공원', 'rating': 4.3, 'coordinates': [126.2392, 33.3893]},
+    {'id': 4, 'name': '서귀포매일올레시장', 'voice_keywords': ['올레시장'], 'rating': 4.5,
+     'coordinates': [126.5636, 33.2497]},
+    {'id': 5, 'name': '성산 흑돼지 식당', 'rating': 4.0, 'coordinates': [126.9300, 33.4600]},
+]
+JEJU_AIRPORT = (126.4930, 33.5104)
+
+
+@pytest.fixture(scope='module')
+def text_index():
+    return PoiTextIndex(POIS)
+
+
+def names(results):
+    return [poi['name'] for poi, _, _ in results]
+
+
+def haversine(lng1, lat1, lng2, lat2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def test_normalize_jamo_and_choseong():
+    assert normalize(' 성산 일출봉! ') == '성산일출봉'
+    # 맥/iOS 에서 풀어 쓴(NFD) 한글도 같은 키
+    assert normalize('성산') == '성산'
+    assert jamo('성산') == 'ㅅㅓㅇㅅㅏㄴ'
+    assert jamo('과') == 'ㄱㅗㅏ'  # 겹모음은 나눈다
+    assert choseong('성산일출봉') == 'ㅅㅅㅇㅊㅂ'
+    assert is_choseong('ㅅㅅ') and not is_choseong('성ㅅ') and not is_choseong('')
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('성산일출봉', '성산일출봉'),
+    ('성산 일출봉', '성산일출봉'),
+    ('성ㅅ', '성산일출봉'),       # 입력 중인 글자
+    ('ㅅㅅㅇㅊㅂ', '성산일출봉'),  # 초성
+    ('ㅎㄹㅅ', '한라산'),
+    ('백록', '한라산'),            # keywords
+    ('올레시장', '서귀포매일올레시장'),  # voice_keywords
+])
+def test_prefix_and_choseong_matches(text_index, query, expected):
+    results = text_index.search(query)
+    assert names(results)[0] == expected
+    assert results[0][1] >= 1
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('일출봉', '성산일출봉'),       # 중간 일치
+    ('성산일출붕', '성산일출봉'),   # 오타
+    ('매일올레', '서귀포매일올레시장'),
+])
+def test_fuzzy_matches(text_index, query, expected):
+    results = text_index.search(query)
+    assert names(results)[0] == expected
+    assert results[0][1] < 1
+
+
+def test_prefix_matches_rank_above_fuzzy_and_exact_first(text_index):
+    assert names(text_index.search('성산')) == ['성산일출봉', '성산 흑돼지 식당']
+    assert names(text_index.search('한')) == ['한라산', '한림공원']  # 같은 점수면 평점 순
+
+
+@pytest.mark.parametrize('query', ['', '   ', '없는곳', 'xyz'])
+def test_no_match(text_index, query):
+    assert text_index.search(query) == []
+
+
+def test_suggest_while_typing(text_index):
+    assert names(text_index.suggest('한ㄹ')) == ['한라산', '한림공원']
+    assert names(text_index.suggest('한라')) == ['한라산']
+    assert names(text_index.suggest('ㅎ', limit=1)) == ['한라산']
+    assert text_index.suggest('') == []
+
+
+def test_name_query_far_from_location_is_sorted_by_distance(text_index):
+    # 이름으로 찾을 때는 반경을 두지 않는다: 공항에서 40km 넘게 떨어진 성산 POI 도 거리순으로 찾는다
+    index = PoiIndex(POIS)
+    ids = [poi['id'] for poi, _, _ in text_index.search('성산')]
+    positions, distances, total = index.by_distance(*JEJU_AIRPORT, ids)
+    found = [index.pois[pos]['name'] for pos in positions.tolist()]
+    expected = sorted(ids, key=lambda i: haversine(*JEJU_AIRPORT, *POIS[i]['coordinates']))
+    assert total == 2 and found == [POIS[i]['name'] for i in expected]
+    assert distances.min() > 40000
+    assert index.within(*JEJU_AIRPORT, 20000, index.matcher(ids=ids))[2] == 0
+    # offset + limit 만큼만 골라 정렬한다
+    positions, _, total = index.by_distance(*JEJU_AIRPORT, ids, limit=1)
+    assert total == 2 and [index.pois[pos]['name'] for pos in positions.tolist()] == found[:1]
@@ -0,0 +1,82 @@
+import json
+import threading
+
+import pytest
+
+from route_batch import BatchRejected, RouteBatchRunner
+
+
+def compute(start, end, preferences):
+    if start is None:
+        raise ValueError('start 가 필요합니다')
+    return json.dumps({'start': start, 'end': end}).encode(), 'miss'
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream]
+
+
+@pytest.mark.parametrize('items, error', [
+    (None, 'routes 목록이 필요합니다'),
+    ([], 'routes 목록이 필요합니다'),
+    ([{}] * 3, '한 번에 최대 2개까지 계산할 수 있습니다'),
+])
+def test_validate(items, error):
+    assert RouteBatchRunner(compute, max_items=2).validate(items) == error
+
+
+def test_streams_one_line_per_item_and_a_summary():
+    runner = RouteBatchRunner(compute)
+    items = [{'id': 'a', 'start': [126.5, 33.5], 'end': [126.9, 33.4]},
+             {'start': None, 'end': [126.9, 33.4]},
+             'not an object']
+    result = lines(runner.submit(items))
+    by_index = {line['index']: line for line in result[:-1]}
+    assert by_index[0] == {'index': 0, 'id': 'a', 'success': True, 'cache': 'miss',
+                           'route': {'start': [126.5, 33.5], 'end': [126.9, 33.4]}}
+    assert by_index[1]['success'] is False and 'start' in by_index[1]['error']
+    assert by_index[2]['success'] is False
+    assert result[-1]['done'] is True and result[-1]['total'] == 3 and result[-1]['failed'] == 2
+    runner._pool.shutdown(wait=True)
+    assert runner.pending() == 0
+    assert runner.stats['failed_items'] == 2
+
+
+def test_rejects_batches_over_the_pending_limit():
+    release = threading.Event()
+
+    def slow(start, end, preferences):
+        release.wait(5)
+        return b'{}', 'miss'
+
+    runner = RouteBatchRunner(slow, workers=1, max_pending=3)
+    stream = runner.submit([{}, {}])
+    with pytest.raises(BatchRejected):
+        runner.submit([{}, {}])
+    assert runner.stats['rejected'] == 1
+    release.set()
+    assert len(lines(stream)) == 3
+    runner._pool.shutdown(wait=True)
+    assert runner.pending() == 0
+
+
+def test_disconnect_cancels_items_not_yet_started():
+    release = threading.Event()
+    calls = []
+
+    def slow(start, end, preferences):
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return b'{}', 'miss'
+
+    runner = RouteBatchRunner(slow, workers=1)
+    stream = runner.submit([{}, {}, {}])
+    assert json.loads(next(stream))['success'] is True
+    # 클라이언트가 끊기면 제너레이터가 닫힌다: 아직 시작하지 않은 항목(적어도 세 번째)은 계산하지 않는다
+    stream.close()
+    release.set()
+    runner._pool.shutdown(wait=True)
+    assert runner.stats['cancelled'] >= 1
+    assert len(calls) + runner.stats['cancelled'] == 3
+    assert runner.pending() == 0
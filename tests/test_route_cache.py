@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+import pytest
+
+from route_cache import DISK_HIT, HIT, MISS, RouteCache, route_key
+
+AIRPORT = [126.4930, 33.5104]
+SEONGSAN = [126.9423, 33.4581]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'route_cache.db')
+
+
+def test_route_key_snaps_to_grid_and_sorts_preferences():
+    near = [AIRPORT[0] + 0.0001, AIRPORT[1] - 0.0001]
+    assert route_key(AIRPORT, SEONGSAN, {'a': 1, 'b': 2}) == route_key(near, SEONGSAN, {'b': 2, 'a': 1})
+    assert route_key(AIRPORT, SEONGSAN, None) == route_key(AIRPORT, SEONGSAN, {})
+    assert route_key(AIRPORT, SEONGSAN) != route_key(SEONGSAN, AIRPORT)
+    assert route_key(AIRPORT, SEONGSAN) != route_key([AIRPORT[0] + 0.01, AIRPORT[1]], SEONGSAN)
+
+
+@pytest.mark.parametrize('point', [None, [126.5], ['east', 33.5], [float('nan'), 33.5]])
+def test_route_key_rejects_bad_coordinates(point):
+    with pytest.raises(ValueError):
+        route_key(point, SEONGSAN)
+
+
+def test_get_or_compute_caches_the_serialized_route(db_path):
+    cache = RouteCache(db_path=db_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'distance': 42.0}
+
+    value, source = cache.get_or_compute(AIRPORT, SEONGSAN, None, compute)
+    assert source == MISS and json.loads(value) == {'distance': 42.0}
+    assert cache.get_or_compute(AIRPORT, SEONGSAN, {}, compute) == (value, HIT)
+    assert len(calls) == 1
+    assert cache.hit_ratio() == 0.5
+
+
+def test_missing_route_is_not_cached(db_path):
+    cache = RouteCache(db_path=db_path)
+    assert cache.get_or_compute(AIRPORT, SEONGSAN, None, lambda: None)[1] == MISS
+    assert cache.get_or_compute(AIRPORT, SEONGSAN, None, lambda: None)[1] == MISS
+
+
+def test_shared_between_workers_through_sqlite(db_path):
+    RouteCache(db_path=db_path).get_or_compute(AIRPORT, SEONGSAN, None, lambda: {'distance': 1})
+    other = RouteCache(db_path=db_path)
+    value, source = other.get_or_compute(AIRPORT, SEONGSAN, None, lambda: pytest.fail('recomputed'))
+    assert source == DISK_HIT and json.loads(value) == {'distance': 1}
+    assert other.get(other.key(AIRPORT, SEONGSAN))[1] == HIT
+
+
+def test_expired_entries_are_recomputed():
+    cache = RouteCache(db_path='', ttl=0.01)
+    cache.get_or_compute(AIRPORT, SEONGSAN, None, lambda: {'distance': 1})
+    time.sleep(0.02)
+    assert cache.get_or_compute(AIRPORT, SEONGSAN, None, lambda: {'distance': 2})[1] == MISS
+    assert cache.usage()[0] == 1
+
+
+def test_evicts_least_recently_used_within_limits():
+    cache = RouteCache(db_path='', max_entries=2)
+    keys = [cache.key([126.5 + i * 0.01, 33.4], SEONGSAN) for i in range(3)]
+    cache.set(keys[0], b'0')
+    cache.set(keys[1], b'1')
+    cache.get(keys[0])
+    cache.set(keys[2], b'2')
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == (b'0', HIT)
+    assert cache.stats['evictions'] == 1
+
+    small = RouteCache(db_path='', max_bytes=10)
+    small.set(keys[0], b'x' * 6)
+    small.set(keys[1], b'y' * 6)
+    assert small.usage() == (1, 6)
+    small.set(keys[2], b'z' * 11)  # 상한보다 큰 값은 보관하지 않는다
+    assert small.get(keys[2]) is None
+
+
+def test_concurrent_misses_compute_once():
+    cache = RouteCache(db_path='')
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'distance': 3}
+
+    def request():
+        results.append(cache.get_or_compute(AIRPORT, SEONGSAN, None, compute))
+
+    first = threading.Thread(target=request)
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=request)
+    second.start()
+    while cache._flights.stats['shared'] == 0:
+        pass
+    release.set()
+    first.join()
+    second.join()
+    assert len(calls) == 1
+    assert [source for _, source in results] == [MISS, MISS]
+    assert cache.stats['shared'] == 1
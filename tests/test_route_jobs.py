@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+
+import pytest
+
+from route_jobs import DONE, FAILED, JobQueueFull, RouteJobQueue
+
+
+def wait_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def poll(jobs, job):
+    wait_finished(job)
+    return json.loads(jobs.get(job.id).to_json())
+
+
+def test_job_result_is_kept_for_polling():
+    def run(payload, progress):
+        progress('routing', 0.5)
+        return {'distance': payload['n'] * 2}
+
+    jobs = RouteJobQueue(run, workers=1)
+    job = jobs.submit({'n': 21})
+    body = poll(jobs, job)
+    assert body['status'] == DONE and body['progress'] == 1.0
+    assert body['result'] == {'distance': 42}
+    assert jobs.stats['completed'] == 1
+
+
+def test_failed_job_reports_the_error():
+    def run(payload, progress):
+        raise RuntimeError('OSRM 응답 없음')
+
+    jobs = RouteJobQueue(run, workers=1)
+    body = poll(jobs, jobs.submit({}))
+    assert body['status'] == FAILED and body['error'] == 'OSRM 응답 없음'
+    assert 'result' not in body
+
+
+def test_full_queue_rejects_new_jobs():
+    release = threading.Event()
+    started = threading.Event()
+
+    def run(payload, progress):
+        started.set()
+        release.wait(5)
+        return {}
+
+    jobs = RouteJobQueue(run, workers=1, queue_size=1)
+    jobs.submit({})
+    started.wait(5)
+    jobs.submit({})
+    with pytest.raises(JobQueueFull):
+        jobs.submit({})
+    assert jobs.stats['rejected'] == 1
+    release.set()
+
+
+def test_events_stream_progress_then_result():
+    step = threading.Event()
+
+    def run(payload, progress):
+        step.wait(5)
+        progress('labeling', 0.5)
+        return b'{"ok":true}'
+
+    jobs = RouteJobQueue(run, workers=1)
+    job = jobs.submit({})
+    events = jobs.events(job, heartbeat=0.01)
+    names = []
+    for event in events:
+        if event.startswith(b':'):
+            step.set()
+            continue
+        name = event.split(b'\n')[0][len(b'event: '):].decode()
+        names.append(name)
+        data = json.loads(event.split(b'data: ', 1)[1])
+    assert names[0] == 'progress' and names[-1] == DONE
+    assert data['result'] == {'ok': True}
+
+
+def test_finished_jobs_expire_after_ttl():
+    jobs = RouteJobQueue(lambda payload, progress: {}, workers=1, ttl=0.01)
+    job = jobs.submit({})
+    wait_finished(job)
+    time.sleep(0.02)
+    assert jobs.get(job.id) is None
+    assert jobs.stats['expired'] == 1
+
+
+def test_retained_jobs_are_capped():
+    jobs = RouteJobQueue(lambda payload, progress: {}, workers=1, max_retained=2)
+    submitted = [jobs.submit({}) for _ in range(3)]
+    for job in submitted:
+        wait_finished(job)
+    # 보관 개수를 넘으면 오래된 끝난 작업부터 지운다
+    assert jobs.get(submitted[0].id) is None
+    assert jobs.get(submitted[2].id) is submitted[2]
+    assert jobs.retained() == 2
@@ -0,0 +1,24 @@
+import os
+
+import router
+from router import FULL, FULL_DECISION, SMALL, QuestionRouter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_router_is_opt_in():
+    assert router.ROUTER_FILE == ''
+    assert router.ROUTER_LOG is False
+    assert QuestionRouter().route('파이썬 리스트 정렬 방법') == FULL_DECISION
+
+
+def test_small_model_defaults_to_the_full_model():
+    assert router.ROUTER_SMALL_MODEL == router.ROUTER_FULL_MODEL
+
+
+def test_routes_with_examples_file():
+    question_router = QuestionRouter(path=os.path.join(ROOT, 'router_examples.jsonl'))
+    assert question_router.route('안녕하세요').route == 'canned'
+    decision = question_router.route('회사 근처에서 상담 받을 때 준비할 서류를 자세히 알려 주세요')
+    assert decision.route in (SMALL, FULL)
+    assert decision.model == (router.ROUTER_SMALL_MODEL if decision.route == SMALL else router.ROUTER_FULL_MODEL)
@@ -0,0 +1,95 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from schedule_parser import describe_recurrence, parse_schedule, validate_recurrence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 토요일 오전 9시
+NOW = datetime(2026, 10, 17, 9, 0)
+
+
+def load_corpus():
+    with open(os.path.join(ROOT, 'bench', 'schedule_corpus.jsonl'), encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize('case', load_corpus(), ids=lambda case: case['text'])
+def test_corpus(case):
+    # 코퍼스 기대값은 bench_schedule_parser.CORPUS_NOW(2025-05-12 월요일 오전 9시) 기준
+    now = datetime.fromisoformat(case['now']) if case.get('now') else datetime(2025, 5, 12, 9, 0)
+    result = parse_schedule(case['text'], now)
+    assert (dict(result) if result is not None else None) == case['expected']
+
+
+def schedule(text, now=NOW):
+    result = parse_schedule(text, now)
+    return result and (result['start_datetime'], result['end_datetime'])
+
+
+def test_night_twelve_is_midnight_of_the_next_day():
+    assert schedule("내일 밤 12시 회의") == ('2026-10-19T00:00:00', '2026-10-19T01:00:00')
+    assert schedule("내일 저녁 12시 회의") == ('2026-10-19T00:00:00', '2026-10-19T01:00:00')
+    assert schedule("오늘 밤 12시 마감") == ('2026-10-18T00:00:00', '2026-10-18T01:00:00')
+
+
+def test_range_ending_at_midnight():
+    assert schedule("내일 밤 11시부터 12시 통화") == ('2026-10-18T23:00:00', '2026-10-19T00:00:00')
+
+
+def test_noon():
+    assert schedule("내일 낮 12시 점심") == ('2026-10-18T12:00:00', '2026-10-18T13:00:00')
+    assert schedule("내일 오후 12시 회의") == ('2026-10-18T12:00:00', '2026-10-18T13:00:00')
+    assert schedule("내일 정오 회의") == ('2026-10-18T12:00:00', '2026-10-18T13:00:00')
+
+
+def test_early_morning():
+    assert schedule("내일 새벽 2시 출발") == ('2026-10-18T02:00:00', '2026-10-18T03:00:00')
+    assert schedule("내일 새벽 5시 반 출발") == ('2026-10-18T05:30:00', '2026-10-18T06:30:00')
+
+
+@pytest.mark.parametrize('text', [
+    "내일 밤 2시 회의",      # 내일 새벽인지 모레 새벽인지 애매
+    "내일 새벽 12시 출발",
+    "내일 오전 12시 회의",
+    "내일 저녁 3시 회의",
+    "내일 자정 회의",
+    "내일 7시 저녁 약속",    # 오전/오후 추정과 어긋나는 단서
+    "내일 3시나 4시에 상담",
+    "내일 회의",
+])
+def test_ambiguous_sentences_go_to_gpt(text):
+    assert parse_schedule(text, NOW) is None
+
+
+def test_default_hour_without_meridiem():
+    # 오전/오후가 없으면 1~6시는 오후
+    assert schedule("내일 3시 상담") == ('2026-10-18T15:00:00', '2026-10-18T16:00:00')
+    assert schedule("내일 10시 상담") == ('2026-10-18T10:00:00', '2026-10-18T11:00:00')
+
+
+def test_duration_and_summary():
+    result = parse_schedule("다음주 화요일 오후 2시 1시간 반 팀 회의", NOW)
+    assert result['start_datetime'] == '2026-10-20T14:00:00'
+    assert result['end_datetime'] == '2026-10-20T15:30:00'
+    assert result['summary'] == '팀 회의'
+
+
+def test_past_time_today_is_not_parsed():
+    assert parse_schedule("오늘 오전 8시 회의", NOW) is None
+
+
+def test_weekly_recurrence():
+    result = parse_schedule("매주 화요일 오후 2시 상담 4주간", NOW)
+    assert result['start_datetime'] == '2026-10-20T14:00:00'
+    assert result['recurrence'] == 'RRULE:FREQ=WEEKLY;BYDAY=TU;COUNT=4'
+    assert describe_recurrence(result['recurrence']) == '매주 화요일, 4회'
+
+
+def test_validate_recurrence():
+    start = datetime(2026, 10, 20, 14, 0)
+    assert validate_recurrence('freq=weekly;byday=tu;count=4', start) == 'RRULE:FREQ=WEEKLY;BYDAY=TU;COUNT=4'
+    with pytest.raises(ValueError):
+        validate_recurrence('RRULE:FREQ=WEEKLY;COUNT=1\nRRULE:FREQ=DAILY', start)
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'answer'
+
+    leader = threading.Thread(target=lambda: results.append(flights.do('k', fn)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flights.do('k', fn, timeout=5)))
+    follower.start()
+    while flights.stats['shared'] == 0:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ['answer', 'answer']
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
+
+
+def test_async_waiters_share_the_leader_result():
+    async def main():
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'answer'
+
+        results = await asyncio.gather(*(flights.do('k', fn) for _ in range(3)))
+        return results, calls, flights.stats
+
+    results, calls, stats = asyncio.run(main())
+    assert results == ['answer'] * 3
+    assert len(calls) == 1
+    assert stats['shared'] == 2
+
+
+def test_async_leader_cancel_fails_waiters_with_timeout_error():
+    async def main():
+        flights = AsyncSingleFlight()
+        started = asyncio.Event()
+
+        async def fn():
+            started.set()
+            await asyncio.sleep(10)
+
+        leader = asyncio.create_task(flights.do('k', fn))
+        await started.wait()
+        waiter = asyncio.create_task(flights.do('k', fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        # 기다리던 요청은 취소가 아니라 일반 오류로 끝나 안내 응답을 만들 수 있다
+        with pytest.raises(TimeoutError):
+            await waiter
+        assert not waiter.cancelled()
+        assert flights.in_flight() == 0
+
+    asyncio.run(main())